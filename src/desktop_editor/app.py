@@ -41,6 +41,8 @@ class DesktopEditorApp(Adw.Application):
             ("new", self._on_new),
             ("save", self._on_save),
             ("save-as", self._on_save_as),
+            ("undo", self._on_undo),
+            ("redo", self._on_redo),
             ("about", self._on_about),
             ("refresh", self._on_refresh_action),
             ("shortcuts", self._show_shortcuts_window),
@@ -54,6 +56,8 @@ class DesktopEditorApp(Adw.Application):
         self.set_accels_for_action("app.new", ["<Control>n"])
         self.set_accels_for_action("app.save", ["<Control>s"])
         self.set_accels_for_action("app.save-as", ["<Control><Shift>s"])
+        self.set_accels_for_action("app.undo", ["<Control>z"])
+        self.set_accels_for_action("app.redo", ["<Control><Shift>z", "<Control>y"])
         self.set_accels_for_action("app.quit", ["<Control>q"])
         self.set_accels_for_action("app.export", ["<Control>e"])
 
@@ -83,6 +87,16 @@ class DesktopEditorApp(Adw.Application):
         if win:
             win.show_save_dialog()
 
+    def _on_undo(self, action, param):
+        win = self.props.active_window
+        if win:
+            win.undo()
+
+    def _on_redo(self, action, param):
+        win = self.props.active_window
+        if win:
+            win.redo()
+
     def _on_about(self, action, param):
         about = Adw.AboutDialog(
             application_name=_("Desktop File Editor"),
@@ -109,7 +123,8 @@ class DesktopEditorApp(Adw.Application):
         section = Gtk.ShortcutsSection(visible=True, max_height=10)
         group = Gtk.ShortcutsGroup(visible=True, title="General")
         for accel, title in [("<Control>q", "Quit"), ("F5", "Refresh"), ("<Control>slash", "Keyboard shortcuts"),
-                             ("<Control>o", "Open"), ("<Control>s", "Save"), ("<Control>n", "New")]:
+                             ("<Control>o", "Open"), ("<Control>s", "Save"), ("<Control>n", "New"),
+                             ("<Control>z", "Undo"), ("<Control><Shift>z", "Redo")]:
             s = Gtk.ShortcutsShortcut(visible=True, accelerator=accel, title=title)
             group.append(s)
         section.append(group)
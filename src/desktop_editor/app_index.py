@@ -0,0 +1,227 @@
+"""Live index of installed .desktop files kept current by file monitors."""
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, Optional
+
+import gi
+
+gi.require_version("Gio", "2.0")
+
+from gi.repository import Gio, GLib, GObject  # noqa: E402
+
+from desktop_editor.discovery import (  # noqa: E402
+    DiscoveredFile,
+    application_dirs,
+    scan_applications_dir,
+)
+
+# Events arriving within this window are coalesced into one update
+DEBOUNCE_MS = 250
+# Initial scan results are handed to the main loop in chunks of this size
+SCAN_CHUNK_SIZE = 256
+
+
+def _same_file(a: DiscoveredFile, b: DiscoveredFile) -> bool:
+    return (a.path == b.path and a.priority == b.priority
+            and a.stat.st_mtime_ns == b.stat.st_mtime_ns
+            and a.stat.st_size == b.stat.st_size)
+
+
+class DesktopFileIndex(GObject.Object):
+    """All discovered desktop files, updated incrementally from Gio.FileMonitor.
+
+    The index is built once on a worker thread and from then on only touches
+    the paths reported by the monitors of every ``applications`` directory.
+    The ``changed`` signal carries ``(updated, removed)``: the new or changed
+    winning :class:`DiscoveredFile` objects and the IDs that disappeared.
+    """
+
+    __gsignals__ = {
+        "changed": (GObject.SignalFlags.RUN_FIRST, None, (object, object)),
+    }
+
+    def __init__(self, dirs: Optional[list[str]] = None):
+        super().__init__()
+        self.dirs = dirs if dirs is not None else application_dirs()
+        # Per applications dir, in precedence order: desktop_id -> (path, stat)
+        self._roots: list[dict[str, tuple[str, os.stat_result]]] = [{} for _ in self.dirs]
+        # desktop_id -> winning DiscoveredFile
+        self._winners: dict[str, DiscoveredFile] = {}
+        self._monitors: dict[str, Gio.FileMonitor] = {}
+        # path -> index of the applications dir it belongs to
+        self._pending: dict[str, int] = {}
+        self._flush_source = 0
+        self._generation = 0
+
+    # ── Queries ─────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._winners)
+
+    def __iter__(self) -> Iterator[DiscoveredFile]:
+        return iter(list(self._winners.values()))
+
+    def __contains__(self, desktop_id: str) -> bool:
+        return desktop_id in self._winners
+
+    def get(self, desktop_id: str) -> Optional[DiscoveredFile]:
+        return self._winners.get(desktop_id)
+
+    # ── Building ────────────────────────────────────────────────────
+
+    def start(self):
+        """Scan every applications dir in the background and start monitoring."""
+        self._generation += 1
+        for table in self._roots:
+            table.clear()
+        removed = list(self._winners)
+        self._winners.clear()
+        if removed:
+            self.emit("changed", [], removed)
+        for priority, root in enumerate(self.dirs):
+            self._monitor(root, priority)
+        thread = threading.Thread(
+            target=self._scan_worker, args=(self._generation,), daemon=True)
+        thread.start()
+
+    def stop(self):
+        """Cancel every monitor and any pending update."""
+        self._generation += 1
+        for monitor in self._monitors.values():
+            monitor.cancel()
+        self._monitors.clear()
+        if self._flush_source:
+            GLib.source_remove(self._flush_source)
+            self._flush_source = 0
+        self._pending.clear()
+
+    def _scan_worker(self, generation: int):
+        # Precedence is resolved on the main loop, so roots are merged in
+        # whatever order their scans finish.
+        def scan(priority, root):
+            subdirs = []
+            return priority, scan_applications_dir(root, subdirs_out=subdirs), subdirs
+
+        if not self.dirs:
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(self.dirs)),
+                                thread_name_prefix="desktop-index") as pool:
+            futures = [pool.submit(scan, p, root) for p, root in enumerate(self.dirs)]
+            for future in as_completed(futures):
+                priority, found, subdirs = future.result()
+                GLib.idle_add(self._watch_subdirs, subdirs, priority, generation)
+                for i in range(0, len(found), SCAN_CHUNK_SIZE):
+                    GLib.idle_add(self._merge_scanned, found[i:i + SCAN_CHUNK_SIZE],
+                                  priority, generation)
+
+    def _watch_subdirs(self, subdirs: list[str], priority: int, generation: int):
+        if generation == self._generation:
+            for d in subdirs:
+                self._monitor(d, priority)
+        return GLib.SOURCE_REMOVE
+
+    def _merge_scanned(self, found, priority: int, generation: int):
+        if generation == self._generation:
+            table = self._roots[priority]
+            for desktop_id, path, st in found:
+                table[desktop_id] = (path, st)
+            self._resolve({desktop_id for desktop_id, _, _ in found})
+        return GLib.SOURCE_REMOVE
+
+    def _resolve(self, ids):
+        """Recompute the winner for *ids* and emit ``changed`` if any moved."""
+        updated = []
+        removed = []
+        for desktop_id in ids:
+            winner = None
+            for priority, table in enumerate(self._roots):
+                hit = table.get(desktop_id)
+                if hit is not None:
+                    winner = DiscoveredFile(desktop_id, hit[0], hit[1], priority)
+                    break
+            old = self._winners.get(desktop_id)
+            if winner is None:
+                if old is not None:
+                    del self._winners[desktop_id]
+                    removed.append(desktop_id)
+            elif old is None or not _same_file(old, winner):
+                self._winners[desktop_id] = winner
+                updated.append(winner)
+        if updated or removed:
+            self.emit("changed", updated, removed)
+
+    # ── Monitoring ──────────────────────────────────────────────────
+
+    def _monitor(self, directory: str, priority: int):
+        if directory in self._monitors:
+            return
+        try:
+            monitor = Gio.File.new_for_path(directory).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None)
+        except GLib.Error:
+            return
+        monitor.connect("changed", self._on_monitor_event, priority)
+        self._monitors[directory] = monitor
+
+    def _on_monitor_event(self, monitor, file, other_file, event_type, priority):
+        for f in (file, other_file):
+            if f is not None and f.get_path():
+                self._pending[f.get_path()] = priority
+        if not self._flush_source:
+            self._flush_source = GLib.timeout_add(DEBOUNCE_MS, self._flush_pending)
+
+    def _flush_pending(self):
+        self._flush_source = 0
+        pending, self._pending = self._pending, {}
+        touched = set()
+        for path, priority in pending.items():
+            touched.update(self._refresh_path(path, priority))
+        if touched:
+            self._resolve(touched)
+        return GLib.SOURCE_REMOVE
+
+    def _refresh_path(self, path: str, priority: int) -> set[str]:
+        """Bring the table of one applications dir up to date for *path*.
+
+        *path* may be the applications dir itself, e.g. when it is created
+        after startup; it is then rescanned as a whole.
+        """
+        root = self.dirs[priority]
+        rel = os.path.relpath(path, root)
+        if rel.startswith(".."):
+            return set()
+        is_root = rel == "."
+        table = self._roots[priority]
+        prefix = "" if is_root else rel.replace(os.sep, "-")
+        touched = set()
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+
+        if st is None or stat.S_ISDIR(st.st_mode):
+            # A deleted path or a (possibly new) directory: drop everything
+            # that lived below it and rescan whatever is there now
+            below = os.path.join(path, "")
+            for desktop_id, (p, _) in list(table.items()):
+                if p == path or p.startswith(below):
+                    del table[desktop_id]
+                    touched.add(desktop_id)
+            # The root's own monitor keeps watching for it to come back
+            for d in [d for d in self._monitors
+                      if d.startswith(below) or (d == path and not is_root)]:
+                self._monitors.pop(d).cancel()
+            if st is not None:
+                subdirs = []
+                for desktop_id, p, s in scan_applications_dir(
+                        path, prefix + "-" if prefix else "", subdirs):
+                    table[desktop_id] = (p, s)
+                    touched.add(desktop_id)
+                for d in subdirs:
+                    self._monitor(d, priority)
+        elif path.endswith(".desktop"):
+            table[prefix] = (path, st)
+            touched.add(prefix)
+        return touched
@@ -0,0 +1,401 @@
+"""Apply one set of declarative edits to many .desktop files at once.
+
+A bulk edit is planned first: every file is read and edited in memory, so a
+file that cannot be parsed or is not affected never gets touched. Committing
+the plan then writes all changed files as a single transaction. The original
+bytes of every file are saved to a journal before the first write; if any
+write fails, the files already written are restored from it. A journal left
+behind by a crash is rolled back with :func:`recover`.
+
+Operations address keys by path: ``Name``, ``Name[sv]``, or
+``Desktop Action new-window/Exec`` for a key in another group.
+
+Nothing in here may import GTK.
+"""
+import marshal
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from desktop_editor.desktop_file import DesktopFile, split_locale_key, write_atomic
+from desktop_editor.i18n import _
+
+_JOURNAL_MAGIC = b"DEBJ\x01"
+_MAIN_GROUP = "Desktop Entry"
+_JOURNAL_SUFFIX = ".journal"
+
+
+class BulkEditError(Exception):
+    """A bulk edit could not be applied; no file was left modified."""
+
+
+# ── Operations ──────────────────────────────────────────────────────
+
+
+class Operation:
+    """One declarative change; :meth:`apply` returns True if *df* changed."""
+
+    key = ""
+
+    def apply(self, df: DesktopFile) -> bool:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.describe()}>"
+
+
+def split_key_path(path: str) -> tuple[Optional[str], str]:
+    """Split a key path into ``(group, key)``; the main group is None.
+
+    ``Name`` and ``Name[sv]`` are main-group keys, and
+    ``Desktop Action new-window/Exec`` is a key in another group. Keys
+    never contain ``/``, so everything before the last one is the group.
+    """
+    group, sep, key = path.rpartition("/")
+    if not sep or group == _MAIN_GROUP:
+        return None, key
+    return group, key
+
+
+def _get(df: DesktopFile, path: str) -> Optional[str]:
+    group, key = split_key_path(path)
+    if group is not None:
+        return df.extra_groups.get(group, {}).get(key)
+    parsed = split_locale_key(key)
+    if parsed:
+        return df.localized.get(parsed)
+    return df.entries.get(key)
+
+
+def _set(df: DesktopFile, path: str, value: Optional[str]) -> bool:
+    """Set (or, for None, remove) the key at *path*; see :func:`split_key_path`."""
+    if _get(df, path) == value:
+        return False
+    group, key = split_key_path(path)
+    if group is not None:
+        store, item = df.extra_groups.setdefault(group, OrderedDict()), key
+    else:
+        parsed = split_locale_key(key)
+        store, item = (df.localized, parsed) if parsed else (df.entries, key)
+    if value is None:
+        del store[item]
+    else:
+        store[item] = value
+    return True
+
+
+def _split_list(value: str) -> list[str]:
+    return [v for v in value.split(";") if v]
+
+
+class SetValue(Operation):
+    def __init__(self, key: str, value: str):
+        self.key = key
+        self.value = value
+
+    def apply(self, df):
+        return _set(df, self.key, self.value)
+
+    def describe(self):
+        return f"{self.key}={self.value}"
+
+
+class UnsetKey(Operation):
+    def __init__(self, key: str):
+        self.key = key
+
+    def apply(self, df):
+        return _set(df, self.key, None)
+
+    def describe(self):
+        return _("remove %s") % self.key
+
+
+class AddToList(Operation):
+    """Append *value* to a ``;``-separated list such as Categories."""
+
+    def __init__(self, key: str, value: str):
+        self.key = key
+        self.value = value
+
+    def apply(self, df):
+        items = _split_list(_get(df, self.key) or "")
+        if self.value in items:
+            return False
+        return _set(df, self.key, ";".join(items + [self.value]) + ";")
+
+    def describe(self):
+        return _("add %(value)s to %(key)s") % {"value": self.value, "key": self.key}
+
+
+class RemoveFromList(Operation):
+    """Drop *value* from a ``;``-separated list; an emptied key is removed."""
+
+    def __init__(self, key: str, value: str):
+        self.key = key
+        self.value = value
+
+    def apply(self, df):
+        items = _split_list(_get(df, self.key) or "")
+        if self.value not in items:
+            return False
+        items = [v for v in items if v != self.value]
+        return _set(df, self.key, ";".join(items) + ";" if items else None)
+
+    def describe(self):
+        return _("remove %(value)s from %(key)s") % {"value": self.value, "key": self.key}
+
+
+class ReplacePrefix(Operation):
+    """Replace a leading *old* with *new*, e.g. to move an Exec path."""
+
+    def __init__(self, key: str, old: str, new: str):
+        self.key = key
+        self.old = old
+        self.new = new
+
+    def apply(self, df):
+        value = _get(df, self.key)
+        if value is None or not value.startswith(self.old):
+            return False
+        return _set(df, self.key, self.new + value[len(self.old):])
+
+    def describe(self):
+        return _("replace %(key)s prefix %(old)s with %(new)s") % {
+            "key": self.key, "old": self.old, "new": self.new}
+
+
+# ── Planning and committing ─────────────────────────────────────────
+
+
+def journal_dir() -> str:
+    """Return the directory holding journals of in-progress bulk edits."""
+    base = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(base, "desktop-editor", "journal")
+
+
+class FileChange(NamedTuple):
+    """A file a bulk edit will rewrite."""
+
+    path: str
+    keys: tuple[str, ...]
+    original: bytes
+    content: str
+    mtime_ns: int
+    size: int
+
+
+def _read(path: str) -> tuple[DesktopFile, bytes, os.stat_result]:
+    """Parse *path*, also returning its raw bytes and the stat they match."""
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        original = f.read()
+    return DesktopFile.from_string(original.decode("utf-8", errors="replace"), path), original, st
+
+
+def _plan_file(path: str, operations: list[Operation]):
+    df, original, st = _read(path)
+    keys = []
+    for op in operations:
+        if op.apply(df) and op.key not in keys:
+            keys.append(op.key)
+    if not keys:
+        return None
+    content = "".join(df.iter_lines())
+    # Never report a change the written file would not carry
+    if _model(DesktopFile.from_string(content)) != _model(df):
+        raise BulkEditError(_("the edited file would not read back as edited"))
+    return FileChange(path, tuple(keys), original, content, st.st_mtime_ns, st.st_size)
+
+
+def _model(df: DesktopFile):
+    return (dict(df.entries), dict(df.localized.items()),
+            {name: dict(group) for name, group in df.extra_groups.items()})
+
+
+class BulkEditPlan:
+    """The in-memory result of applying operations to a set of files."""
+
+    def __init__(self, changes: list[FileChange], unchanged: list[str],
+                 failed: list[tuple[str, str]], max_workers: Optional[int] = None):
+        self.changes = changes
+        self.unchanged = unchanged
+        self.failed = failed
+        self.max_workers = max_workers
+
+    def summary(self) -> str:
+        """Return a human-readable report of what the edit does."""
+        lines = [f"{change.path}: {', '.join(change.keys)}" for change in self.changes]
+        lines += [f"{path}: {error}" for path, error in self.failed]
+        lines.append(_("%(changed)d files changed, %(unchanged)d unchanged, "
+                       "%(failed)d failed") % {
+            "changed": len(self.changes), "unchanged": len(self.unchanged),
+            "failed": len(self.failed),
+        })
+        return "\n".join(lines)
+
+    def commit(self, journal_directory: Optional[str] = None):
+        """Write every changed file, or none of them.
+
+        Raises :class:`BulkEditError` if a file changed on disk since the
+        plan was made, if the journal cannot be written, or if any write
+        fails (after rolling back).
+        """
+        if self.failed:
+            raise BulkEditError(_("Some files could not be read; nothing was written"))
+        if not self.changes:
+            return
+        for change in self.changes:
+            try:
+                st = os.stat(change.path)
+            except OSError as e:
+                raise BulkEditError(f"{change.path}: {e.strerror or e}") from e
+            if st.st_mtime_ns != change.mtime_ns or st.st_size != change.size:
+                raise BulkEditError(_("%s changed on disk; nothing was written")
+                                    % change.path)
+
+        try:
+            journal = _write_journal(self.changes, journal_directory)
+        except OSError as e:
+            raise BulkEditError(_("Could not write the bulk edit journal; nothing was "
+                                  "written: %s") % (e.strerror or e)) from e
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="desktop-bulk") as pool:
+            futures = [(change.path, pool.submit(write_atomic, change.path, change.content))
+                       for change in self.changes]
+            for path, future in futures:
+                try:
+                    future.result()
+                except OSError as e:
+                    errors.append(f"{path}: {e.strerror or e}")
+        if errors:
+            message = [_("Some files could not be written:")] + errors
+            try:
+                _rollback(journal)
+                message.append(_("The edit was rolled back."))
+            except (BulkEditError, OSError) as e:
+                message.append(str(e))
+            raise BulkEditError("\n".join(message))
+        try:
+            os.unlink(journal)
+        except OSError as e:
+            # recover() would roll the finished edit back
+            raise BulkEditError(_("Every file was written, but %(journal)s could not be "
+                                  "removed: %(error)s. Delete it before using --recover.")
+                                % {"journal": journal, "error": e.strerror or e}) from e
+
+
+def plan(paths: Iterable[str], operations: list[Operation],
+         max_workers: Optional[int] = None) -> BulkEditPlan:
+    """Load *paths* in parallel and apply *operations* to each in memory."""
+    paths = list(paths)
+    changes, unchanged, failed = [], [], []
+
+    def worker(path):
+        try:
+            return path, _plan_file(path, operations), None
+        except OSError as e:
+            return path, None, e.strerror or str(e)
+        except BulkEditError as e:
+            return path, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers,
+                            thread_name_prefix="desktop-bulk") as pool:
+        for path, change, error in pool.map(worker, paths):
+            if error is not None:
+                failed.append((path, error))
+            elif change is None:
+                unchanged.append(path)
+            else:
+                changes.append(change)
+    return BulkEditPlan(changes, unchanged, failed, max_workers)
+
+
+def read_values(paths: Iterable[str], key: str, max_workers: Optional[int] = None
+                ) -> Iterator[tuple[str, Optional[str], Optional[str]]]:
+    """Yield ``(path, value, error)`` for the key path *key* in each file, in order.
+
+    *value* is None where the key is not set. Files are read in parallel.
+    """
+    def worker(path):
+        try:
+            return path, _get(_read(path)[0], key), None
+        except OSError as e:
+            return path, None, e.strerror or str(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers,
+                            thread_name_prefix="desktop-bulk") as pool:
+        yield from pool.map(worker, paths)
+
+
+def _write_journal(changes: list[FileChange], directory: Optional[str]) -> str:
+    directory = directory or journal_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"bulk-{time.time_ns()}-{os.getpid()}{_JOURNAL_SUFFIX}")
+    write_atomic(path, _JOURNAL_MAGIC + marshal.dumps(
+        [(os.path.abspath(c.path), c.original) for c in changes]))
+    return path
+
+
+def _rollback(journal: str) -> list[str]:
+    """Restore every file recorded in *journal*, then delete it.
+
+    Files still holding their original bytes are left alone. If any file
+    cannot be restored the journal is kept so :func:`recover` can retry.
+    """
+    with open(journal, "rb") as f:
+        data = f.read()
+    if not data.startswith(_JOURNAL_MAGIC):
+        raise BulkEditError(_("%s is not a bulk edit journal") % journal)
+    restored, errors = [], []
+    for path, original in marshal.loads(data[len(_JOURNAL_MAGIC):]):
+        try:
+            with open(path, "rb") as f:
+                if f.read() == original:
+                    continue
+        except OSError:
+            pass
+        try:
+            write_atomic(path, original)
+            restored.append(path)
+        except OSError as e:
+            errors.append(f"{path}: {e.strerror or e}")
+    if errors:
+        raise BulkEditError("\n".join(
+            [_("Could not restore these files; run 'desktop-editor bulk --recover' "
+               "to retry:")] + errors))
+    os.unlink(journal)
+    return restored
+
+
+def recover(journal_directory: Optional[str] = None) -> list[str]:
+    """Roll back bulk edits interrupted by a crash; returns restored paths.
+
+    Only call this when no other bulk edit is running.
+    """
+    directory = journal_directory or journal_dir()
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(_JOURNAL_SUFFIX))
+    except FileNotFoundError:
+        return []
+    restored = []
+    # Newest first, so a file in several journals ends at its oldest content
+    for name in reversed(names):
+        restored.extend(_rollback(os.path.join(directory, name)))
+    return restored
+
+
+def apply_bulk_edit(paths: Iterable[str], operations: list[Operation],
+                    dry_run: bool = False, max_workers: Optional[int] = None,
+                    journal_directory: Optional[str] = None) -> BulkEditPlan:
+    """Plan and, unless *dry_run*, commit a bulk edit."""
+    result = plan(paths, operations, max_workers)
+    if not dry_run:
+        result.commit(journal_directory)
+    return result
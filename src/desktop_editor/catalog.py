@@ -0,0 +1,302 @@
+"""Compact, read-only in-memory catalog of many parsed .desktop files.
+
+A :class:`DesktopFile` holds several dicts per file, and every file repeats
+strings like "Name", "Comment[de]" or "true". A :class:`Catalog` stores each
+file as a :class:`CatalogEntry` with ``__slots__``. Keys are interned,
+short values are shared through a catalog-wide pool, and locales become small
+integers. Each localized key is stored as a sorted ``array('H')`` of locale
+ids with a parallel tuple of values.
+
+Entries expose the same read accessors as :class:`DesktopFile`
+(``entries``, ``localized``, ``extra_groups``, ``get_locales``,
+``get_translations``, ``validate``), so read-only code such as the
+validator works on either. Use :meth:`CatalogEntry.to_desktop_file` to get
+an editable copy.
+"""
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import ItemsView, Mapping, ValuesView
+from typing import Iterable, Iterator, Optional
+
+from desktop_editor.desktop_file import DesktopFile, ValidationMessage
+
+
+# Short values (booleans, types, icon and program names, categories) repeat
+# across files and are stored once; longer ones such as comments rarely do,
+# and pooling them would only add a dict slot each.
+_SHARED_VALUE_MAX = 32
+
+
+class _ItemsView(ItemsView):
+    """ItemsView that iterates its mapping's storage directly."""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class _ValuesView(ValuesView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._mapping._iter_values()
+
+
+class _EntriesView(Mapping):
+    """Read-only mapping over parallel key and value tuples."""
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: tuple, values: tuple):
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def items(self) -> ItemsView:
+        return _ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _ValuesView(self)
+
+    def _iter_items(self):
+        return zip(self._keys, self._values)
+
+    def _iter_values(self):
+        return iter(self._values)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+class _LocalizedView(Mapping):
+    """Read-only ``(key, locale) -> value`` mapping with the TranslationStore API."""
+
+    __slots__ = ("_entry", "_locales")
+
+    def __init__(self, entry: "CatalogEntry", locales: list[str]):
+        self._entry = entry
+        self._locales = locales
+
+    def _column(self, key: str):
+        entry = self._entry
+        try:
+            i = entry._lkeys.index(key)
+        except ValueError:
+            return None, None
+        return entry._lids[i], entry._lvalues[i]
+
+    def __getitem__(self, item: tuple[str, str]) -> str:
+        key, locale = item
+        ids, values = self._column(key)
+        locale_id = self._entry._catalog._locale_ids.get(locale)
+        if ids is not None and locale_id is not None:
+            i = bisect_left(ids, locale_id)
+            if i < len(ids) and ids[i] == locale_id:
+                return values[i]
+        raise KeyError(item)
+
+    def __contains__(self, item) -> bool:
+        try:
+            self[item]
+        except (KeyError, TypeError, ValueError):
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        locales = self._locales
+        for key, ids in zip(self._entry._lkeys, self._entry._lids):
+            for locale_id in ids:
+                yield key, locales[locale_id]
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._entry._lids)
+
+    def items(self) -> ItemsView:
+        return _ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _ValuesView(self)
+
+    def _iter_values(self):
+        for values in self._entry._lvalues:
+            yield from values
+
+    def _iter_items(self):
+        locales = self._locales
+        entry = self._entry
+        for key, ids, values in zip(entry._lkeys, entry._lids, entry._lvalues):
+            for locale_id, value in zip(ids, values):
+                yield (key, locales[locale_id]), value
+
+    def for_key(self, key: str) -> dict[str, str]:
+        """Return {locale: value} for *key*."""
+        ids, values = self._column(key)
+        if ids is None:
+            return {}
+        return {self._locales[locale_id]: value for locale_id, value in zip(ids, values)}
+
+    def for_locale(self, locale: str) -> dict[str, str]:
+        """Return {key: value} for *locale*."""
+        return {key: self[(key, locale)] for key in self._entry._lkeys
+                if (key, locale) in self}
+
+    def keys_with_translations(self) -> list[str]:
+        return list(self._entry._lkeys)
+
+    def locales(self) -> list[str]:
+        ids = set()
+        for column in self._entry._lids:
+            ids.update(column)
+        return [self._locales[locale_id] for locale_id in sorted(ids)]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+
+class CatalogEntry:
+    """One file in a :class:`Catalog`; see the module docstring."""
+
+    __slots__ = ("path", "_catalog", "_keys", "_values",
+                 "_lkeys", "_lids", "_lvalues", "_groups")
+
+    @property
+    def entries(self) -> Mapping:
+        return _EntriesView(self._keys, self._values)
+
+    @property
+    def localized(self) -> _LocalizedView:
+        return _LocalizedView(self, self._catalog._locales)
+
+    @property
+    def extra_groups(self) -> "OrderedDict[str, Mapping]":
+        return OrderedDict((name, _EntriesView(keys, values))
+                           for name, keys, values in self._groups)
+
+    def get_locales(self) -> list[str]:
+        """Return sorted list of all locales used."""
+        return sorted(self.localized.locales())
+
+    def get_translations(self, key: str) -> dict[str, str]:
+        """Return {locale: value} for a given key."""
+        return self.localized.for_key(key)
+
+    def validate(self) -> list[ValidationMessage]:
+        from desktop_editor.validation import validate
+
+        return validate(self)
+
+    def to_desktop_file(self) -> DesktopFile:
+        """Return an editable DesktopFile with this entry's content.
+
+        The catalog does not keep source text, so saving the result rewrites
+        the whole file; load the path itself to edit it losslessly.
+        """
+        df = DesktopFile()
+        df.path = self.path
+        df.entries.update(zip(self._keys, self._values))
+        df.localized.update(self.localized.items())
+        for name, keys, values in self._groups:
+            df.extra_groups[name] = OrderedDict(zip(keys, values))
+        return df
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.path!r}>"
+
+
+class Catalog:
+    """A read-only, memory-compact collection of parsed .desktop files.
+
+    Entries are keyed by path. Strings shared between files, such as keys,
+    locales and common values like "true" or "Application", are stored once
+    per catalog.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, CatalogEntry] = {}
+        self._locales: list[str] = []
+        self._locale_ids: dict[str, int] = {}
+        self._strings: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self._entries.values())
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    def get(self, path: str) -> Optional[CatalogEntry]:
+        return self._entries.get(path)
+
+    def locales(self) -> list[str]:
+        """Return every locale seen in the catalog, in order of first use."""
+        return list(self._locales)
+
+    def _locale_id(self, locale: str) -> int:
+        locale_id = self._locale_ids.get(locale)
+        if locale_id is None:
+            locale_id = self._locale_ids[locale] = len(self._locales)
+            self._locales.append(sys.intern(locale))
+        return locale_id
+
+    def _shared(self, values: Iterable[str]) -> tuple[str, ...]:
+        strings = self._strings
+        return tuple([strings.setdefault(v, v) if len(v) <= _SHARED_VALUE_MAX else v
+                      for v in values])
+
+    def add(self, df: DesktopFile) -> CatalogEntry:
+        """Store a compact copy of *df*, replacing any entry with the same path."""
+        entry = CatalogEntry()
+        entry.path = df.path
+        entry._catalog = self
+        entry._keys = tuple([sys.intern(k) for k in df.entries])
+        entry._values = self._shared(df.entries.values())
+
+        lkeys, lids, lvalues = [], [], []
+        for key in df.localized.keys_with_translations():
+            column = sorted((self._locale_id(locale), value)
+                            for locale, value in df.localized.for_key(key).items())
+            lkeys.append(sys.intern(key))
+            lids.append(array("H", [locale_id for locale_id, _ in column]))
+            lvalues.append(self._shared(value for _, value in column))
+        entry._lkeys = tuple(lkeys)
+        entry._lids = tuple(lids)
+        entry._lvalues = tuple(lvalues)
+
+        entry._groups = tuple(
+            (sys.intern(name), tuple([sys.intern(k) for k in group]),
+             self._shared(group.values()))
+            for name, group in df.extra_groups.items())
+        self._entries[df.path] = entry
+        return entry
+
+    def remove(self, path: str):
+        self._entries.pop(path, None)
+
+    def load(self, paths: Iterable[str]) -> list[tuple[str, str]]:
+        """Parse and add *paths*; returns ``(path, error)`` for unreadable files."""
+        errors = []
+        for path in paths:
+            try:
+                self.add(DesktopFile.load(path))
+            except OSError as e:
+                errors.append((path, e.strerror or str(e)))
+        return errors
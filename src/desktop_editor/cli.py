@@ -0,0 +1,591 @@
+"""Command-line interface for working with .desktop files without the GUI.
+
+Nothing in here may import GTK: these commands run in CI containers and
+scripts where GObject introspection is slow to start or not installed.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from functools import partial
+from typing import Iterable, Iterator, Optional, TextIO
+
+from desktop_editor import __version__
+from desktop_editor.desktop_file import DesktopFile, split_locale_key
+from desktop_editor.i18n import _
+
+# Files per task handed to a worker process
+VALIDATE_CHUNK_SIZE = 64
+# Below this many files a process pool costs more than it saves
+MIN_PARALLEL_FILES = 2 * VALIDATE_CHUNK_SIZE
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_URI = "https://github.com/yeager/desktop-editor"
+
+
+def expand_paths(args: Iterable[str]) -> list[str]:
+    """Expand files, directories (recursively) and glob patterns to .desktop files."""
+    paths = []
+    seen = set()
+
+    def add(path):
+        if path not in seen:
+            seen.add(path)
+            paths.append(path)
+
+    for arg in args:
+        if os.path.isdir(arg):
+            for dirpath, dirnames, filenames in os.walk(arg):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    if name.endswith(".desktop"):
+                        add(os.path.join(dirpath, name))
+        elif glob.has_magic(arg):
+            for match in sorted(glob.glob(arg, recursive=True)):
+                if os.path.isdir(match):
+                    for path in expand_paths([match]):
+                        add(path)
+                else:
+                    add(match)
+        else:
+            add(arg)
+    return paths
+
+
+# Per-process validator that records rule timings, built on first use
+_timed_validator = None
+
+
+def validate_file(path: str, timed: bool = False) -> dict:
+    """Parse and validate one file, returning a JSON-serializable record.
+
+    With *timed*, the record also carries the per-rule timings for this file.
+    """
+    from desktop_editor.parse_cache import load_cached
+
+    global _timed_validator
+    try:
+        df = load_cached(path)
+    except OSError as e:
+        return {"path": path, "error": e.strerror or str(e), "messages": []}
+    if timed:
+        from desktop_editor.validation import RuleTimings, Validator
+
+        if _timed_validator is None:
+            _timed_validator = Validator(timings=RuleTimings())
+        _timed_validator.timings.calls.clear()
+        _timed_validator.timings.ns.clear()
+        msgs = _timed_validator.validate(df)
+    else:
+        msgs = df.validate()
+    record = {
+        "path": path,
+        "messages": [{"level": m.level, "rule": m.rule, "key": m.key, "message": m.message}
+                     for m in msgs],
+    }
+    if timed:
+        record["timings"] = _timed_validator.timings.as_dict()
+    return record
+
+
+def iter_validation(paths: list[str], jobs: Optional[int] = None,
+                    timed: bool = False) -> Iterator[dict]:
+    """Yield validation records for *paths* in order, fanned out over processes."""
+    jobs = jobs or os.cpu_count() or 1
+    func = partial(validate_file, timed=timed)
+    if jobs == 1 or len(paths) < MIN_PARALLEL_FILES:
+        for path in paths:
+            yield func(path)
+        return
+    # Imported here: multiprocessing costs more to import than the rest of the CLI
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(func, paths, chunksize=VALIDATE_CHUNK_SIZE)
+
+
+class JsonLinesWriter:
+    """Write one JSON object per validated file."""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+
+    def begin(self):
+        pass
+
+    def write(self, record: dict):
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def end(self):
+        pass
+
+
+class SarifWriter:
+    """Stream a SARIF 2.1.0 log with one result per validation message."""
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self._first = True
+
+    def begin(self):
+        self.out.write(
+            '{"version": "2.1.0", "$schema": "%s", "runs": [{"tool": {"driver": '
+            '{"name": "desktop-editor", "version": "%s", "informationUri": "%s"}}, '
+            '"results": [\n' % (SARIF_SCHEMA, __version__, TOOL_URI))
+
+    def _result(self, path: str, level: str, text: str, rule: Optional[str]) -> dict:
+        result = {
+            "level": level,
+            "message": {"text": text},
+            "locations": [{"physicalLocation": {"artifactLocation": {"uri": path}}}],
+        }
+        if rule:
+            result["ruleId"] = rule
+        return result
+
+    def write(self, record: dict):
+        results = []
+        if record.get("error"):
+            results.append(self._result(record["path"], "error", record["error"], "read-error"))
+        for msg in record["messages"]:
+            results.append(self._result(record["path"], msg["level"], msg["message"],
+                                        msg.get("rule")))
+        for result in results:
+            if not self._first:
+                self.out.write(",\n")
+            self._first = False
+            self.out.write(json.dumps(result, ensure_ascii=False))
+
+    def end(self):
+        self.out.write("\n]}]}\n")
+
+
+WRITERS = {"jsonl": JsonLinesWriter, "sarif": SarifWriter}
+
+
+def dump_record(df: DesktopFile) -> dict:
+    """Return the parsed content of *df* as a JSON-serializable record."""
+    localized = {}
+    for (key, locale), value in df.localized.items():
+        localized.setdefault(key, {})[locale] = value
+    return {
+        "path": df.path,
+        "entries": dict(df.entries),
+        "localized": localized,
+        "groups": {name: dict(group) for name, group in df.extra_groups.items()},
+    }
+
+
+def cmd_dump(args) -> int:
+    paths = expand_paths(args.paths)
+    if not paths:
+        print(_("No .desktop files found"), file=sys.stderr)
+        return 2
+    from desktop_editor.parse_cache import load_cached
+
+    status = 0
+    for path in paths:
+        try:
+            record = dump_record(load_cached(path))
+        except OSError as e:
+            record = {"path": path, "error": e.strerror or str(e)}
+            status = 1
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return status
+
+
+def cmd_export(args) -> int:
+    from desktop_editor import export
+    from desktop_editor.desktop_file import iter_desktop_files
+
+    # Without paths, every installed entry; either way, one file at a time
+    paths = expand_paths(args.paths) if args.paths else iter_desktop_files()
+    errors = []
+    rows = export.iter_rows(export.iter_files(paths, errors))
+    if args.output:
+        count = export.export_to_path(rows, args.output, args.format)
+    elif export.EXPORTERS[args.format].binary:
+        count = export.export(rows, sys.stdout.buffer, args.format)
+    else:
+        count = export.export(rows, sys.stdout, args.format)
+    for path, error in errors:
+        print(f"{path}: {error}", file=sys.stderr)
+    print(_("%d rows exported") % count, file=sys.stderr)
+    return 1 if errors else 0
+
+
+def cmd_validate(args) -> int:
+    paths = expand_paths(args.paths)
+    if not paths:
+        print(_("No .desktop files found"), file=sys.stderr)
+        return 2
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    writer = WRITERS[args.format](out)
+    errors = warnings = 0
+    timings = None
+    if args.timings:
+        from desktop_editor.validation import RuleTimings
+
+        timings = RuleTimings()
+    try:
+        writer.begin()
+        for record in iter_validation(paths, args.jobs, timed=timings is not None):
+            if timings is not None and "timings" in record:
+                timings.merge(record.pop("timings"))
+            if record.get("error"):
+                errors += 1
+            for msg in record["messages"]:
+                if msg["level"] == "error":
+                    errors += 1
+                else:
+                    warnings += 1
+            writer.write(record)
+        writer.end()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(_("%(files)d files, %(errors)d errors, %(warnings)d warnings") % {
+        "files": len(paths), "errors": errors, "warnings": warnings,
+    }, file=sys.stderr)
+    if timings is not None:
+        print(timings.report(), file=sys.stderr)
+    if errors or (args.strict and warnings):
+        return 1
+    return 0
+
+
+class _AppendOperation(argparse.Action):
+    """Collect bulk-edit operations in command-line order."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        operations = getattr(namespace, self.dest, None) or []
+        if isinstance(values, str):
+            values = (values,)
+        operations.append(self.const(*values))
+        setattr(namespace, self.dest, operations)
+
+
+def _key_value(text: str) -> tuple[str, str]:
+    key, sep, value = text.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(_("expected KEY=VALUE, got %r") % text)
+    return key, value
+
+
+def _commit(result, dry_run: bool) -> int:
+    """Print a bulk edit plan and, unless *dry_run*, write it."""
+    from desktop_editor import bulk_edit
+
+    print(result.summary())
+    if dry_run:
+        return 1 if result.failed else 0
+    try:
+        result.commit()
+    except bulk_edit.BulkEditError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_get(args) -> int:
+    from desktop_editor import bulk_edit
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        print(_("No .desktop files found"), file=sys.stderr)
+        return 2
+    status = 0
+    for path, value, error in bulk_edit.read_values(paths, args.key, args.jobs):
+        if error is not None:
+            print(f"{path}: {error}", file=sys.stderr)
+            status = 2
+        elif value is None:
+            status = status or 1
+        elif len(paths) == 1:
+            print(value)
+        else:
+            print(f"{path}\t{value}")
+    return status
+
+
+def cmd_set(args) -> int:
+    from desktop_editor import bulk_edit
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        print(_("No .desktop files found"), file=sys.stderr)
+        return 2
+    operation = (bulk_edit.UnsetKey(args.key) if args.value is None
+                 else bulk_edit.SetValue(args.key, args.value))
+    return _commit(bulk_edit.plan(paths, [operation], max_workers=args.jobs), args.dry_run)
+
+
+def cmd_import_translations(args) -> int:
+    from desktop_editor import translation_import
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        print(_("No .desktop files found"), file=sys.stderr)
+        return 2
+    index = translation_import.TranslationIndex()
+    for source in args.sources:
+        try:
+            index.load(source)
+        except (OSError, ValueError) as e:
+            print(f"{source}: {getattr(e, 'strerror', None) or e}", file=sys.stderr)
+            return 2
+    result, coverage = translation_import.import_translations(
+        paths, index, overwrite=args.overwrite, max_workers=args.jobs)
+    status = _commit(result, args.dry_run)
+    report = coverage.report()
+    if report:
+        print(report)
+    return status
+
+
+def cmd_extract_pot(args) -> int:
+    from desktop_editor import translation_import
+
+    paths = expand_paths(args.paths)
+    if not paths:
+        print(_("No .desktop files found"), file=sys.stderr)
+        return 2
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        count, errors = translation_import.extract_pot(paths, out, max_workers=args.jobs)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    for path, error in errors:
+        print(f"{path}: {error}", file=sys.stderr)
+    print(_("%d messages") % count, file=sys.stderr)
+    return 1 if errors else 0
+
+
+def cmd_coverage(args) -> int:
+    from desktop_editor.desktop_file import TRANSLATABLE_KEYS
+    from desktop_editor.discovery import iter_discovered
+    from desktop_editor.translation_coverage import CoverageMatrix
+
+    if args.paths:
+        items = [(path, path, None) for path in expand_paths(args.paths)]
+        if not items:
+            print(_("No .desktop files found"), file=sys.stderr)
+            return 2
+    else:
+        items = ((found.desktop_id, found.path, found.stat) for found in iter_discovered())
+    matrix = CoverageMatrix()
+    errors = matrix.load(items)
+    for path, error in errors:
+        print(f"{path}: {error}", file=sys.stderr)
+
+    if args.missing:
+        parsed = split_locale_key(args.missing)
+        if parsed is None or parsed[0] not in TRANSLATABLE_KEYS:
+            print(_("expected a translatable KEY[LOCALE], got %r") % args.missing,
+                  file=sys.stderr)
+            return 2
+        for entry_id in matrix.missing(parsed[1], parsed[0]):
+            print(entry_id)
+    elif args.format == "jsonl":
+        for locale in matrix.locales():
+            record = {"locale": locale}
+            for cell in matrix.cells(locale):
+                record[cell.key] = {"translated": cell.translated, "total": cell.total}
+            print(json.dumps(record, ensure_ascii=False))
+    else:
+        width = max([len(locale) for locale in matrix.locales()] + [6])
+        print(f"{_('Locale'):<{width}}" + "".join(f"  {key:>16}" for key in TRANSLATABLE_KEYS))
+        for locale in matrix.locales():
+            print(f"{locale:<{width}}" + "".join(
+                f"  {f'{cell.translated}/{cell.total} {cell.percent:3d}%' if cell.total else '-':>16}"
+                for cell in matrix.cells(locale)))
+    print(_("%(entries)d entries, %(locales)d locales") % {
+        "entries": len(matrix), "locales": len(matrix.locales()),
+    }, file=sys.stderr)
+    return 1 if errors else 0
+
+
+def cmd_bulk(args) -> int:
+    from desktop_editor import bulk_edit
+
+    if args.recover:
+        for path in bulk_edit.recover():
+            print(_("restored %s") % path)
+        return 0
+    if not args.operations:
+        print(_("No operations given"), file=sys.stderr)
+        return 2
+    paths = expand_paths(args.paths)
+    if not paths:
+        print(_("No .desktop files found"), file=sys.stderr)
+        return 2
+    return _commit(bulk_edit.plan(paths, args.operations, max_workers=args.jobs),
+                   args.dry_run)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="desktop-editor",
+        description=_("Edit and validate .desktop files."),
+    )
+    parser.add_argument("--version", action="version", version=__version__)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("validate", help=_("validate .desktop files against the spec"))
+    p.add_argument("paths", nargs="+", metavar="PATH",
+                   help=_("files, directories or glob patterns"))
+    p.add_argument("-f", "--format", choices=sorted(WRITERS), default="jsonl",
+                   help=_("output format (default: jsonl)"))
+    p.add_argument("-o", "--output", metavar="FILE",
+                   help=_("write results to FILE instead of stdout"))
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help=_("number of worker processes (default: all CPUs)"))
+    p.add_argument("--strict", action="store_true",
+                   help=_("exit non-zero on warnings as well as errors"))
+    p.add_argument("--timings", action="store_true",
+                   help=_("print the time spent in each validation rule to stderr"))
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("dump", help=_("print the parsed content of .desktop files as JSON"))
+    p.add_argument("paths", nargs="+", metavar="PATH",
+                   help=_("files, directories or glob patterns"))
+    p.set_defaults(func=cmd_dump)
+
+    p = sub.add_parser("export", help=_("export every key of many .desktop files"),
+                       description=_("Writes one row per value: path, group, key, "
+                                     "locale and value. Without PATH, exports every "
+                                     "installed entry."))
+    p.add_argument("paths", nargs="*", metavar="PATH",
+                   help=_("files, directories or glob patterns"))
+    p.add_argument("-f", "--format", choices=("jsonl", "csv", "columnar"), default="jsonl",
+                   help=_("output format (default: jsonl)"))
+    p.add_argument("-o", "--output", metavar="FILE",
+                   help=_("write to FILE instead of stdout"))
+    p.set_defaults(func=cmd_export)
+
+    from desktop_editor import bulk_edit
+
+    p = sub.add_parser("bulk", help=_("apply the same edits to many .desktop files"),
+                       description=_("Operations are applied in the order given. All "
+                                     "changed files are written, or none are."))
+    p.add_argument("paths", nargs="*", metavar="PATH",
+                   help=_("files, directories or glob patterns"))
+    p.add_argument("--set", dest="operations", action=_AppendOperation,
+                   const=bulk_edit.SetValue, type=_key_value, metavar="KEY=VALUE",
+                   help=_("set KEY (e.g. Name, Name[sv] or "
+                          "'Desktop Action new/Exec') to VALUE"))
+    p.add_argument("--unset", dest="operations", action=_AppendOperation,
+                   const=bulk_edit.UnsetKey, metavar="KEY", help=_("remove KEY"))
+    p.add_argument("--add", dest="operations", action=_AppendOperation,
+                   const=bulk_edit.AddToList, type=_key_value, metavar="KEY=VALUE",
+                   help=_("add VALUE to a list key such as Categories"))
+    p.add_argument("--remove", dest="operations", action=_AppendOperation,
+                   const=bulk_edit.RemoveFromList, type=_key_value, metavar="KEY=VALUE",
+                   help=_("remove VALUE from a list key"))
+    p.add_argument("--replace-prefix", dest="operations", action=_AppendOperation,
+                   const=bulk_edit.ReplacePrefix, nargs=3, metavar=("KEY", "OLD", "NEW"),
+                   help=_("replace a leading OLD with NEW in KEY, e.g. Exec"))
+    p.add_argument("-n", "--dry-run", action="store_true",
+                   help=_("show what would change without writing anything"))
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help=_("number of I/O threads"))
+    p.add_argument("--recover", action="store_true",
+                   help=_("roll back a bulk edit interrupted by a crash"))
+    p.set_defaults(func=cmd_bulk)
+
+    key_help = _("key path: Name, Name[sv], or 'GROUP/KEY' for another group, "
+                 "e.g. 'Desktop Action new-window/Exec'")
+    p = sub.add_parser("get", help=_("print the value of a key in .desktop files"),
+                       description=_("Prints the value alone for one file, and PATH<tab>"
+                                     "VALUE for several. Exits 1 if a file lacks the key."))
+    p.add_argument("key", metavar="KEY", help=key_help)
+    p.add_argument("paths", nargs="+", metavar="PATH",
+                   help=_("files, directories or glob patterns"))
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help=_("number of I/O threads"))
+    p.set_defaults(func=cmd_get)
+
+    for name, help_text in [("set", _("set a key in .desktop files")),
+                            ("unset", _("remove a key from .desktop files"))]:
+        p = sub.add_parser(name, help=help_text,
+                           description=_("All changed files are written, or none are."))
+        p.add_argument("key", metavar="KEY", help=key_help)
+        if name == "set":
+            p.add_argument("value", metavar="VALUE")
+        p.add_argument("paths", nargs="+", metavar="PATH",
+                       help=_("files, directories or glob patterns"))
+        p.add_argument("-n", "--dry-run", action="store_true",
+                       help=_("show what would change without writing anything"))
+        p.add_argument("-j", "--jobs", type=int, default=None,
+                       help=_("number of I/O threads"))
+        p.set_defaults(func=cmd_set, value=None)
+
+    p = sub.add_parser("import-translations",
+                       help=_("merge translations from .po or CSV files into .desktop files"),
+                       description=_("Fills in Name, GenericName, Comment, Keywords and "
+                                     "action names from the sources. A CSV source has a "
+                                     "msgid column and one column per locale. All changed "
+                                     "files are written, or none are."))
+    p.add_argument("paths", nargs="+", metavar="PATH",
+                   help=_("files, directories or glob patterns"))
+    p.add_argument("-s", "--source", dest="sources", action="append", required=True,
+                   metavar="FILE", help=_("a .po or .csv file; may be repeated"))
+    p.add_argument("--overwrite", action="store_true",
+                   help=_("replace translations the files already have"))
+    p.add_argument("-n", "--dry-run", action="store_true",
+                   help=_("show what would change without writing anything"))
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help=_("number of I/O threads"))
+    p.set_defaults(func=cmd_import_translations)
+
+    p = sub.add_parser("extract-pot",
+                       help=_("write a .pot template of the translatable strings"))
+    p.add_argument("paths", nargs="+", metavar="PATH",
+                   help=_("files, directories or glob patterns"))
+    p.add_argument("-o", "--output", metavar="FILE",
+                   help=_("write to FILE instead of stdout"))
+    p.add_argument("-j", "--jobs", type=int, default=None,
+                   help=_("number of I/O threads"))
+    p.set_defaults(func=cmd_extract_pot)
+
+    p = sub.add_parser("coverage", help=_("report translation coverage by locale and key"),
+                       description=_("Counts, for every locale, how many entries translate "
+                                     "each of Name, GenericName, Comment and Keywords. "
+                                     "Without PATH, reports on every installed entry."))
+    p.add_argument("paths", nargs="*", metavar="PATH",
+                   help=_("files, directories or glob patterns"))
+    p.add_argument("-f", "--format", choices=("text", "jsonl"), default="text",
+                   help=_("output format (default: text)"))
+    p.add_argument("--missing", metavar="KEY[LOCALE]",
+                   help=_("list the entries lacking one translation, e.g. Name[de]"))
+    p.set_defaults(func=cmd_coverage)
+    return parser
+
+
+# Option spellings of the subcommands, e.g. "desktop-editor --dump FILE"
+OPTION_ALIASES = {
+    "--dump": ["dump"],
+    "--validate": ["validate"],
+    "--set": ["bulk", "--set"],
+}
+
+# The subcommands of build_parser(), for handles()
+COMMANDS = frozenset({"validate", "dump", "export", "bulk", "get", "set", "unset",
+                      "import-translations", "extract-pot", "coverage"})
+
+
+def handles(argv: list[str]) -> bool:
+    """Whether *argv* (without the program name) is for :func:`main`, not the GUI."""
+    return bool(argv) and (argv[0] in COMMANDS or argv[0] in OPTION_ALIASES)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in OPTION_ALIASES:
+        argv[:1] = OPTION_ALIASES[argv[0]]
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -1,8 +1,11 @@
 """Parser and model for .desktop files (freedesktop.org Desktop Entry spec)."""
+import functools
+import mmap
 import os
 import re
 from collections import OrderedDict
-from typing import Optional
+from collections.abc import MutableMapping
+from typing import Iterable, Iterator, Optional, Union
 
 from desktop_editor.i18n import _
 
@@ -17,6 +20,9 @@ STANDARD_KEYS = {
 
 REQUIRED_KEYS = {"Type", "Name"}
 
+# Human-readable text keys that translators work on
+TRANSLATABLE_KEYS = ("Name", "GenericName", "Comment", "Keywords")
+
 VALID_TYPES = {"Application", "Link", "Directory"}
 
 # freedesktop.org main categories
@@ -26,19 +32,179 @@ MAIN_CATEGORIES = [
     "Utility",
 ]
 
-LOCALE_KEY_RE = re.compile(r"^([A-Za-z]+)\[([a-zA-Z_@.]+)\]$")
+LOCALE_KEY_RE = re.compile(r"^([A-Za-z]+)\[([a-zA-Z0-9_@.-]+)\]$")
+
+# Localized key -> (key, locale), or None if it is not a valid localized key.
+# The same few thousand "Name[de]"-style keys recur in every file on a system,
+# so the regex only ever runs once per distinct key.
+_locale_key_cache: dict[str, Optional[tuple[str, str]]] = {}
+_LOCALE_KEY_CACHE_MAX = 65536
+
+
+def split_locale_key(key: str) -> Optional[tuple[str, str]]:
+    """Split ``Key[locale]`` into ``(key, locale)``; None for plain keys."""
+    try:
+        return _locale_key_cache[key]
+    except KeyError:
+        pass
+    m = LOCALE_KEY_RE.match(key)
+    result = (m.group(1), m.group(2)) if m else None
+    if len(_locale_key_cache) >= _LOCALE_KEY_CACHE_MAX:
+        _locale_key_cache.clear()
+    _locale_key_cache[key] = result
+    return result
+
+
+_ESCAPES = {"s": " ", "n": "\n", "t": "\t", "r": "\r", "\\": "\\"}
+_ESCAPE_RE = re.compile(r"\\(.)")
+_BACKSLASH_RE = re.compile(r"\\(?!;)")
+
+
+def unescape_value(value: str) -> str:
+    """Resolve the ``\\s``, ``\\n``, ``\\t``, ``\\r`` and ``\\\\`` escapes of a value.
+
+    Unknown escapes, such as ``\\;`` in lists, are kept as they are.
+    """
+    if "\\" not in value:
+        return value
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(0)), value)
+
+
+def escape_value(text: str) -> str:
+    """Escape *text* for a value line; the inverse of :func:`unescape_value`.
+
+    A ``\\;`` list escape is left alone, as :func:`unescape_value` keeps it.
+    """
+    text = (_BACKSLASH_RE.sub(r"\\\\", text).replace("\n", "\\n")
+            .replace("\t", "\\t").replace("\r", "\\r"))
+    # The parser strips surrounding blanks
+    if text[:1] == " ":
+        text = "\\s" + text[1:]
+    if text[-1:] == " ":
+        text = text[:-1] + "\\s"
+    return text
 
 
 class ValidationMessage:
     """A validation warning or error."""
-    def __init__(self, level: str, message: str):
+    def __init__(self, level: str, message: str, rule: Optional[str] = None,
+                 key: Optional[str] = None):
         self.level = level  # "error" or "warning"
         self.message = message
+        self.rule = rule  # id of the validation rule that produced it
+        self.key = key  # main-group key the message is about, if any
 
     def __repr__(self):
         return f"[{self.level.upper()}] {self.message}"
 
 
+class TranslationStore(MutableMapping):
+    """Mapping of (key, locale) -> value indexed by key and by locale.
+
+    Behaves like the flat ``dict[(key, locale)] -> value`` it replaces, but
+    keeps a per-key and a per-locale index so that looking up all
+    translations of a key, listing locales or dropping a locale costs
+    O(result size) instead of a scan over every translation.
+    """
+
+    __slots__ = ("_by_key", "_by_locale", "_len")
+
+    def __init__(self, items=None):
+        # key -> {locale: value}
+        self._by_key: dict[str, dict[str, str]] = {}
+        # locale -> {key: None} (an insertion-ordered set)
+        self._by_locale: dict[str, dict[str, None]] = {}
+        self._len = 0
+        if items:
+            self.update(items)
+
+    def __getitem__(self, item: tuple[str, str]) -> str:
+        key, locale = item
+        try:
+            return self._by_key[key][locale]
+        except KeyError:
+            raise KeyError(item) from None
+
+    def __setitem__(self, item: tuple[str, str], value: str):
+        key, locale = item
+        values = self._by_key.get(key)
+        if values is None:
+            values = self._by_key[key] = {}
+        if locale not in values:
+            self._len += 1
+            self._by_locale.setdefault(locale, {})[key] = None
+        values[locale] = value
+
+    def __delitem__(self, item: tuple[str, str]):
+        key, locale = item
+        values = self._by_key.get(key)
+        if values is None or locale not in values:
+            raise KeyError(item)
+        del values[locale]
+        if not values:
+            del self._by_key[key]
+        keys = self._by_locale[locale]
+        del keys[key]
+        if not keys:
+            del self._by_locale[locale]
+        self._len -= 1
+
+    def __contains__(self, item) -> bool:
+        try:
+            key, locale = item
+        except (TypeError, ValueError):
+            return False
+        values = self._by_key.get(key)
+        return values is not None and locale in values
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        for key, values in self._by_key.items():
+            for locale in values:
+                yield key, locale
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def clear(self):
+        self._by_key.clear()
+        self._by_locale.clear()
+        self._len = 0
+
+    def copy(self) -> "TranslationStore":
+        return type(self)(self.items())
+
+    def for_key(self, key: str) -> dict[str, str]:
+        """Return {locale: value} for *key*."""
+        return dict(self._by_key.get(key, ()))
+
+    def for_locale(self, locale: str) -> dict[str, str]:
+        """Return {key: value} for *locale*."""
+        return {k: self._by_key[k][locale] for k in self._by_locale.get(locale, ())}
+
+    def keys_with_translations(self) -> list[str]:
+        """Return the keys that have at least one translation."""
+        return list(self._by_key)
+
+    def locales(self) -> list[str]:
+        """Return the locales that have at least one translation."""
+        return list(self._by_locale)
+
+    def remove_locale(self, locale: str):
+        """Drop every translation for *locale*."""
+        keys = self._by_locale.pop(locale, None)
+        if not keys:
+            return
+        for key in keys:
+            values = self._by_key[key]
+            del values[locale]
+            if not values:
+                del self._by_key[key]
+        self._len -= len(keys)
+
+
 class DesktopFile:
     """Represents a parsed .desktop file."""
 
@@ -47,9 +213,11 @@ class DesktopFile:
         # Main group entries: key -> value
         self.entries: OrderedDict[str, str] = OrderedDict()
         # Localized entries: (key, locale) -> value
-        self.localized: dict[tuple[str, str], str] = {}
+        self.localized: TranslationStore = TranslationStore()
         # Extra groups (actions, etc.): group_name -> OrderedDict
         self.extra_groups: OrderedDict[str, OrderedDict] = OrderedDict()
+        # Text the file was parsed from; saving patches it in place
+        self.source: Optional[str] = None
 
     @classmethod
     def new_application(cls) -> "DesktopFile":
@@ -64,77 +232,127 @@ class DesktopFile:
         df.entries["Terminal"] = "false"
         return df
 
+    def copy(self) -> "DesktopFile":
+        """Return an independent copy of this file's content."""
+        df = type(self)()
+        df.path = self.path
+        df.source = self.source
+        df.entries = OrderedDict(self.entries)
+        df.localized = self.localized.copy()
+        df.extra_groups = OrderedDict(
+            (name, OrderedDict(group)) for name, group in self.extra_groups.items())
+        return df
+
     @classmethod
     def load(cls, path: str) -> "DesktopFile":
         """Parse a .desktop file from disk."""
+        # newline="" keeps \r\n intact so an unchanged file saves identically
+        with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            return cls.from_string(f.read(), path)
+
+    @classmethod
+    def from_string(cls, text: str, path: Optional[str] = None) -> "DesktopFile":
+        """Parse the contents of a .desktop file in a single pass.
+
+        Only keys ending in ``]`` inside the main group are checked for a
+        ``[locale]`` suffix; everything else is a plain partition on ``=``.
+        """
         df = cls()
         df.path = path
-        current_group = None
-
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            for line in f:
-                line = line.rstrip("\n\r")
-                if not line or line.startswith("#"):
-                    continue
-                if line.startswith("[") and line.endswith("]"):
-                    current_group = line[1:-1]
-                    if current_group != "Desktop Entry":
-                        df.extra_groups.setdefault(current_group, OrderedDict())
-                    continue
-                if "=" not in line:
+        df.source = text
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+        entries = df.entries
+        localized = df.localized
+        extra_groups = df.extra_groups
+        # Keys before any group header belong to the main group
+        target = entries
+        in_main = True
+
+        for line in text.split("\n"):
+            if not line or line[0] == "#":
+                continue
+            if line[0] == "[" and line[-1] == "]":
+                group = line[1:-1]
+                in_main = group == "Desktop Entry"
+                if in_main:
+                    target = entries
+                else:
+                    target = extra_groups.get(group)
+                    if target is None:
+                        target = extra_groups[group] = OrderedDict()
+                continue
+            key, sep, value = line.partition("=")
+            if not sep:
+                continue
+            key = key.strip()
+            value = value.strip()
+            if in_main and key[-1:] == "]":
+                split = split_locale_key(key)
+                if split is not None:
+                    localized[split] = value
                     continue
-                key, _, value = line.partition("=")
-                key = key.strip()
-                value = value.strip()
-
-                m = LOCALE_KEY_RE.match(key)
-                if current_group == "Desktop Entry" or current_group is None:
-                    if m:
-                        df.localized[(m.group(1), m.group(2))] = value
-                    else:
-                        df.entries[key] = value
-                elif current_group in df.extra_groups:
-                    df.extra_groups[current_group][key] = value
+            target[key] = value
 
         return df
 
     def save(self, path: Optional[str] = None):
-        """Write .desktop file to disk."""
+        """Write .desktop file to disk.
+
+        The file is written to a temporary file next to *path*, fsynced and
+        renamed over the target, so readers never see a partial write. If
+        *path* already holds exactly this content it is not touched at all.
+        """
         path = path or self.path
         if not path:
             raise ValueError(_("No file path specified"))
         self.path = path
-
-        lines = ["[Desktop Entry]\n"]
+        text = "".join(self.iter_lines())
+        try:
+            with open(path, "rb") as f:
+                unchanged = f.read() == text.encode("utf-8")
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            write_atomic(path, (text,))
+        self.source = text
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield the serialized lines of the file, with line endings.
+
+        A file parsed from text is rendered by patching that text, keeping
+        comments, layout and unknown lines; see :mod:`desktop_editor.document`.
+        """
+        if self.source is not None:
+            from desktop_editor.document import render
+
+            yield from render(self, self.source)
+            return
+        yield "[Desktop Entry]\n"
         for key, value in self.entries.items():
-            lines.append(f"{key}={value}\n")
+            yield f"{key}={value}\n"
             # Write localized versions right after the base key
-            for (lkey, locale), lvalue in sorted(self.localized.items()):
-                if lkey == key:
-                    lines.append(f"{lkey}[{locale}]={lvalue}\n")
+            translations = self.localized.for_key(key)
+            for locale in sorted(translations):
+                yield f"{key}[{locale}]={translations[locale]}\n"
+        # Translations of keys the entry does not have
+        for key, locale in sorted(self.localized):
+            if key not in self.entries:
+                yield f"{key}[{locale}]={self.localized[(key, locale)]}\n"
 
         for group_name, group_entries in self.extra_groups.items():
-            lines.append(f"\n[{group_name}]\n")
+            yield f"\n[{group_name}]\n"
             for key, value in group_entries.items():
-                lines.append(f"{key}={value}\n")
-
-        with open(path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
+                yield f"{key}={value}\n"
 
     def get_locales(self) -> list[str]:
         """Return sorted list of all locales used."""
-        locales = set()
-        for _, locale in self.localized:
-            locales.add(locale)
-        return sorted(locales)
+        return sorted(self.localized.locales())
 
     def get_translations(self, key: str) -> dict[str, str]:
         """Return {locale: value} for a given key."""
-        result = {}
-        for (k, locale), value in self.localized.items():
-            if k == key:
-                result[locale] = value
-        return result
+        return self.localized.for_key(key)
 
     def set_translation(self, key: str, locale: str, value: str):
         self.localized[(key, locale)] = value
@@ -143,61 +361,187 @@ class DesktopFile:
         self.localized.pop((key, locale), None)
 
     def remove_locale(self, locale: str):
-        to_remove = [(k, l) for k, l in self.localized if l == locale]
-        for key in to_remove:
-            del self.localized[key]
+        self.localized.remove_locale(locale)
 
     def validate(self) -> list[ValidationMessage]:
         """Validate against freedesktop.org spec."""
-        msgs = []
-
-        # Required keys
-        for key in REQUIRED_KEYS:
-            if key not in self.entries or not self.entries[key]:
-                msgs.append(ValidationMessage("error", _("Missing required key: %s") % key))
-
-        # Type check
-        dtype = self.entries.get("Type", "")
-        if dtype and dtype not in VALID_TYPES:
-            msgs.append(ValidationMessage("error", _("Invalid Type: %s") % dtype))
-
-        # Exec check for Application
-        if dtype == "Application":
-            if not self.entries.get("Exec"):
-                msgs.append(ValidationMessage("warning", _("Application type should have an Exec key")))
-
-        # URL check for Link
-        if dtype == "Link":
-            if not self.entries.get("URL"):
-                msgs.append(ValidationMessage("warning", _("Link type should have a URL key")))
-
-        # Icon warning
-        if not self.entries.get("Icon"):
-            msgs.append(ValidationMessage("warning", _("No icon specified")))
-
-        # Categories warning
-        if dtype == "Application" and not self.entries.get("Categories"):
-            msgs.append(ValidationMessage("warning", _("No categories specified")))
-
-        # Check for unknown keys
-        for key in self.entries:
-            if key not in STANDARD_KEYS and not key.startswith("X-"):
-                msgs.append(ValidationMessage("warning", _("Non-standard key: %s") % key))
-
-        return msgs
+        from desktop_editor.validation import validate
+
+        return validate(self)
+
+
+def write_atomic(path: str, lines: Union[Iterable[str], bytes]):
+    """Stream *lines* to *path* via a temporary file and an atomic rename.
+
+    *lines* may also be a ``bytes`` object, written verbatim. A symlink is
+    followed, so its target is replaced and the link stays. The temporary
+    file lives in the target's directory so the final ``os.replace`` never
+    crosses a filesystem. An existing target keeps its permission bits and,
+    where we may set it, its owner; new files are created 0644.
+    """
+    # Imported here: tempfile pulls in random and shutil, which read-only
+    # command-line use does not need
+    import tempfile
+
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o644)
+        else:
+            os.chmod(tmp_path, st.st_mode & 0o7777)
+            if (st.st_uid, st.st_gid) != (os.getuid(), os.getgid()):
+                try:
+                    os.chown(tmp_path, st.st_uid, st.st_gid)
+                except PermissionError:
+                    # Only root may give a file away; the group may still fit
+                    try:
+                        os.chown(tmp_path, -1, st.st_gid)
+                    except PermissionError:
+                        pass
+        if isinstance(lines, bytes):
+            f, lines = open(fd, "wb"), (lines,)
+        else:
+            f = open(fd, "w", encoding="utf-8", newline="")
+        with f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(directory)
+
+
+def _fsync_dir(directory: str):
+    """Flush a directory entry so a rename survives a crash (best effort)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# Keys most catalog-wide tasks need from every installed entry
+SCAN_KEYS = ("Name", "NoDisplay", "Hidden", "Categories", "Icon")
+
+_MAIN_HEADER = b"[Desktop Entry]"
+_LONE_CR_RE = re.compile(b"\r(?!\n)")
+
+
+def _main_spans(buf, size: int) -> list[tuple[int, int]]:
+    """Return the ``[start, end)`` byte ranges of the main group in *buf*.
+
+    Keys before the first header belong to the main group, as in the parser.
+    """
+    spans = []
+    start, in_main = 0, True
+    if buf[:1] == b"[":
+        pos = 0
+    else:
+        pos = buf.find(b"\n[")
+        if pos >= 0:
+            pos += 1
+    while pos >= 0:
+        line_end = buf.find(b"\n", pos)
+        if line_end < 0:
+            line_end = size
+        end = line_end - 1 if buf[line_end - 1:line_end] == b"\r" else line_end
+        if buf[end - 1:end] == b"]":
+            if in_main and pos > start:
+                spans.append((start, pos))
+            in_main = buf[pos:end] == _MAIN_HEADER
+            start = line_end
+        pos = buf.find(b"\n[", line_end)
+        if pos >= 0:
+            pos += 1
+    if in_main and start < size:
+        spans.append((start, size))
+    return spans
+
+
+@functools.lru_cache(maxsize=32)
+def _scan_pattern(keys: tuple[str, ...], localized: tuple[str, ...]) -> re.Pattern:
+    """Compile one multiline pattern matching any wanted key line."""
+    alternatives = [re.escape(k.encode()) for k in keys]
+    if localized:
+        # Same locale syntax as LOCALE_KEY_RE
+        alternatives.append(b"(?:" + b"|".join(re.escape(k.encode()) for k in localized)
+                            + b")\\[[a-zA-Z0-9_@.-]+\\]")
+    # Anchoring on a literal newline instead of a MULTILINE "^" lets the
+    # engine skip straight to line starts
+    return re.compile(b"\n[ \t]*(" + b"|".join(alternatives) + b")[ \t]*=([^\n]*)")
+
+
+def scan_buffer(buf, keys: Iterable[str] = SCAN_KEYS,
+                localized: Iterable[str] = ()) -> dict[str, str]:
+    """Find *keys* in the main group of .desktop bytes without parsing them.
+
+    Returns ``{key: value}`` for the keys present. For each key in
+    *localized*, every ``Key[locale]`` line is returned as well, under its
+    full ``"Key[locale]"`` name. *buf* may be any bytes-like object,
+    including an ``mmap``; it is searched in place and only matched values
+    are copied and decoded. As in the parser, the last occurrence of a key
+    wins.
+    """
+    if buf.find(b"\r") >= 0 and _LONE_CR_RE.search(buf):
+        # A lone \r ends a line, as in the parser: normalize through a copy.
+        # \r\n is left alone; the \r is stripped from the value.
+        buf = _LONE_CR_RE.sub(b"\n", bytes(buf))
+    pattern = _scan_pattern(tuple(keys), tuple(localized))
+    found: dict[bytes, bytes] = {}
+    for start, end in _main_spans(buf, len(buf)):
+        if start == 0:
+            # The first line has no newline before it
+            first_end = buf.find(b"\n")
+            m = pattern.match(b"\n" + buf[:first_end if first_end >= 0 else len(buf)])
+            if m:
+                found[m.group(1)] = m.group(2)
+        for m in pattern.finditer(buf, start, end):
+            found[m.group(1)] = m.group(2)
+    return {key.decode(): value.decode("utf-8", "replace").strip()
+            for key, value in found.items()}
+
+
+def scan_keys(path: str, keys: Iterable[str] = SCAN_KEYS,
+              localized: Iterable[str] = ()) -> dict[str, str]:
+    """Like :func:`scan_buffer`, over a memory-mapped file.
+
+    Much cheaper than :meth:`DesktopFile.load` when only a few keys are
+    needed, e.g. for sidebar labels and search across every installed entry.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return scan_buffer(buf, keys, localized)
+
+
+def iter_desktop_files() -> Iterator[str]:
+    """Yield .desktop files from the XDG data directories as they are found.
+
+    Only the winning file for each desktop-file ID is yielded; see
+    :mod:`desktop_editor.discovery`.
+    """
+    from desktop_editor.discovery import iter_discovered
+
+    for found in iter_discovered():
+        yield found.path
 
 
 def list_desktop_files() -> list[str]:
-    """List .desktop files from standard locations."""
-    dirs = [
-        "/usr/share/applications",
-        "/usr/local/share/applications",
-        os.path.expanduser("~/.local/share/applications"),
-    ]
-    files = []
-    for d in dirs:
-        if os.path.isdir(d):
-            for entry in sorted(os.listdir(d)):
-                if entry.endswith(".desktop"):
-                    files.append(os.path.join(d, entry))
-    return files
+    """List .desktop files from the XDG data directories."""
+    return list(iter_desktop_files())
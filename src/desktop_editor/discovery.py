@@ -0,0 +1,126 @@
+"""Discovery of installed .desktop files across the XDG data directories.
+
+Implements the lookup rules of the Desktop Entry spec: every
+``$XDG_DATA_HOME`` / ``$XDG_DATA_DIRS`` entry contributes an
+``applications`` tree, a file's desktop-file ID is its path relative to that
+tree with ``/`` replaced by ``-``, and the first directory in precedence order
+that provides an ID shadows all later ones.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, NamedTuple, Optional
+
+DEFAULT_DATA_DIRS = "/usr/local/share:/usr/share"
+
+
+class DiscoveredFile(NamedTuple):
+    """A .desktop file that won the shadowing resolution for its ID."""
+    desktop_id: str
+    path: str
+    # Result of DirEntry.stat() taken during the scan (symlinks followed)
+    stat: os.stat_result
+    # Index of the applications directory it came from (0 = highest priority)
+    priority: int
+
+
+def xdg_data_dirs() -> list[str]:
+    """Return the XDG data directories, highest precedence first."""
+    home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    system = os.environ.get("XDG_DATA_DIRS") or DEFAULT_DATA_DIRS
+    dirs = []
+    for d in [home] + system.split(":"):
+        # The spec requires absolute paths; relative ones are ignored
+        if d and os.path.isabs(d):
+            d = os.path.normpath(d)
+            if d not in dirs:
+                dirs.append(d)
+    return dirs
+
+
+def application_dirs() -> list[str]:
+    """Return the ``applications`` directories, highest precedence first."""
+    return [os.path.join(d, "applications") for d in xdg_data_dirs()]
+
+
+def scan_applications_dir(root: str, prefix: str = "",
+                          subdirs_out: Optional[list[str]] = None,
+                          ) -> list[tuple[str, str, os.stat_result]]:
+    """Recursively list ``(desktop_id, path, stat)`` for .desktop files in *root*.
+
+    Entries are returned in a stable order (sorted per directory, files
+    before subdirectories). Symlinked directories are followed once. *prefix*
+    is prepended to every ID, for scanning a subdirectory of an
+    ``applications`` tree. Every directory visited is appended to
+    *subdirs_out* if given.
+    """
+    results = []
+    seen_dirs = set()
+
+    def walk(directory: str, prefix: str):
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return
+        subdirs = []
+        if subdirs_out is not None and directory != root:
+            subdirs_out.append(directory)
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    subdirs.append(entry)
+                elif entry.name.endswith(".desktop") and entry.is_file():
+                    results.append((prefix + entry.name, entry.path, entry.stat()))
+            except OSError:
+                # Dangling symlink or a file removed mid-scan
+                continue
+        for entry in subdirs:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) in seen_dirs:
+                continue
+            seen_dirs.add((st.st_dev, st.st_ino))
+            walk(entry.path, prefix + entry.name + "-")
+
+    try:
+        st = os.stat(root)
+    except OSError:
+        return results
+    seen_dirs.add((st.st_dev, st.st_ino))
+    if subdirs_out is not None:
+        subdirs_out.append(root)
+    walk(root, prefix)
+    return results
+
+
+def iter_discovered(dirs: Optional[list[str]] = None,
+                    max_workers: Optional[int] = None) -> Iterator[DiscoveredFile]:
+    """Yield the winning file for every desktop-file ID.
+
+    All directories are scanned concurrently, but results are consumed in
+    precedence order, so each directory's files are yielded as soon as it and
+    every higher-precedence directory have been scanned.
+    """
+    if dirs is None:
+        dirs = application_dirs()
+    if not dirs:
+        return
+    seen_ids = set()
+    workers = max_workers or min(8, len(dirs))
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="desktop-discovery") as pool:
+        futures = [pool.submit(scan_applications_dir, d) for d in dirs]
+        for priority, future in enumerate(futures):
+            for desktop_id, path, st in future.result():
+                if desktop_id in seen_ids:
+                    continue
+                seen_ids.add(desktop_id)
+                yield DiscoveredFile(desktop_id, path, st, priority)
+
+
+def discover_desktop_files(dirs: Optional[list[str]] = None,
+                           max_workers: Optional[int] = None) -> list[DiscoveredFile]:
+    """Return the winning file for every desktop-file ID, sorted by ID."""
+    return sorted(iter_discovered(dirs, max_workers), key=lambda f: f.desktop_id)
@@ -0,0 +1,168 @@
+"""Lossless, line-level syntax tree of .desktop source text.
+
+:class:`~desktop_editor.desktop_file.DesktopFile` keeps the text it was
+parsed from. On save, :func:`render` walks that text line by line and
+patches it against the current model. Untouched lines, comments, blank
+lines, unknown lines, ordering and line endings are kept as they were. Only
+changed values are rewritten, removed keys and groups are dropped, and new
+keys are inserted next to their relatives.
+"""
+import re
+from typing import Iterator, NamedTuple, Optional
+
+from desktop_editor.desktop_file import DesktopFile, split_locale_key
+
+# Line kinds
+BLANK = "blank"
+COMMENT = "comment"
+GROUP = "group"
+KEY = "key"
+OTHER = "other"
+
+MAIN_GROUP = "Desktop Entry"
+
+_EOL_RE = re.compile(r"(\r\n|\r|\n)")
+
+
+class Line(NamedTuple):
+    """One source line and what it means to the parser."""
+
+    kind: str
+    text: str
+    eol: str
+    # Group the line belongs to (a header belongs to its own group)
+    group: str
+    # KEY lines: the key, or (key, locale) for a main-group translation
+    item: object = None
+    # KEY lines: offset of the value within *text*
+    value_start: int = 0
+
+
+def parse(text: str) -> list[Line]:
+    """Split *text* into classified lines.
+
+    Classification mirrors :meth:`DesktopFile.from_string` exactly, so every
+    value the parser stored can be traced back to the line it came from.
+    """
+    parts = _EOL_RE.split(text)
+    if len(parts) > 1 and parts[-1] == "":
+        parts.pop()
+    lines = []
+    group = MAIN_GROUP
+    for i in range(0, len(parts), 2):
+        line = parts[i]
+        eol = parts[i + 1] if i + 1 < len(parts) else ""
+        if not line:
+            lines.append(Line(BLANK, line, eol, group))
+        elif line[0] == "#":
+            lines.append(Line(COMMENT, line, eol, group))
+        elif line[0] == "[" and line[-1] == "]":
+            group = line[1:-1]
+            lines.append(Line(GROUP, line, eol, group))
+        else:
+            key, sep, value = line.partition("=")
+            if not sep:
+                lines.append(Line(OTHER, line, eol, group))
+                continue
+            key = key.strip()
+            item = key
+            if group == MAIN_GROUP and key[-1:] == "]":
+                item = split_locale_key(key) or key
+            start = len(line) - len(value.lstrip()) if value.strip() else len(line)
+            lines.append(Line(KEY, line, eol, group, item, start))
+    return lines
+
+
+def _current(df: DesktopFile, group: str, item) -> Optional[str]:
+    if group == MAIN_GROUP:
+        if isinstance(item, tuple):
+            return df.localized.get(item)
+        return df.entries.get(item)
+    entries = df.extra_groups.get(group)
+    return None if entries is None else entries.get(item)
+
+
+def render(df: DesktopFile, source: str) -> Iterator[str]:
+    """Yield *source* patched to match *df*, one line (with ending) at a time."""
+    lines = parse(source)
+    eol = next((line.eol for line in lines if line.eol), "\n")
+
+    # Where each group's and each main key's lines end, for insertions
+    group_end: dict[str, int] = {}
+    key_end: dict[str, int] = {}
+    # Line holding the effective value of each key; earlier duplicates are
+    # shadowed, as in the parser, and left alone unless the key is removed
+    seen: dict[tuple[str, object], int] = {}
+    for index, line in enumerate(lines):
+        if line.kind in (GROUP, KEY):
+            group_end[line.group] = index
+        if line.kind == KEY:
+            seen[(line.group, line.item)] = index
+            if line.group == MAIN_GROUP:
+                key_end[line.item[0] if isinstance(line.item, tuple) else line.item] = index
+
+    inserts: dict[int, list[str]] = {}
+
+    def insert(after: int, text: str):
+        inserts.setdefault(after, []).append(text)
+
+    main_end = group_end.get(MAIN_GROUP, -1)
+    # New translations of keys already in the file go after that key's lines
+    for key, locale in sorted(df.localized):
+        if (MAIN_GROUP, (key, locale)) not in seen and key in key_end:
+            insert(key_end[key], f"{key}[{locale}]={df.localized[(key, locale)]}{eol}")
+    # New keys, with their translations, go at the end of the main group
+    for key, value in df.entries.items():
+        if (MAIN_GROUP, key) in seen:
+            continue
+        insert(main_end, f"{key}={value}{eol}")
+        translations = df.localized.for_key(key)
+        for locale in sorted(translations):
+            if key not in key_end:
+                insert(main_end, f"{key}[{locale}]={translations[locale]}{eol}")
+    # Translations of a key the entry does not have go there too
+    for key, locale in sorted(df.localized):
+        if key not in key_end and key not in df.entries:
+            insert(main_end, f"{key}[{locale}]={df.localized[(key, locale)]}{eol}")
+    if -1 in inserts:
+        # Main-group keys in a file without one start with its header
+        inserts[-1].insert(0, f"[{MAIN_GROUP}]{eol}")
+    for name, entries in df.extra_groups.items():
+        if name not in group_end:
+            continue
+        for key, value in entries.items():
+            if (name, key) not in seen:
+                insert(group_end[name], f"{key}={value}{eol}")
+
+    last = ""
+    for text in inserts.get(-1, ()):
+        last = text
+        yield text
+    for index, line in enumerate(lines):
+        if line.group != MAIN_GROUP and line.group not in df.extra_groups:
+            continue
+        text = line.text
+        pending = inserts.get(index, ())
+        if line.kind == KEY:
+            value = _current(df, line.group, line.item)
+            if value is None:
+                for last in pending:
+                    yield last
+                continue
+            if (seen[(line.group, line.item)] == index
+                    and text[line.value_start:].strip() != value):
+                text = text[:line.value_start] + value
+        last = text + (line.eol or (eol if pending else ""))
+        yield last
+        for last in pending:
+            yield last
+
+    # Groups that did not exist in the source go at the end
+    for name, entries in df.extra_groups.items():
+        if name in group_end:
+            continue
+        ended = not last or last.endswith(("\n", "\r"))
+        yield ("" if ended else eol) + eol + f"[{name}]{eol}"
+        last = eol
+        for last in (f"{key}={value}{eol}" for key, value in entries.items()):
+            yield last
@@ -0,0 +1,280 @@
+"""Stream the content of many .desktop files to JSON Lines, CSV or columnar files.
+
+Every value becomes one :class:`ExportRow`: the file, group, key, locale
+(None for untranslated values) and value. Rows are produced by generators
+and written one at a time, so memory use does not grow with the number of
+files. The columnar format buffers at most :data:`ROW_GROUP_SIZE` rows.
+
+The ``json`` and ``key-value-csv`` formats are the single-file layouts the
+editor exported before: ``key``/``value`` pairs of the main group, with
+translations keyed ``Key[locale]``.
+
+Columnar layout (all integers little-endian)::
+
+    magic "DECF\\x01", u16 column count, per column: u16 length + UTF-8 name
+    row groups: u32 row count (0 ends the file), then per column:
+        u32 dictionary size, per entry: u32 length + UTF-8 bytes
+        u8 index typecode ("B", "H" or "I"), row count indices
+
+Index 0 of every dictionary stands for a missing value (None).
+
+Nothing in here may import GTK.
+"""
+import csv
+import json
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional, TextIO
+
+from desktop_editor.desktop_file import DesktopFile, split_locale_key
+
+COLUMNAR_MAGIC = b"DECF\x01"
+# Rows buffered per row group of the columnar format
+ROW_GROUP_SIZE = 65536
+MAIN_GROUP = "Desktop Entry"
+
+
+class ExportRow(NamedTuple):
+    path: Optional[str]
+    group: str
+    key: str
+    locale: Optional[str]
+    value: str
+
+
+COLUMNS = ExportRow._fields
+
+
+def iter_files(paths: Iterable[str], errors: Optional[list] = None) -> Iterator[DesktopFile]:
+    """Load *paths* one at a time; unreadable files go to *errors* as (path, message)."""
+    for path in paths:
+        try:
+            yield DesktopFile.load(path)
+        except OSError as e:
+            if errors is not None:
+                errors.append((path, e.strerror or str(e)))
+
+
+def iter_rows(files: Iterable[DesktopFile]) -> Iterator[ExportRow]:
+    """Yield every value of every file: main group, translations, other groups."""
+    for df in files:
+        path = df.path
+        for key, value in df.entries.items():
+            yield ExportRow(path, MAIN_GROUP, key, None, value)
+        for (key, locale), value in df.localized.items():
+            yield ExportRow(path, MAIN_GROUP, key, locale, value)
+        for group, entries in df.extra_groups.items():
+            for raw_key, value in entries.items():
+                key, locale = split_locale_key(raw_key) or (raw_key, None)
+                yield ExportRow(path, group, key, locale, value)
+
+
+# ── Writers ─────────────────────────────────────────────────────────
+
+
+class JsonLinesExporter:
+    """One JSON object per row."""
+
+    binary = False
+    main_group_only = False
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self._encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def begin(self):
+        pass
+
+    def write(self, row: ExportRow):
+        self.out.write(self._encode(dict(zip(COLUMNS, row))) + "\n")
+
+    def end(self):
+        pass
+
+
+class CsvExporter:
+    """A header line, then one CSV line per row; a missing locale is empty."""
+
+    binary = False
+    main_group_only = False
+
+    def __init__(self, out: TextIO):
+        self._writer = csv.writer(out)
+
+    def begin(self):
+        self._writer.writerow(COLUMNS)
+
+    def write(self, row: ExportRow):
+        self._writer.writerow(row)
+
+    def end(self):
+        pass
+
+
+class ColumnarExporter:
+    """Dictionary-encoded columns in row groups; see the module docstring."""
+
+    binary = True
+    main_group_only = False
+
+    def __init__(self, out: BinaryIO, row_group_size: int = ROW_GROUP_SIZE):
+        self.out = out
+        self.row_group_size = row_group_size
+        self._reset()
+
+    def _reset(self):
+        self._rows = 0
+        self._dictionaries = [{None: 0} for _ in COLUMNS]
+        self._indices = [[] for _ in COLUMNS]
+
+    def begin(self):
+        self.out.write(COLUMNAR_MAGIC + struct.pack("<H", len(COLUMNS)))
+        for name in COLUMNS:
+            encoded = name.encode("utf-8")
+            self.out.write(struct.pack("<H", len(encoded)) + encoded)
+
+    def write(self, row: ExportRow):
+        for value, dictionary, indices in zip(row, self._dictionaries, self._indices):
+            index = dictionary.get(value)
+            if index is None:
+                index = dictionary[value] = len(dictionary)
+            indices.append(index)
+        self._rows += 1
+        if self._rows >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        out = self.out
+        out.write(struct.pack("<I", self._rows))
+        for dictionary, indices in zip(self._dictionaries, self._indices):
+            out.write(struct.pack("<I", len(dictionary)))
+            # Entry 0 is None and is not stored
+            for value in list(dictionary)[1:]:
+                encoded = value.encode("utf-8", errors="surrogatepass")
+                out.write(struct.pack("<I", len(encoded)) + encoded)
+            typecode = "B" if len(dictionary) <= 0xFF else "H" if len(dictionary) <= 0xFFFF else "I"
+            column = array(typecode, indices)
+            if sys.byteorder != "little":
+                column.byteswap()
+            out.write(typecode.encode("ascii") + column.tobytes())
+        self._reset()
+
+    def end(self):
+        self._flush()
+        self.out.write(struct.pack("<I", 0))
+
+
+def _key_value(row: ExportRow) -> dict:
+    key = row.key if row.locale is None else f"{row.key}[{row.locale}]"
+    return {"key": key, "value": row.value}
+
+
+class KeyValueJsonExporter:
+    """A JSON array of ``{"key", "value"}`` objects for the main group of one file."""
+
+    binary = False
+    main_group_only = True
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self._encode = json.JSONEncoder(ensure_ascii=False, indent=2).encode
+        self._separator = "[\n"
+
+    def begin(self):
+        pass
+
+    def write(self, row: ExportRow):
+        # Indented as one element of the array
+        item = self._encode(_key_value(row)).replace("\n", "\n  ")
+        self.out.write(self._separator + "  " + item)
+        self._separator = ",\n"
+
+    def end(self):
+        self.out.write("[]" if self._separator == "[\n" else "\n]")
+
+
+class KeyValueCsvExporter:
+    """A ``key,value`` header, then one line per main-group value of one file."""
+
+    binary = False
+    main_group_only = True
+
+    def __init__(self, out: TextIO):
+        self._writer = csv.DictWriter(out, fieldnames=["key", "value"])
+
+    def begin(self):
+        self._writer.writeheader()
+
+    def write(self, row: ExportRow):
+        self._writer.writerow(_key_value(row))
+
+    def end(self):
+        pass
+
+
+EXPORTERS = {"jsonl": JsonLinesExporter, "csv": CsvExporter, "columnar": ColumnarExporter,
+             "json": KeyValueJsonExporter, "key-value-csv": KeyValueCsvExporter}
+EXTENSIONS = {"jsonl": "jsonl", "csv": "csv", "columnar": "decf",
+              "json": "json", "key-value-csv": "csv"}
+# Formats without a path column, for exporting one file
+SINGLE_FILE_FORMATS = ("json", "key-value-csv")
+
+
+def export(rows: Iterable[ExportRow], out, fmt: str) -> int:
+    """Write *rows* to *out* (binary for columnar, else text); returns the row count."""
+    exporter = EXPORTERS[fmt](out)
+    if exporter.main_group_only:
+        rows = (row for row in rows if row.group == MAIN_GROUP)
+    count = 0
+    exporter.begin()
+    for row in rows:
+        exporter.write(row)
+        count += 1
+    exporter.end()
+    return count
+
+
+def export_to_path(rows: Iterable[ExportRow], path: str, fmt: str) -> int:
+    """Like :func:`export`, opening *path* in the mode *fmt* needs."""
+    if EXPORTERS[fmt].binary:
+        with open(path, "wb") as f:
+            return export(rows, f, fmt)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        return export(rows, f, fmt)
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("truncated columnar file")
+    return data
+
+
+def iter_columnar(f: BinaryIO) -> Iterator[tuple]:
+    """Read back the rows of a columnar export, one row group at a time."""
+    if _read_exact(f, len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("not a columnar export")
+    (count,) = struct.unpack("<H", _read_exact(f, 2))
+    for _ in range(count):
+        (size,) = struct.unpack("<H", _read_exact(f, 2))
+        _read_exact(f, size)
+    while True:
+        (rows,) = struct.unpack("<I", _read_exact(f, 4))
+        if not rows:
+            return
+        columns = []
+        for _ in range(count):
+            (size,) = struct.unpack("<I", _read_exact(f, 4))
+            dictionary = [None]
+            for _ in range(size - 1):
+                (length,) = struct.unpack("<I", _read_exact(f, 4))
+                dictionary.append(_read_exact(f, length).decode("utf-8", errors="surrogatepass"))
+            column = array(_read_exact(f, 1).decode("ascii"))
+            column.frombytes(_read_exact(f, rows * column.itemsize))
+            if sys.byteorder != "little":
+                column.byteswap()
+            columns.append([dictionary[i] for i in column])
+        yield from zip(*columns)
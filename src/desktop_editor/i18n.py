@@ -1,22 +1,43 @@
-"""Internationalization setup."""
+"""Internationalization setup.
+
+Nothing happens on import: the locale and message catalog are set up by
+the first call to :func:`_`, so commands that never print translated text
+skip it entirely. The catalog is then looked up once, not on every call as
+:func:`gettext.gettext` does.
+"""
 import gettext
 import locale
 import os
 
 APP_ID = "se.danielnylander.desktop-editor"
-LOCALE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "po")
-
-# Try system locale dir first, fall back to local
-for d in ["/usr/share/locale", "/usr/local/share/locale", LOCALE_DIR]:
-    if os.path.isdir(d):
-        LOCALE_DIR = d
-        break
-
-try:
-    locale.setlocale(locale.LC_ALL, "")
-except locale.Error:
-    pass
-
-gettext.bindtextdomain("desktop-editor", LOCALE_DIR)
-gettext.textdomain("desktop-editor")
-_ = gettext.gettext
+DOMAIN = "desktop-editor"
+_SOURCE_LOCALE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "po")
+
+_translation = None
+
+
+def locale_dir() -> str:
+    """Return the first existing locale directory, preferring the system's."""
+    for d in ["/usr/share/locale", "/usr/local/share/locale", _SOURCE_LOCALE_DIR]:
+        if os.path.isdir(d):
+            return d
+    return _SOURCE_LOCALE_DIR
+
+
+def setup() -> gettext.NullTranslations:
+    """Set the process locale and load the message catalog."""
+    global _translation
+    try:
+        locale.setlocale(locale.LC_ALL, "")
+    except locale.Error:
+        pass
+    directory = locale_dir()
+    # For any code still calling gettext.gettext() directly
+    gettext.bindtextdomain(DOMAIN, directory)
+    gettext.textdomain(DOMAIN)
+    _translation = gettext.translation(DOMAIN, directory, fallback=True)
+    return _translation
+
+
+def _(message: str) -> str:
+    return (_translation or setup()).gettext(message)
@@ -0,0 +1,109 @@
+"""Cache of resolved application icons for the sidebar and preview.
+
+An ``Icon`` value is a themed icon name or an absolute file path. Each
+``(icon, size, scale)`` is resolved once into a :class:`Gdk.Paintable` and
+kept in an LRU bounded by the pixel memory the icons take up. Themed icons
+go through :meth:`Gtk.IconTheme.lookup_icon`, which loads the image lazily.
+When the icon theme changes, the cached icons are resolved again in idle
+time, most recently used first, and ``changed`` is emitted when done.
+"""
+import os
+from collections import OrderedDict
+from typing import Optional
+
+import gi
+
+gi.require_version("Gtk", "4.0")
+
+from gi.repository import Gdk, Gio, GLib, GObject, Gtk  # noqa: E402
+
+FALLBACK_ICON = "application-x-executable"
+# Roughly 250 icons of 64 px, or thousands of 16-32 px sidebar icons
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# Icons re-resolved per idle callback after a theme change
+_RELOAD_BATCH = 32
+# The spec allows, but discourages, an extension on themed names
+_ICON_EXTENSIONS = (".png", ".svg", ".xpm")
+
+
+def _cost(size: int, scale: int) -> int:
+    """Bytes of an RGBA texture for one icon."""
+    pixels = size * scale
+    return pixels * pixels * 4
+
+
+class IconCache(GObject.Object):
+    """LRU of :class:`Gdk.Paintable` keyed by ``(icon, size, scale)``."""
+
+    __gsignals__ = {
+        "changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    def __init__(self, display: Optional[Gdk.Display] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__()
+        self.theme = Gtk.IconTheme.get_for_display(display or Gdk.Display.get_default())
+        self.max_bytes = max_bytes
+        self._icons: OrderedDict[tuple[str, int, int], Gdk.Paintable] = OrderedDict()
+        self._size = 0
+        self._reload_keys: list[tuple[str, int, int]] = []
+        self._reload_source = 0
+        self.theme.connect("changed", self._on_theme_changed)
+
+    def __len__(self) -> int:
+        return len(self._icons)
+
+    def lookup(self, icon: Optional[str], size: int, scale: int = 1) -> Gdk.Paintable:
+        """Return the paintable for *icon*, falling back to a generic icon."""
+        key = (icon or FALLBACK_ICON, size, scale)
+        paintable = self._icons.get(key)
+        if paintable is not None:
+            self._icons.move_to_end(key)
+            return paintable
+        paintable = self._resolve(*key)
+        self._store(key, paintable)
+        return paintable
+
+    def _resolve(self, icon: str, size: int, scale: int) -> Gdk.Paintable:
+        if os.path.isabs(icon):
+            if os.path.isfile(icon):
+                return Gtk.IconPaintable.new_for_file(Gio.File.new_for_path(icon), size, scale)
+            icon = FALLBACK_ICON
+        elif icon.endswith(_ICON_EXTENSIONS) and not self.theme.has_icon(icon):
+            icon = os.path.splitext(icon)[0]
+        return self.theme.lookup_icon(icon, [FALLBACK_ICON], size, scale,
+                                      Gtk.TextDirection.NONE, 0)
+
+    def _store(self, key: tuple[str, int, int], paintable: Gdk.Paintable):
+        if key not in self._icons:
+            self._size += _cost(key[1], key[2])
+        self._icons[key] = paintable
+        self._icons.move_to_end(key)
+        while self._size > self.max_bytes and len(self._icons) > 1:
+            (_, size, scale), _ = self._icons.popitem(last=False)
+            self._size -= _cost(size, scale)
+
+    def clear(self):
+        self._icons.clear()
+        self._size = 0
+
+    def _on_theme_changed(self, theme):
+        # Most recently used first, so visible rows are ready soonest
+        self._reload_keys = list(self._icons)
+        self.clear()
+        if not self._reload_source:
+            self._reload_source = GLib.idle_add(
+                self._reload_batch, priority=GLib.PRIORITY_LOW)
+
+    def _reload_batch(self):
+        for _ in range(min(_RELOAD_BATCH, len(self._reload_keys))):
+            key = self._reload_keys.pop()
+            if key not in self._icons:
+                self._store(key, self._resolve(*key))
+                # Keep the old recency order rather than reversing it
+                self._icons.move_to_end(key, last=False)
+        if self._reload_keys:
+            return GLib.SOURCE_CONTINUE
+        self._reload_source = 0
+        self.emit("changed")
+        return GLib.SOURCE_REMOVE
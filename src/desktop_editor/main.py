@@ -1,15 +1,26 @@
 """Application entry point."""
 import sys
-import gi
 
-gi.require_version("Gtk", "4.0")
-gi.require_version("Adw", "1")
 
-from gi.repository import Adw  # noqa: E402
-from desktop_editor.app import DesktopEditorApp  # noqa: E402
+def main():
+    # Command-line use must not pay for (or require) GTK, so the CLI,
+    # which never imports it, decides first
+    from desktop_editor import cli
 
+    if cli.handles(sys.argv[1:]):
+        return cli.main(sys.argv[1:])
+
+    from desktop_editor.i18n import setup
+
+    setup()
+
+    import gi
+
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("Adw", "1")
+
+    from desktop_editor.app import DesktopEditorApp
 
-def main():
     app = DesktopEditorApp()
     return app.run(sys.argv)
 
@@ -0,0 +1,228 @@
+"""Persistent cache of parsed .desktop files.
+
+Each parsed model is kept in its own small file under
+``$XDG_CACHE_HOME/desktop-editor/parse``, named by a hash of its path and
+validated against the file's mtime and size, so a warm load needs one
+``stat``, one small read and no text parsing.
+"""
+import atexit
+import hashlib
+import marshal
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from desktop_editor.desktop_file import DesktopFile
+
+# Bump when the payload layout changes; older entries are discarded.
+_MAGIC = b"DEPC\x04"
+_ENTRIES_NAME = "parse"
+_ENTRY_SUFFIX = ".bin"
+# The single pack file earlier versions kept; removed on eviction
+_LEGACY_PACK_NAME = "parse-cache.bin"
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def cache_dir() -> str:
+    """Return the desktop-editor cache directory (not necessarily created)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "desktop-editor")
+
+
+def encode(df: DesktopFile) -> bytes:
+    """Serialize the parsed content of *df* to a compact binary blob."""
+    return marshal.dumps((
+        tuple(df.entries.items()),
+        tuple(df.localized.items()),
+        tuple((name, tuple(group.items())) for name, group in df.extra_groups.items()),
+        df.source,
+    ))
+
+
+def decode(blob: bytes, path: Optional[str] = None) -> DesktopFile:
+    """Rebuild a DesktopFile from a blob produced by :func:`encode`."""
+    entries, localized, extra_groups, source = marshal.loads(blob)
+    df = DesktopFile()
+    df.path = path
+    df.source = source
+    df.entries.update(entries)
+    df.localized.update(localized)
+    for name, group in extra_groups:
+        df.extra_groups[name] = OrderedDict(group)
+    return df
+
+
+class ParseCache:
+    """LRU cache of parsed .desktop files, one cache file per entry.
+
+    An entry holds ``(path, mtime_ns, size, blob)``. Its file's mtime is
+    its recency: a hit only touches that, and nothing is rewritten. Once
+    the entries exceed *max_bytes*, the least recently used ones are
+    evicted, every *max_bytes* / 4 written and by :meth:`flush`.
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or cache_dir()
+        self.max_bytes = max_bytes
+        # Bytes written since the last eviction
+        self._written = 0
+        self._lock = threading.Lock()
+
+    @property
+    def entries_dir(self) -> str:
+        return os.path.join(self.directory, _ENTRIES_NAME)
+
+    def _entry_path(self, path: str) -> str:
+        key = os.fsencode(os.path.abspath(path))
+        digest = hashlib.blake2b(key, digest_size=16).hexdigest()
+        return os.path.join(self.entries_dir, digest + _ENTRY_SUFFIX)
+
+    def get(self, path: str, st: Optional[os.stat_result] = None) -> Optional[DesktopFile]:
+        """Return the cached model for *path* if it is still fresh."""
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+        entry = self._entry_path(path)
+        try:
+            with open(entry, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            if not data.startswith(_MAGIC):
+                raise ValueError(entry)
+            cached_path, mtime_ns, size, blob = marshal.loads(data[len(_MAGIC):])
+            if (cached_path != os.path.abspath(path)
+                    or mtime_ns != st.st_mtime_ns or size != st.st_size):
+                return None
+            df = decode(blob, path)
+        except (ValueError, EOFError, TypeError):
+            self.discard(path)
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return df
+
+    def put(self, df: DesktopFile, st: os.stat_result):
+        """Store *df* (parsed from ``df.path``) under its stat signature."""
+        data = _MAGIC + marshal.dumps(
+            (os.path.abspath(df.path), st.st_mtime_ns, st.st_size, encode(df)))
+        try:
+            os.makedirs(self.entries_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.entries_dir, prefix=".tmp-")
+            try:
+                with open(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._entry_path(df.path))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # A cache that cannot be written is just a cold cache next time
+            return
+        with self._lock:
+            self._written += len(data)
+            evict = self._written > self.max_bytes // 4
+        if evict:
+            self._evict()
+
+    def discard(self, path: str):
+        """Forget any cached model for *path*."""
+        try:
+            os.unlink(self._entry_path(path))
+        except OSError:
+            pass
+
+    def load(self, path: str, st: Optional[os.stat_result] = None) -> DesktopFile:
+        """Like :meth:`DesktopFile.load`, but served from the cache when fresh.
+
+        *st* may carry a stat result the caller already has (for example from
+        discovery) to skip the freshness ``stat``.
+        """
+        if st is None:
+            st = os.stat(path)
+        df = self.get(path, st)
+        if df is None:
+            df = DesktopFile.load(path)
+            # Only cache if the file did not change while it was being read
+            if os.stat(path).st_mtime_ns == st.st_mtime_ns:
+                self.put(df, st)
+        return df
+
+    def _scan(self) -> list[tuple[int, int, str]]:
+        """Return ``(mtime_ns, size, path)`` of every entry file."""
+        found = []
+        try:
+            with os.scandir(self.entries_dir) as it:
+                for item in it:
+                    if item.name.endswith(_ENTRY_SUFFIX):
+                        try:
+                            st = item.stat()
+                        except OSError:
+                            continue
+                        found.append((st.st_mtime_ns, st.st_size, item.path))
+        except OSError:
+            pass
+        return found
+
+    def _evict(self):
+        """Remove the least recently used entries beyond *max_bytes*."""
+        with self._lock:
+            self._written = 0
+        found = sorted(self._scan())
+        total = sum(size for _mtime, size, _path in found)
+        for _mtime, size, entry in found:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(entry)
+            except OSError:
+                pass
+            total -= size
+        try:
+            os.unlink(os.path.join(self.directory, _LEGACY_PACK_NAME))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Drop every cached entry."""
+        for _mtime, _size, entry in self._scan():
+            try:
+                os.unlink(entry)
+            except OSError:
+                pass
+        with self._lock:
+            self._written = 0
+
+    def flush(self):
+        """Evict down to *max_bytes* if anything was written since the last eviction."""
+        with self._lock:
+            written = self._written
+        if written:
+            self._evict()
+
+
+_default_cache: Optional[ParseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> ParseCache:
+    """Return the process-wide cache, flushed automatically at exit."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache()
+            atexit.register(_default_cache.flush)
+    return _default_cache
+
+
+def load_cached(path: str) -> DesktopFile:
+    """Load *path* through the process-wide parse cache."""
+    return get_default_cache().load(path)
@@ -0,0 +1,144 @@
+"""In-memory inverted index for searching installed desktop entries."""
+import re
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from desktop_editor.desktop_file import DesktopFile, scan_keys
+
+# Keys whose values are searchable, plus the keys searched in every locale
+SEARCH_KEYS = ("Name", "GenericName", "Comment", "Keywords", "Categories", "Exec")
+LOCALIZED_SEARCH_KEYS = ("Name", "Comment")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split *text* into case-folded word tokens."""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def document_tokens(df: DesktopFile, desktop_id: Optional[str] = None) -> set[str]:
+    """Return the set of search tokens for one parsed entry."""
+    tokens = set()
+    for key in SEARCH_KEYS:
+        value = df.entries.get(key)
+        if value:
+            tokens.update(tokenize(value))
+    for key in LOCALIZED_SEARCH_KEYS:
+        for value in df.get_translations(key).values():
+            tokens.update(tokenize(value))
+    if desktop_id:
+        tokens.update(tokenize(desktop_id.removesuffix(".desktop")))
+    return tokens
+
+
+def scanned_tokens(values: dict[str, str], desktop_id: Optional[str] = None) -> set[str]:
+    """Like :func:`document_tokens`, for the output of :func:`scan_file`."""
+    tokens = set()
+    for value in values.values():
+        if value:
+            tokens.update(tokenize(value))
+    if desktop_id:
+        tokens.update(tokenize(desktop_id.removesuffix(".desktop")))
+    return tokens
+
+
+def scan_file(path: str, extra_keys: tuple[str, ...] = ()) -> dict[str, str]:
+    """Read just the searchable keys of *path*, without a full parse.
+
+    *extra_keys* are read as well; pop them before :func:`scanned_tokens`.
+    """
+    return scan_keys(path, SEARCH_KEYS + extra_keys, LOCALIZED_SEARCH_KEYS)
+
+
+class SearchIndex:
+    """Token -> sorted ``array('I')`` of document ids.
+
+    Documents are identified by a caller-chosen key (the desktop-file ID in
+    the editor). Every query term is treated as a prefix, so results update
+    while a word is still being typed; a query matches documents that
+    contain all of its terms.
+    """
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self._keys: dict[int, str] = {}
+        self._doc_tokens: dict[int, tuple[str, ...]] = {}
+        self._postings: dict[str, array] = {}
+        # Sorted token list for prefix lookups, rebuilt when tokens come or go
+        self._vocabulary: Optional[list[str]] = None
+        # Ids only ever grow, so appending keeps every posting list sorted
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    def add(self, key: str, tokens: Iterable[str]):
+        """Index *key* under *tokens*, replacing any previous version."""
+        self.remove(key)
+        doc_id = self._next_id
+        self._next_id += 1
+        tokens = tuple(set(tokens))
+        self._ids[key] = doc_id
+        self._keys[doc_id] = key
+        self._doc_tokens[doc_id] = tokens
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = array("I")
+                self._vocabulary = None
+            posting.append(doc_id)
+
+    def remove(self, key: str):
+        """Drop *key* from the index if present."""
+        doc_id = self._ids.pop(key, None)
+        if doc_id is None:
+            return
+        del self._keys[doc_id]
+        for token in self._doc_tokens.pop(doc_id):
+            posting = self._postings[token]
+            del posting[bisect_left(posting, doc_id)]
+            if not posting:
+                del self._postings[token]
+                self._vocabulary = None
+
+    def clear(self):
+        self._ids.clear()
+        self._keys.clear()
+        self._doc_tokens.clear()
+        self._postings.clear()
+        self._vocabulary = None
+
+    def _prefix_ids(self, prefix: str):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        lo = bisect_left(vocabulary, prefix)
+        hi = bisect_left(vocabulary, prefix + "\U0010ffff", lo)
+        if hi - lo == 1:
+            return set(self._postings[vocabulary[lo]])
+        ids = set()
+        for token in vocabulary[lo:hi]:
+            ids.update(self._postings[token])
+        return ids
+
+    def search(self, query: str) -> Optional[set[str]]:
+        """Return the keys matching every term of *query*.
+
+        Returns None for a query without any terms, meaning "no filter".
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return None
+        result = None
+        # Longer prefixes tend to be more selective; start with those
+        for term in sorted(terms, key=len, reverse=True):
+            ids = self._prefix_ids(term)
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return {self._keys[doc_id] for doc_id in result}
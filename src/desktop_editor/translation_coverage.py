@@ -0,0 +1,191 @@
+"""Locale x key translation coverage across many desktop entries.
+
+A :class:`CoverageMatrix` gives every entry a slot and keeps, for each
+locale and each of the :data:`TRANSLATABLE_KEYS`, a bitset of the slots
+that translate that key, next to a bitset of the slots that have the key at
+all. Counts are kept alongside, so reading the matrix never scans the bits.
+
+Replacing or removing one entry only touches its own bits and counters: its
+previous :func:`entry_row` is remembered, so the cost does not depend on
+how many entries there are. Rows are computed from parsed files, which
+callers get from the parse cache, and :func:`entry_row` may run on a worker
+thread; the matrix itself is not thread-safe.
+
+Nothing in here may import GTK.
+"""
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from desktop_editor.desktop_file import DesktopFile, TRANSLATABLE_KEYS
+
+# (bitmask of the keys the entry has, ((locale, bitmask of translated keys), ...))
+EntryRow = tuple[int, tuple[tuple[str, int], ...]]
+
+
+class CoverageCell(NamedTuple):
+    locale: str
+    key: str
+    translated: int
+    total: int
+
+    @property
+    def missing(self) -> int:
+        return self.total - self.translated
+
+    @property
+    def percent(self) -> int:
+        return 100 * self.translated // self.total if self.total else 100
+
+
+def entry_row(df: DesktopFile) -> EntryRow:
+    """Summarize which keys *df* has and which of them each locale translates.
+
+    Translations of a key the entry does not have are not counted.
+    """
+    present = 0
+    locales: dict[str, int] = {}
+    for bit, key in enumerate(TRANSLATABLE_KEYS):
+        if not df.entries.get(key):
+            continue
+        present |= 1 << bit
+        for locale, value in df.get_translations(key).items():
+            if value:
+                locales[locale] = locales.get(locale, 0) | 1 << bit
+    return present, tuple(sorted(locales.items()))
+
+
+def _set_bit(bits: bytearray, slot: int):
+    index = slot >> 3
+    if index >= len(bits):
+        bits.extend(bytes(index + 1 - len(bits)))
+    bits[index] |= 1 << (slot & 7)
+
+
+def _clear_bit(bits: bytearray, slot: int):
+    bits[slot >> 3] &= ~(1 << (slot & 7)) & 0xFF
+
+
+class CoverageMatrix:
+    """Per-locale bitsets of which entries translate each translatable key."""
+
+    def __init__(self):
+        self._slots: dict[str, int] = {}
+        self._ids: list[Optional[str]] = []
+        self._free: list[int] = []
+        self._rows: list[Optional[EntryRow]] = []
+        # Per key: entries that have it, and how many
+        self._present = [bytearray() for _ in TRANSLATABLE_KEYS]
+        self._totals = [0] * len(TRANSLATABLE_KEYS)
+        # Per locale, per key: entries translating it, and how many
+        self._bits: dict[str, list[bytearray]] = {}
+        self._counts: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._slots
+
+    # ── Updates ─────────────────────────────────────────────────────
+
+    def update(self, entry_id: str, row: EntryRow):
+        """Set the row of *entry_id* (a desktop-file ID or path), adding it if new."""
+        slot = self._slots.get(entry_id)
+        if slot is None:
+            slot = self._free.pop() if self._free else len(self._ids)
+            if slot == len(self._ids):
+                self._ids.append(None)
+                self._rows.append(None)
+            self._slots[entry_id] = slot
+            self._ids[slot] = entry_id
+        else:
+            if self._rows[slot] == row:
+                return
+            self._apply(slot, self._rows[slot], clear=True)
+        self._rows[slot] = row
+        self._apply(slot, row, clear=False)
+
+    def update_file(self, entry_id: str, df: DesktopFile):
+        self.update(entry_id, entry_row(df))
+
+    def remove(self, entry_id: str):
+        slot = self._slots.pop(entry_id, None)
+        if slot is None:
+            return
+        self._apply(slot, self._rows[slot], clear=True)
+        self._rows[slot] = None
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def _apply(self, slot: int, row: EntryRow, clear: bool):
+        change = _clear_bit if clear else _set_bit
+        step = -1 if clear else 1
+        present, locales = row
+        for bit in range(len(TRANSLATABLE_KEYS)):
+            if present >> bit & 1:
+                change(self._present[bit], slot)
+                self._totals[bit] += step
+        for locale, mask in locales:
+            bits = self._bits.get(locale)
+            if bits is None:
+                bits = self._bits[locale] = [bytearray() for _ in TRANSLATABLE_KEYS]
+                self._counts[locale] = [0] * len(TRANSLATABLE_KEYS)
+            counts = self._counts[locale]
+            for bit in range(len(TRANSLATABLE_KEYS)):
+                if mask >> bit & 1:
+                    change(bits[bit], slot)
+                    counts[bit] += step
+            if clear and not any(counts):
+                del self._bits[locale]
+                del self._counts[locale]
+
+    # ── Queries ─────────────────────────────────────────────────────
+
+    def locales(self) -> list[str]:
+        return sorted(self._counts)
+
+    def total(self, key: str) -> int:
+        """Return how many entries have *key*."""
+        return self._totals[TRANSLATABLE_KEYS.index(key)]
+
+    def cell(self, locale: str, key: str) -> CoverageCell:
+        bit = TRANSLATABLE_KEYS.index(key)
+        counts = self._counts.get(locale)
+        return CoverageCell(locale, key, counts[bit] if counts else 0, self._totals[bit])
+
+    def cells(self, locale: str) -> list[CoverageCell]:
+        """Return the cells of *locale*, one per translatable key."""
+        return [self.cell(locale, key) for key in TRANSLATABLE_KEYS]
+
+    def __iter__(self) -> Iterator[CoverageCell]:
+        for locale in self.locales():
+            yield from self.cells(locale)
+
+    def missing(self, locale: str, key: str) -> list[str]:
+        """Return the IDs of entries that have *key* but no *locale* translation of it."""
+        bit = TRANSLATABLE_KEYS.index(key)
+        present = int.from_bytes(self._present[bit], "little")
+        bits = self._bits.get(locale)
+        if bits is not None:
+            present &= ~int.from_bytes(bits[bit], "little")
+        ids = []
+        while present:
+            low = present & -present
+            ids.append(self._ids[low.bit_length() - 1])
+            present ^= low
+        return sorted(ids)
+
+    def load(self, items: Iterable[tuple[str, str, object]]) -> list[tuple[str, str]]:
+        """Add ``(entry_id, path, stat)`` items through the parse cache.
+
+        *stat* may be None. Returns ``(path, error)`` for unreadable files.
+        """
+        from desktop_editor.parse_cache import get_default_cache
+
+        cache = get_default_cache()
+        errors = []
+        for entry_id, path, st in items:
+            try:
+                self.update_file(entry_id, cache.load(path, st))
+            except OSError as e:
+                errors.append((path, e.strerror or str(e)))
+        return errors
@@ -0,0 +1,324 @@
+"""Import translations from .po and CSV files into many .desktop files.
+
+The sources are parsed once into a :class:`TranslationIndex` that maps each
+untranslated string (msgid) to its translations by locale. Every target file
+is then looked up against the index as one bulk edit, so files are loaded
+and saved in parallel and all of them are written, or none. A
+:class:`Coverage` tally shows how much of each locale the targets now have.
+
+The reverse direction, :func:`extract_pot`, writes a .pot template of the
+translatable strings of a set of .desktop files.
+
+Translatable strings are the :data:`TRANSLATABLE_KEYS` of the main group and
+the ``Name`` of each ``Desktop Action`` group. Message contexts and plural
+forms are not used by desktop entries and are ignored.
+
+Nothing in here may import GTK.
+"""
+import csv
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, NamedTuple, Optional, TextIO
+
+from desktop_editor import bulk_edit
+from desktop_editor.desktop_file import (
+    DesktopFile,
+    TRANSLATABLE_KEYS,
+    escape_value,
+    unescape_value,
+)
+from desktop_editor.document import KEY, MAIN_GROUP, parse
+from desktop_editor.i18n import _
+
+ACTION_PREFIX = "Desktop Action "
+ACTION_KEYS = ("Name",)
+
+_PO_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+_PO_ESCAPE_RE = re.compile(r"\\(.)")
+_PO_LANGUAGE_RE = re.compile(r"^Language:[ \t]*(\S*)", re.MULTILINE)
+# lang[_COUNTRY][.ENCODING][@MODIFIER]; desktop entries drop the encoding
+_LOCALE_RE = re.compile(
+    r"^([a-zA-Z]{2,3}(?:_(?:[a-zA-Z]{2,3}|[0-9]{3}))?)(?:\.[\w-]+)?(@[a-zA-Z]+)?$")
+
+
+class PoEntry(NamedTuple):
+    msgid: str
+    msgstr: str
+    fuzzy: bool
+
+
+def _po_unquote(text: str) -> str:
+    text = text.strip()
+    if len(text) < 2 or text[0] != '"' or text[-1] != '"':
+        raise ValueError(text)
+    return _PO_ESCAPE_RE.sub(lambda m: _PO_ESCAPES.get(m.group(1), m.group(1)), text[1:-1])
+
+
+def _po_quote(text: str) -> str:
+    return '"%s"' % (text.replace("\\", "\\\\").replace('"', '\\"')
+                     .replace("\n", "\\n").replace("\t", "\\t"))
+
+
+def normalize_locale(text: str) -> Optional[str]:
+    """Return *text* as a desktop-entry locale, or None if it is not a locale."""
+    m = _LOCALE_RE.match(text)
+    return m.group(1) + (m.group(2) or "") if m else None
+
+
+def iter_po(lines: Iterable[str]) -> Iterator[PoEntry]:
+    """Yield the singular entries of a .po file, including the header."""
+    msgid = msgstr = field = None
+    fuzzy = plural = False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        # Comments, a context or a msgid after a msgstr start the next entry
+        if msgstr is not None and (line[0] == "#" or line.startswith(("msgctxt ", "msgid "))):
+            if not plural:
+                yield PoEntry(msgid, msgstr, fuzzy)
+            msgid = msgstr = field = None
+            fuzzy = plural = False
+        if line[0] == "#":
+            if line.startswith("#,"):
+                fuzzy = fuzzy or "fuzzy" in (flag.strip() for flag in line[2:].split(","))
+            continue
+        if line[0] == '"':
+            if field == "msgid":
+                msgid += _po_unquote(line)
+            elif field == "msgstr":
+                msgstr += _po_unquote(line)
+            continue
+        keyword, _sep, rest = line.partition(" ")
+        if keyword == "msgid":
+            msgid, field = _po_unquote(rest), "msgid"
+        elif keyword in ("msgstr", "msgstr[0]") and msgid is not None:
+            msgstr, field = _po_unquote(rest), "msgstr"
+        else:
+            plural = plural or keyword == "msgid_plural"
+            field = None
+    if msgstr is not None and not plural:
+        yield PoEntry(msgid, msgstr, fuzzy)
+
+
+class TranslationIndex:
+    """msgid -> {locale: translation}, built from .po and CSV sources."""
+
+    def __init__(self):
+        self._by_msgid: dict[str, dict[str, str]] = {}
+        self._locales: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._by_msgid)
+
+    def add(self, msgid: str, locale: str, translation: str):
+        if msgid and translation:
+            self._by_msgid.setdefault(msgid, {})[locale] = translation
+            self._locales.add(locale)
+
+    def get(self, msgid: str) -> dict[str, str]:
+        return self._by_msgid.get(msgid, {})
+
+    def locales(self) -> list[str]:
+        return sorted(self._locales)
+
+    def load_po(self, path: str, locale: Optional[str] = None) -> int:
+        """Add the translated, non-fuzzy entries of *path*; returns how many.
+
+        The locale is taken from the header's ``Language`` field, else from
+        the file name (``sv.po``), unless *locale* is given. Raises
+        ValueError if none of them is a valid locale.
+        """
+        with open(path, encoding="utf-8") as f:
+            entries = list(iter_po(f))
+        if locale is None:
+            header = next((entry.msgstr for entry in entries if not entry.msgid), "")
+            match = _PO_LANGUAGE_RE.search(header)
+            locale = (match and normalize_locale(match.group(1))
+                      or normalize_locale(os.path.splitext(os.path.basename(path))[0]))
+            if locale is None:
+                raise ValueError(_("%s: no Language header and the file name is not a locale")
+                                 % path)
+        count = 0
+        for entry in entries:
+            if entry.msgid and entry.msgstr and not entry.fuzzy:
+                self.add(entry.msgid, locale, entry.msgstr)
+                count += 1
+        return count
+
+    def load_csv(self, path: str) -> int:
+        """Add translations from a CSV with a ``msgid`` column and one column per locale."""
+        count = 0
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = csv.reader(f)
+            header = next(rows, None)
+            if not header or header[0] != "msgid":
+                raise ValueError(_("%s: the first column must be 'msgid'") % path)
+            locales = [normalize_locale(column) for column in header[1:]]
+            for column, locale in zip(header[1:], locales):
+                if locale is None:
+                    raise ValueError(_("%(path)s: %(column)r is not a locale") % {
+                        "path": path, "column": column})
+            for row in rows:
+                if not row:
+                    continue
+                for locale, translation in zip(locales, row[1:]):
+                    if translation:
+                        self.add(row[0], locale, translation)
+                        count += 1
+        return count
+
+    def load(self, path: str) -> int:
+        """Load a .csv file as CSV, anything else as .po."""
+        if path.endswith(".csv"):
+            return self.load_csv(path)
+        return self.load_po(path)
+
+
+# ── Import ──────────────────────────────────────────────────────────
+
+
+class Coverage:
+    """Translated strings per locale across the files an import touched."""
+
+    def __init__(self):
+        self.total = 0
+        self.translated: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, total: int, translated: dict[str, int]):
+        with self._lock:
+            self.total += total
+            for locale, count in translated.items():
+                self.translated[locale] = self.translated.get(locale, 0) + count
+
+    def report(self) -> str:
+        """Return one ``locale: translated/total (percent)`` line per locale."""
+        lines = []
+        for locale in sorted(self.translated):
+            count = self.translated[locale]
+            percent = 100 * count // self.total if self.total else 0
+            lines.append(f"{locale}: {count}/{self.total} ({percent}%)")
+        return "\n".join(lines)
+
+
+def _translatable(df: DesktopFile) -> Iterator[tuple[Optional[str], str, str]]:
+    """Yield ``(group, key, msgid)``; *group* is None for the main group.
+
+    Messages are the unescaped values, so a ``\\n`` escape in the file is a
+    newline in the .po file.
+    """
+    for key in TRANSLATABLE_KEYS:
+        value = df.entries.get(key)
+        if value:
+            yield None, key, unescape_value(value)
+    for group, entries in df.extra_groups.items():
+        if group.startswith(ACTION_PREFIX):
+            for key in ACTION_KEYS:
+                value = entries.get(key)
+                if value:
+                    yield group, key, unescape_value(value)
+
+
+class ImportTranslations(bulk_edit.Operation):
+    """Bulk-edit operation filling in translations from a :class:`TranslationIndex`."""
+
+    key = "translations"
+
+    def __init__(self, index: TranslationIndex, overwrite: bool = False,
+                 coverage: Optional[Coverage] = None):
+        self.index = index
+        self.overwrite = overwrite
+        self.coverage = coverage if coverage is not None else Coverage()
+
+    def apply(self, df):
+        changed = False
+        total = 0
+        translated: dict[str, int] = {}
+        for group, key, msgid in _translatable(df):
+            total += 1
+            if group is None:
+                existing = df.get_translations(key)
+            else:
+                entries = df.extra_groups[group]
+                existing = {locale: entries[f"{key}[{locale}]"]
+                            for locale in self.index.get(msgid)
+                            if f"{key}[{locale}]" in entries}
+            for locale, translation in self.index.get(msgid).items():
+                if locale in existing and not self.overwrite:
+                    continue
+                path = f"{key}[{locale}]" if group is None else f"{group}/{key}[{locale}]"
+                # A msgstr may span lines; the value must not
+                changed = bulk_edit._set(df, path, escape_value(translation)) or changed
+                existing[locale] = translation
+            for locale in existing:
+                translated[locale] = translated.get(locale, 0) + 1
+        self.coverage._add(total, translated)
+        return changed
+
+    def describe(self):
+        return _("import %d translated strings") % len(self.index)
+
+
+def import_translations(paths: Iterable[str], index: TranslationIndex,
+                        overwrite: bool = False, max_workers: Optional[int] = None
+                        ) -> tuple[bulk_edit.BulkEditPlan, Coverage]:
+    """Plan merging *index* into *paths*; commit the returned plan to write it."""
+    operation = ImportTranslations(index, overwrite)
+    return bulk_edit.plan(paths, [operation], max_workers), operation.coverage
+
+
+# ── Extraction ──────────────────────────────────────────────────────
+
+
+def _file_messages(path: str) -> list[tuple[str, str, str]]:
+    """Return ``(msgid, reference, key)`` for each translatable string of *path*."""
+    df = DesktopFile.load(path)
+    wanted = {(group or MAIN_GROUP, key): msgid for group, key, msgid in _translatable(df)}
+    # The last line of a key holds its value, as in the parser
+    lines = {}
+    for number, line in enumerate(parse(df.source or ""), 1):
+        if line.kind == KEY and (line.group, line.item) in wanted:
+            lines[(line.group, line.item)] = number
+    return [(msgid, f"{path}:{lines[where]}" if where in lines else path, where[1])
+            for where, msgid in wanted.items()]
+
+
+def extract_pot(paths: Iterable[str], out: TextIO, max_workers: Optional[int] = None
+                ) -> tuple[int, list[tuple[str, str]]]:
+    """Write a .pot template of the translatable strings in *paths*.
+
+    Returns the number of messages and ``(path, error)`` for unreadable files.
+    """
+    messages: dict[str, tuple[list[str], list[str]]] = {}
+    errors = []
+
+    def worker(path):
+        try:
+            return path, _file_messages(path), None
+        except OSError as e:
+            return path, [], e.strerror or str(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers,
+                            thread_name_prefix="desktop-bulk") as pool:
+        for path, file_messages, error in pool.map(worker, paths):
+            if error is not None:
+                errors.append((path, error))
+            for msgid, reference, key in file_messages:
+                references, keys = messages.setdefault(msgid, ([], []))
+                references.append(reference)
+                if key not in keys:
+                    keys.append(key)
+
+    out.write('msgid ""\nmsgstr ""\n'
+              '"Content-Type: text/plain; charset=UTF-8\\n"\n'
+              '"Content-Transfer-Encoding: 8bit\\n"\n')
+    for msgid, (references, keys) in messages.items():
+        out.write("\n")
+        out.write(f"#. {', '.join(keys)}\n")
+        for reference in references:
+            out.write(f"#: {reference}\n")
+        out.write(f"msgid {_po_quote(msgid)}\nmsgstr \"\"\n")
+    return len(messages), errors
@@ -1,37 +1,89 @@
 """Undo/Redo stack for application state changes."""
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+# FileDiff change sections
+ENTRY = 0
+LOCALIZED = 1
+GROUP_KEY = 2
+GROUP = 3
+
+# Rough per-change bookkeeping cost used for the byte budget
+_CHANGE_OVERHEAD = 72
+
+
+class _CallbackStep:
+    """An undoable action made of two callables."""
+
+    __slots__ = ("undo_fn", "redo_fn", "description")
+    size = 0
+
+    def __init__(self, undo_fn, redo_fn, description=""):
+        self.undo_fn = undo_fn
+        self.redo_fn = redo_fn
+        self.description = description
+
+    def undo(self, target):
+        self.undo_fn()
+
+    def redo(self, target):
+        self.redo_fn()
 
 
 class UndoRedoManager:
-    """Simple undo/redo manager with action stack."""
+    """Simple undo/redo manager with action stack.
+
+    The undo stack is bounded by *max_size* steps and, if given, by
+    *max_bytes* as reported by each step's ``size``; the oldest steps are
+    dropped first.
+    """
 
-    def __init__(self, max_size=50):
-        self._undo_stack = []
-        self._redo_stack = []
+    def __init__(self, max_size=50, max_bytes=None):
+        self._undo_stack = deque()
+        self._redo_stack = deque()
         self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._bytes = 0
 
     def push(self, undo_fn, redo_fn, description=""):
         """Push an undoable action."""
-        self._undo_stack.append((undo_fn, redo_fn, description))
-        if len(self._undo_stack) > self._max_size:
-            self._undo_stack.pop(0)
+        self._push_step(_CallbackStep(undo_fn, redo_fn, description))
+
+    def _push_step(self, step):
+        self._undo_stack.append(step)
+        self._bytes += step.size
+        self._clear_redo()
+        self._trim()
+
+    def _trim(self):
+        while self._undo_stack and (
+                len(self._undo_stack) > self._max_size
+                or (self._max_bytes is not None and self._bytes > self._max_bytes)):
+            self._bytes -= self._undo_stack.popleft().size
+
+    def _clear_redo(self):
+        for step in self._redo_stack:
+            self._bytes -= step.size
         self._redo_stack.clear()
 
-    def undo(self):
+    def undo(self, target=None):
         """Undo the last action. Returns True if successful."""
         if not self._undo_stack:
             return False
-        undo_fn, redo_fn, desc = self._undo_stack.pop()
-        undo_fn()
-        self._redo_stack.append((undo_fn, redo_fn, desc))
+        step = self._undo_stack.pop()
+        step.undo(target)
+        self._redo_stack.append(step)
         return True
 
-    def redo(self):
+    def redo(self, target=None):
         """Redo the last undone action. Returns True if successful."""
         if not self._redo_stack:
             return False
-        undo_fn, redo_fn, desc = self._redo_stack.pop()
-        redo_fn()
-        self._undo_stack.append((undo_fn, redo_fn, desc))
+        step = self._redo_stack.pop()
+        step.redo(target)
+        self._undo_stack.append(step)
         return True
 
     def can_undo(self):
@@ -40,6 +92,201 @@ class UndoRedoManager:
     def can_redo(self):
         return bool(self._redo_stack)
 
+    @property
+    def size_bytes(self) -> int:
+        """Approximate memory held by the undo and redo stacks."""
+        return self._bytes
+
+    def __len__(self):
+        return len(self._undo_stack)
+
     def clear(self):
         self._undo_stack.clear()
         self._redo_stack.clear()
+        self._bytes = 0
+
+
+def _move_to_index(od: OrderedDict, key, index: int):
+    """Move *key* (currently last) to position *index* of *od*."""
+    if index >= len(od) - 1:
+        return
+    for other in list(od)[index:-1]:
+        od.move_to_end(other)
+
+
+def _set(od: OrderedDict, key, value, index: int):
+    if value is None:
+        od.pop(key, None)
+    else:
+        present = key in od
+        od[key] = value
+        if not present and index >= 0:
+            _move_to_index(od, key, index)
+
+
+def _diff_ordered(section, a: OrderedDict, b: OrderedDict, prefix=None) -> list:
+    changes = []
+    for index, (key, old) in enumerate(a.items()):
+        new = b.get(key)
+        if new != old:
+            changes.append((section, key if prefix is None else (prefix, key), old, new, index))
+    for key, new in b.items():
+        if key not in a:
+            changes.append((section, key if prefix is None else (prefix, key), None, new, -1))
+    return changes
+
+
+class FileDiff:
+    """The changes between two states of a DesktopFile.
+
+    Each change is ``(section, key, old, new, index)``: *old*/*new* are None
+    when the key is absent on that side, and *index* is the key's position in
+    the old state so a deletion can be undone in place.
+    """
+
+    __slots__ = ("changes", "field", "time", "size", "description")
+
+    def __init__(self, changes, field: Optional[str] = None, description: str = ""):
+        self.changes = tuple(changes)
+        self.field = field
+        self.description = description
+        self.time = time.monotonic()
+        self.size = self._measure()
+
+    def _measure(self) -> int:
+        size = sys.getsizeof(self.changes)
+        for _section, key, old, new, _index in self.changes:
+            size += _CHANGE_OVERHEAD
+            size += len(key) if isinstance(key, str) else sum(len(k) for k in key)
+            for value in (old, new):
+                if isinstance(value, str):
+                    size += len(value)
+                elif value is not None:
+                    size += sum(len(k) + len(v) for k, v in value)
+        return size
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    @classmethod
+    def between(cls, a, b, field: Optional[str] = None) -> "FileDiff":
+        """Return the diff that turns DesktopFile *a* into *b*."""
+        changes = _diff_ordered(ENTRY, a.entries, b.entries)
+
+        for item, old in a.localized.items():
+            new = b.localized.get(item)
+            if new != old:
+                changes.append((LOCALIZED, item, old, new, -1))
+        for item, new in b.localized.items():
+            if item not in a.localized:
+                changes.append((LOCALIZED, item, None, new, -1))
+
+        for index, (name, old_group) in enumerate(a.extra_groups.items()):
+            new_group = b.extra_groups.get(name)
+            if new_group is None:
+                changes.append((GROUP, name, tuple(old_group.items()), None, index))
+            elif new_group != old_group:
+                changes.extend(_diff_ordered(GROUP_KEY, old_group, new_group, name))
+        for name, new_group in b.extra_groups.items():
+            if name not in a.extra_groups:
+                changes.append((GROUP, name, None, tuple(new_group.items()), -1))
+        return cls(changes, field)
+
+    @classmethod
+    def of_entry(cls, df, key: str, new: Optional[str],
+                 field: Optional[str] = None) -> "FileDiff":
+        """Return the diff that sets main-group *key* of *df* to *new* (None removes it).
+
+        Unlike :meth:`between` this needs no second copy of the file.
+        """
+        old = df.entries.get(key)
+        if new == old:
+            return cls((), field)
+        index = list(df.entries).index(key) if old is not None else -1
+        return cls([(ENTRY, key, old, new, index)], field)
+
+    @classmethod
+    def of_translation(cls, df, key: str, locale: str, new: Optional[str],
+                       field: Optional[str] = None) -> "FileDiff":
+        """Return the diff that sets the *locale* translation of *key* in *df* to *new*."""
+        old = df.localized.get((key, locale))
+        return cls(() if new == old else [(LOCALIZED, (key, locale), old, new, -1)], field)
+
+    def keys(self) -> set:
+        return {(section, key) for section, key, _old, _new, _index in self.changes}
+
+    def merge(self, later: "FileDiff") -> "FileDiff":
+        """Return one diff equivalent to applying self, then *later*."""
+        merged = {(c[0], c[1]): c for c in self.changes}
+        for section, key, old, new, index in later.changes:
+            first = merged.get((section, key))
+            if first is None:
+                merged[(section, key)] = (section, key, old, new, index)
+            elif first[2] == new:
+                del merged[(section, key)]
+            else:
+                merged[(section, key)] = (section, key, first[2], new, first[4])
+        diff = FileDiff(merged.values(), self.field, self.description)
+        diff.time = later.time
+        return diff
+
+    def _apply(self, df, forward: bool):
+        # Undo replays in reverse so positions are restored front to back
+        changes = self.changes if forward else reversed(self.changes)
+        for section, key, old, new, index in changes:
+            value, index = (new, -1) if forward else (old, index)
+            if section == ENTRY:
+                _set(df.entries, key, value, index)
+            elif section == LOCALIZED:
+                if value is None:
+                    df.localized.pop(key, None)
+                else:
+                    df.localized[key] = value
+            elif section == GROUP_KEY:
+                name, group_key = key
+                group = df.extra_groups.setdefault(name, OrderedDict())
+                _set(group, group_key, value, index)
+            else:
+                _set(df.extra_groups, key,
+                     None if value is None else OrderedDict(value), index)
+
+    def undo(self, df):
+        self._apply(df, forward=False)
+
+    def redo(self, df):
+        self._apply(df, forward=True)
+
+
+class EditHistory(UndoRedoManager):
+    """Undo history of DesktopFile edits stored as compact diffs.
+
+    Consecutive edits of the same field that arrive within
+    *coalesce_seconds* of each other and touch the same keys are merged
+    into a single step, so undo works per word burst rather than per
+    keystroke.
+    """
+
+    def __init__(self, max_size=1000, max_bytes=1024 * 1024, coalesce_seconds=1.0):
+        super().__init__(max_size=max_size, max_bytes=max_bytes)
+        self.coalesce_seconds = coalesce_seconds
+
+    def record(self, diff: FileDiff):
+        """Add *diff* as a new step, or fold it into the previous one."""
+        if not diff:
+            return
+        top = self._undo_stack[-1] if self._undo_stack else None
+        if (top is not None and not self._redo_stack
+                and isinstance(top, FileDiff)
+                and diff.field is not None and diff.field == top.field
+                and diff.time - top.time <= self.coalesce_seconds
+                and diff.keys() == top.keys()):
+            merged = top.merge(diff)
+            self._undo_stack.pop()
+            self._bytes -= top.size
+            if merged:
+                self._undo_stack.append(merged)
+                self._bytes += merged.size
+                # A coalesced step grows as typing goes on
+                self._trim()
+            return
+        self._push_step(diff)
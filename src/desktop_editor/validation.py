@@ -0,0 +1,575 @@
+"""Rule-based validation of .desktop files against the freedesktop.org spec.
+
+Each check is a :class:`Rule` registered with :func:`register`. A
+:class:`Validator` compiles the registered rules once into dispatch tables
+keyed by key name, so validating a file is a single pass over its keys that
+only runs the rules interested in each key.
+"""
+import re
+import time
+from collections import defaultdict
+from typing import Iterable, Iterator, Optional
+
+from desktop_editor.desktop_file import (
+    MAIN_CATEGORIES,
+    REQUIRED_KEYS,
+    STANDARD_KEYS,
+    VALID_TYPES,
+    DesktopFile,
+    ValidationMessage,
+)
+from desktop_editor.i18n import _
+
+BOOLEAN_KEYS = {
+    "NoDisplay", "Hidden", "DBusActivatable", "Terminal", "StartupNotify",
+    "PrefersNonDefaultGPU", "SingleMainWindow",
+}
+
+# Keys of type localestring/iconstring, which may carry a [locale] suffix
+LOCALIZABLE_KEYS = {"Name", "GenericName", "Comment", "Keywords", "Icon"}
+
+# Keys allowed in a [Desktop Action x] group
+ACTION_KEYS = {"Name", "Icon", "Exec"}
+
+ACTION_GROUP_PREFIX = "Desktop Action "
+
+# lang_COUNTRY.ENCODING@MODIFIER; COUNTRY may be a UN M.49 code, as in es_419
+LOCALE_RE = re.compile(r"^[a-z]{2,3}(_([A-Z]{2}|[0-9]{3}))?(\.[A-Za-z0-9-]+)?(@[A-Za-z0-9]+)?$")
+
+# Field codes: valid, deprecated (to be ignored) and file/URL codes
+FIELD_CODES = set("fFuUick%")
+DEPRECATED_FIELD_CODES = set("dDnNvm")
+FILE_FIELD_CODES = {"%f", "%F", "%u", "%U"}
+
+# Additional categories and the categories they must appear with. "A|B"
+# means either, "A;B" means both.
+ADDITIONAL_CATEGORIES = {
+    "Building": "Development", "Debugger": "Development", "IDE": "Development",
+    "GUIDesigner": "Development", "Profiling": "Development",
+    "RevisionControl": "Development", "Translation": "Development",
+    "Calendar": "Office", "ContactManagement": "Office",
+    "Database": "Office|Development|AudioVideo", "Dictionary": "Office|TextTools",
+    "Chart": "Office", "Email": "Office|Network", "Finance": "Office",
+    "FlowChart": "Office", "PDA": "Office", "ProjectManagement": "Office|Development",
+    "Presentation": "Office", "Spreadsheet": "Office", "WordProcessor": "Office",
+    "2DGraphics": "Graphics", "VectorGraphics": "Graphics;2DGraphics",
+    "RasterGraphics": "Graphics;2DGraphics", "3DGraphics": "Graphics",
+    "Scanning": "Graphics", "OCR": "Graphics;Scanning",
+    "Photography": "Graphics|Office", "Publishing": "Graphics|Office",
+    "Viewer": "Graphics|Office", "TextTools": "Utility",
+    "DesktopSettings": "Settings", "HardwareSettings": "Settings",
+    "Printing": "HardwareSettings;Settings", "PackageManager": "Settings",
+    "Dialup": "Network", "InstantMessaging": "Network", "Chat": "Network",
+    "IRCClient": "Network", "Feed": "Network", "FileTransfer": "Network",
+    "HamRadio": "Network|Audio", "News": "Network", "P2P": "Network",
+    "RemoteAccess": "Network", "Telephony": "Network", "TelephonyTools": "Utility",
+    "VideoConference": "Network", "WebBrowser": "Network",
+    "WebDevelopment": "Network|Development",
+    "Midi": "AudioVideo;Audio", "Mixer": "AudioVideo;Audio",
+    "Sequencer": "AudioVideo;Audio", "Tuner": "AudioVideo;Audio",
+    "TV": "AudioVideo;Video", "AudioVideoEditing": "Audio|Video|AudioVideo",
+    "Player": "Audio|Video|AudioVideo", "Recorder": "Audio|Video|AudioVideo",
+    "DiscBurning": "AudioVideo",
+    "ActionGame": "Game", "AdventureGame": "Game", "ArcadeGame": "Game",
+    "BoardGame": "Game", "BlocksGame": "Game", "CardGame": "Game",
+    "KidsGame": "Game", "LogicGame": "Game", "RolePlaying": "Game",
+    "Shooter": "Game", "Simulation": "Game", "SportsGame": "Game",
+    "StrategyGame": "Game",
+    "Art": "Education|Science", "Construction": "Education|Science",
+    "Music": "AudioVideo|Education", "Languages": "Education|Science",
+    "ArtificialIntelligence": "Education|Science", "Astronomy": "Education|Science",
+    "Biology": "Education|Science", "Chemistry": "Education|Science",
+    "ComputerScience": "Education|Science", "DataVisualization": "Education|Science",
+    "Economy": "Education|Science", "Electricity": "Education|Science",
+    "Geography": "Education|Science", "Geology": "Education|Science",
+    "Geoscience": "Education|Science", "History": "Education|Science",
+    "Humanities": "Education|Science", "ImageProcessing": "Education|Science",
+    "Literature": "Education|Science", "Maps": "Education|Science|Utility",
+    "Math": "Education|Science", "NumericalAnalysis": "Education;Math|Science;Math",
+    "MedicalSoftware": "Education|Science", "Physics": "Education|Science",
+    "Robotics": "Education|Science", "Spirituality": "Education|Science|Utility",
+    "Sports": "Education|Science",
+    "ParallelComputing": "Education;ComputerScience|Science;ComputerScience",
+    "Amusement": "", "Archiving": "Utility", "Compression": "Utility",
+    "Electronics": "", "Emulator": "System|Game", "Engineering": "",
+    "FileTools": "Utility|System", "FileManager": "System;FileTools",
+    "TerminalEmulator": "System", "Filesystem": "System", "Monitor": "System|Network",
+    "Security": "Settings|System", "Accessibility": "Settings|Utility",
+    "Calculator": "Utility", "Clock": "Utility", "TextEditor": "Utility",
+    "Documentation": "", "Adult": "", "Core": "",
+    "KDE": "Qt", "GNOME": "GTK", "XFCE": "GTK", "DDE": "Qt",
+    "GTK": "", "Qt": "", "Motif": "", "Java": "", "ConsoleOnly": "",
+}
+
+# Reserved categories, only valid together with OnlyShowIn
+RESERVED_CATEGORIES = {"Screensaver", "TrayIcon", "Applet", "Shell"}
+
+
+# Main categories that also need a companion main category
+MAIN_CATEGORY_RELATIONS = {"Audio": "AudioVideo", "Video": "AudioVideo"}
+
+CATEGORY_RELATIONS = {**ADDITIONAL_CATEGORIES, **MAIN_CATEGORY_RELATIONS}
+
+
+def _compile_requirements(spec: str) -> list[frozenset[str]]:
+    return [frozenset(alt.split(";")) for alt in spec.split("|")] if spec else []
+
+
+CATEGORY_REQUIREMENTS = {
+    name: _compile_requirements(spec) for name, spec in CATEGORY_RELATIONS.items()
+}
+
+
+def split_list(value: str) -> list[str]:
+    """Split a ``;``-separated list value, honouring ``\\;`` escapes."""
+    items = []
+    current = []
+    escaped = False
+    for ch in value:
+        if escaped:
+            current.append(ch if ch == ";" else "\\" + ch)
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == ";":
+            items.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    if current or escaped:
+        items.append("".join(current) + ("\\" if escaped else ""))
+    return [item for item in items if item]
+
+
+class ValidationContext:
+    """Per-file state shared by the rules during one validation pass."""
+
+    def __init__(self, df: DesktopFile):
+        self.df = df
+        self.type = df.entries.get("Type", "")
+
+
+class Rule:
+    """Base class for validation rules.
+
+    *scope* selects what the rule is dispatched on:
+
+    ``"file"``
+        :meth:`check_file` runs once per file.
+    ``"key"``
+        :meth:`check_key` runs for each main-group key listed in *keys*, or
+        for every main-group key when *keys* is None.
+    ``"localized"``
+        :meth:`check_localized` runs for each ``Key[locale]`` entry whose
+        base key is listed in *keys* (or for all of them).
+    ``"action"``
+        :meth:`check_key` runs for each key in every ``[Desktop Action x]``
+        group listed in *keys* (or for all of them), with ``group`` set.
+    """
+
+    id = ""
+    scope = "key"
+    keys: Optional[tuple[str, ...]] = None
+
+    def error(self, message: str, key: Optional[str] = None) -> ValidationMessage:
+        return ValidationMessage("error", message, rule=self.id, key=key)
+
+    def warning(self, message: str, key: Optional[str] = None) -> ValidationMessage:
+        return ValidationMessage("warning", message, rule=self.id, key=key)
+
+    def check_file(self, ctx: ValidationContext) -> Iterable[ValidationMessage]:
+        return ()
+
+    def check_key(self, ctx: ValidationContext, key: str, value: str,
+                  group: Optional[str] = None) -> Iterable[ValidationMessage]:
+        return ()
+
+    def check_localized(self, ctx: ValidationContext, key: str, locale: str,
+                        value: str) -> Iterable[ValidationMessage]:
+        return ()
+
+
+RULES: list[Rule] = []
+
+
+def register(cls):
+    """Class decorator adding a rule to the default rule set."""
+    RULES.append(cls())
+    global _default_validator
+    _default_validator = None
+    return cls
+
+
+# ── File-level rules ────────────────────────────────────────────────
+
+
+@register
+class RequiredKeysRule(Rule):
+    id = "required-key"
+    scope = "file"
+
+    def check_file(self, ctx):
+        for key in sorted(REQUIRED_KEYS):
+            if not ctx.df.entries.get(key):
+                yield self.error(_("Missing required key: %s") % key, key)
+
+
+@register
+class ExecMissingRule(Rule):
+    id = "exec-missing"
+    scope = "file"
+
+    def check_file(self, ctx):
+        entries = ctx.df.entries
+        if (ctx.type == "Application" and not entries.get("Exec")
+                and entries.get("DBusActivatable") != "true"):
+            yield self.warning(_("Application type should have an Exec key"), "Exec")
+
+
+@register
+class UrlMissingRule(Rule):
+    id = "url-missing"
+    scope = "file"
+
+    def check_file(self, ctx):
+        if ctx.type == "Link" and not ctx.df.entries.get("URL"):
+            yield self.warning(_("Link type should have a URL key"), "URL")
+
+
+@register
+class IconMissingRule(Rule):
+    id = "icon-missing"
+    scope = "file"
+
+    def check_file(self, ctx):
+        if not ctx.df.entries.get("Icon"):
+            yield self.warning(_("No icon specified"), "Icon")
+
+
+@register
+class CategoriesMissingRule(Rule):
+    id = "categories-missing"
+    scope = "file"
+
+    def check_file(self, ctx):
+        if ctx.type == "Application" and not ctx.df.entries.get("Categories"):
+            yield self.warning(_("No categories specified"), "Categories")
+
+
+@register
+class ActionsRule(Rule):
+    id = "actions"
+    scope = "file"
+
+    def check_file(self, ctx):
+        declared = split_list(ctx.df.entries.get("Actions", ""))
+        groups = {name[len(ACTION_GROUP_PREFIX):]
+                  for name in ctx.df.extra_groups if name.startswith(ACTION_GROUP_PREFIX)}
+        for action in declared:
+            if action not in groups:
+                yield self.error(
+                    _("Action %s has no [Desktop Action %s] group") % (action, action),
+                    "Actions")
+        for action in sorted(groups.difference(declared)):
+            yield self.warning(
+                _("[Desktop Action %s] is not listed in Actions") % action, "Actions")
+        for action in sorted(groups):
+            if not ctx.df.extra_groups[ACTION_GROUP_PREFIX + action].get("Name"):
+                yield self.error(
+                    _("[Desktop Action %s] is missing the Name key") % action)
+
+
+# ── Key rules ───────────────────────────────────────────────────────
+
+
+@register
+class TypeRule(Rule):
+    id = "invalid-type"
+    keys = ("Type",)
+
+    def check_key(self, ctx, key, value, group=None):
+        if value and value not in VALID_TYPES:
+            yield self.error(_("Invalid Type: %s") % value, key)
+
+
+@register
+class UnknownKeyRule(Rule):
+    id = "unknown-key"
+
+    def check_key(self, ctx, key, value, group=None):
+        if key in STANDARD_KEYS or key.startswith("X-"):
+            return
+        if key.endswith("]") and "[" in key:
+            yield self.warning(_("Invalid localized key: %s") % key, key)
+        else:
+            yield self.warning(_("Non-standard key: %s") % key, key)
+
+
+@register
+class BooleanRule(Rule):
+    id = "boolean-value"
+    keys = tuple(sorted(BOOLEAN_KEYS))
+
+    def check_key(self, ctx, key, value, group=None):
+        if value not in ("true", "false"):
+            yield self.error(
+                _("%(key)s must be \"true\" or \"false\", not \"%(value)s\"")
+                % {"key": key, "value": value}, key)
+
+
+def _iter_field_codes(value: str) -> Iterator[tuple[int, str]]:
+    i = value.find("%")
+    while i != -1:
+        code = value[i + 1:i + 2]
+        yield i, code
+        i = value.find("%", i + 2)
+
+
+class _ExecRuleMixin:
+    def check_exec(self, key, value, group=None):
+        where = key if group is None else f"{group}/{key}"
+        file_codes = []
+        for pos, code in _iter_field_codes(value):
+            if code in DEPRECATED_FIELD_CODES:
+                yield self.warning(
+                    _("%(key)s uses deprecated field code %%%(code)s")
+                    % {"key": where, "code": code}, key)
+            elif code not in FIELD_CODES:
+                yield self.error(
+                    _("%(key)s contains invalid field code \"%%%(code)s\"")
+                    % {"key": where, "code": code}, key)
+            elif "%" + code in FILE_FIELD_CODES:
+                file_codes.append((pos, code))
+        if len(file_codes) > 1:
+            yield self.error(
+                _("%s may contain at most one of %%f, %%F, %%u and %%U") % where, key)
+        for pos, code in file_codes:
+            if code in "FU":
+                before = value[pos - 1:pos]
+                after = value[pos + 2:pos + 3]
+                if before not in ("", " ") or after not in ("", " "):
+                    yield self.error(
+                        _("%(key)s: %%%(code)s must be a separate argument")
+                        % {"key": where, "code": code}, key)
+
+
+@register
+class ExecFieldCodeRule(_ExecRuleMixin, Rule):
+    id = "exec-field-codes"
+    keys = ("Exec",)
+
+    def check_key(self, ctx, key, value, group=None):
+        return self.check_exec(key, value)
+
+
+@register
+class CategoriesRule(Rule):
+    id = "categories"
+    keys = ("Categories",)
+
+    def check_key(self, ctx, key, value, group=None):
+        categories = split_list(value)
+        present = set(categories)
+        main = present.intersection(MAIN_CATEGORIES)
+        if categories and not main and ctx.type == "Application":
+            yield self.warning(_("Categories should include at least one main category"), key)
+        for cat in categories:
+            if cat.startswith("X-"):
+                continue
+            if cat in RESERVED_CATEGORIES:
+                if not ctx.df.entries.get("OnlyShowIn"):
+                    yield self.error(
+                        _("Reserved category %s requires OnlyShowIn") % cat, key)
+                continue
+            requirements = CATEGORY_REQUIREMENTS.get(cat)
+            if requirements is None:
+                if cat in MAIN_CATEGORIES:
+                    continue
+                if cat == "Application":
+                    yield self.warning(_("Category \"Application\" is deprecated"), key)
+                else:
+                    yield self.warning(_("Unknown category: %s") % cat, key)
+            elif requirements and not any(req <= present for req in requirements):
+                yield self.warning(
+                    _("Category %(cat)s should be used together with %(req)s")
+                    % {"cat": cat, "req": CATEGORY_RELATIONS[cat]
+                       .replace(";", " + ").replace("|", " or ")},
+                    key)
+
+
+# ── Localized and action rules ──────────────────────────────────────
+
+
+@register
+class LocaleKeyRule(Rule):
+    id = "locale-key"
+    scope = "localized"
+
+    def check_localized(self, ctx, key, locale, value):
+        full = f"{key}[{locale}]"
+        if key not in LOCALIZABLE_KEYS and not key.startswith("X-"):
+            yield self.warning(_("%s is not a localizable key") % full, key)
+        if not LOCALE_RE.match(locale):
+            yield self.warning(_("Invalid locale in key: %s") % full, key)
+
+
+@register
+class ActionKeyRule(_ExecRuleMixin, Rule):
+    id = "action-keys"
+    scope = "action"
+
+    def check_key(self, ctx, key, value, group=None):
+        if key == "Exec":
+            yield from self.check_exec(key, value, group)
+        elif key not in ACTION_KEYS and not key.startswith("X-"):
+            base, _sep, locale = key.partition("[")
+            if not (locale.endswith("]") and base in ("Name", "Icon")):
+                yield self.warning(
+                    _("Non-standard key in [%(group)s]: %(key)s")
+                    % {"group": group, "key": key})
+
+
+# ── Engine ──────────────────────────────────────────────────────────
+
+
+class RuleTimings:
+    """Accumulated call counts and time spent per rule id."""
+
+    def __init__(self):
+        self.calls: dict[str, int] = defaultdict(int)
+        self.ns: dict[str, int] = defaultdict(int)
+
+    def merge(self, other: "RuleTimings | dict"):
+        if isinstance(other, dict):
+            other = RuleTimings.from_dict(other)
+        for rule_id, calls in other.calls.items():
+            self.calls[rule_id] += calls
+            self.ns[rule_id] += other.ns[rule_id]
+
+    def as_dict(self) -> dict:
+        return {rule_id: [self.calls[rule_id], self.ns[rule_id]] for rule_id in self.calls}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RuleTimings":
+        timings = cls()
+        for rule_id, (calls, ns) in data.items():
+            timings.calls[rule_id] = calls
+            timings.ns[rule_id] = ns
+        return timings
+
+    def report(self) -> str:
+        """Return a table of rules sorted by total time, most expensive first."""
+        lines = [f"{'rule':<22} {'calls':>9} {'total ms':>10} {'us/call':>9}"]
+        for rule_id in sorted(self.ns, key=self.ns.get, reverse=True):
+            calls = self.calls[rule_id]
+            ns = self.ns[rule_id]
+            lines.append(f"{rule_id:<22} {calls:>9} {ns / 1e6:>10.2f} "
+                         f"{ns / calls / 1e3 if calls else 0:>9.2f}")
+        return "\n".join(lines)
+
+
+class _TimedRule:
+    """Proxy that records the time spent in each call of a rule."""
+
+    def __init__(self, rule: Rule, timings: RuleTimings):
+        self.rule = rule
+        self.timings = timings
+
+    def _timed(self, method, *args):
+        start = time.perf_counter_ns()
+        result = list(method(*args))
+        self.timings.ns[self.rule.id] += time.perf_counter_ns() - start
+        self.timings.calls[self.rule.id] += 1
+        return result
+
+    def check_file(self, *args):
+        return self._timed(self.rule.check_file, *args)
+
+    def check_key(self, *args):
+        return self._timed(self.rule.check_key, *args)
+
+    def check_localized(self, *args):
+        return self._timed(self.rule.check_localized, *args)
+
+
+class Validator:
+    """A set of rules compiled into per-key dispatch tables."""
+
+    def __init__(self, rules: Optional[Iterable[Rule]] = None,
+                 timings: Optional[RuleTimings] = None):
+        self.timings = timings
+        self.file_rules = []
+        self.key_rules: dict[str, list] = defaultdict(list)
+        self.any_key_rules = []
+        self.localized_rules: dict[str, list] = defaultdict(list)
+        self.any_localized_rules = []
+        self.action_rules: dict[str, list] = defaultdict(list)
+        self.any_action_rules = []
+
+        tables = {
+            "key": (self.key_rules, self.any_key_rules),
+            "localized": (self.localized_rules, self.any_localized_rules),
+            "action": (self.action_rules, self.any_action_rules),
+        }
+        for rule in RULES if rules is None else rules:
+            target = _TimedRule(rule, timings) if timings is not None else rule
+            if rule.scope == "file":
+                self.file_rules.append(target)
+                continue
+            by_key, any_key = tables[rule.scope]
+            if rule.keys is None:
+                any_key.append(target)
+            else:
+                for key in rule.keys:
+                    by_key[key].append(target)
+        # Freeze: fold the catch-all rules into a lookup that never misses
+        self._key_dispatch = self._freeze(self.key_rules, self.any_key_rules)
+        self._localized_dispatch = self._freeze(self.localized_rules, self.any_localized_rules)
+        self._action_dispatch = self._freeze(self.action_rules, self.any_action_rules)
+
+    @staticmethod
+    def _freeze(by_key: dict, any_key: list):
+        table = {key: tuple(rules) + tuple(any_key) for key, rules in by_key.items()}
+        fallback = tuple(any_key)
+        return lambda key: table.get(key, fallback)
+
+    def validate(self, df: DesktopFile) -> list[ValidationMessage]:
+        ctx = ValidationContext(df)
+        msgs = []
+        for rule in self.file_rules:
+            msgs.extend(rule.check_file(ctx))
+
+        dispatch = self._key_dispatch
+        for key, value in df.entries.items():
+            for rule in dispatch(key):
+                msgs.extend(rule.check_key(ctx, key, value))
+
+        dispatch = self._localized_dispatch
+        for (key, locale), value in df.localized.items():
+            for rule in dispatch(key):
+                msgs.extend(rule.check_localized(ctx, key, locale, value))
+
+        dispatch = self._action_dispatch
+        for group, group_entries in df.extra_groups.items():
+            if not group.startswith(ACTION_GROUP_PREFIX):
+                continue
+            for key, value in group_entries.items():
+                for rule in dispatch(key):
+                    msgs.extend(rule.check_key(ctx, key, value, group))
+        return msgs
+
+
+_default_validator: Optional[Validator] = None
+
+
+def get_validator() -> Validator:
+    """Return the validator for the registered rules, compiled on first use."""
+    global _default_validator
+    if _default_validator is None:
+        _default_validator = Validator()
+    return _default_validator
+
+
+def validate(df: DesktopFile) -> list[ValidationMessage]:
+    """Validate *df* with the registered rules."""
+    return get_validator().validate(df)
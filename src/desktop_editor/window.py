@@ -1,7 +1,6 @@
 """Main editor window."""
-import csv
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as _dt_now
 
 import gi
@@ -9,14 +8,49 @@ import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
 
-from gi.repository import Adw, Gio, Gtk, Pango  # noqa: E402
+from gi.repository import Adw, Gio, GLib, GObject, Gtk, Pango  # noqa: E402
 
 from desktop_editor.i18n import _
 from desktop_editor.desktop_file import (
     DesktopFile,
     MAIN_CATEGORIES,
-    list_desktop_files,
+    TRANSLATABLE_KEYS,
+    split_locale_key,
 )
+from desktop_editor.app_index import DesktopFileIndex
+from desktop_editor import bulk_edit, export
+from desktop_editor.icon_cache import IconCache
+from desktop_editor.parse_cache import get_default_cache, load_cached
+from desktop_editor.search_index import SearchIndex, scan_file, scanned_tokens
+from desktop_editor.translation_coverage import CoverageMatrix, entry_row
+from desktop_editor.undo_redo import EditHistory, FileDiff
+
+
+# Quiet period after the last edit before the form is validated
+VALIDATION_DEBOUNCE_MS = 300
+SIDEBAR_ICON_SIZE = 24
+PREVIEW_ICON_SIZE = 64
+# Choices of the Type row, in order; an unknown Type shows as the first
+DESKTOP_TYPES = ("Application", "Link", "Directory")
+
+
+class DesktopEntryItem(GObject.Object):
+    """Sidebar list item for one .desktop file."""
+
+    path = GObject.Property(type=str, default="")
+    label = GObject.Property(type=str, default="")
+
+    def __init__(self, path: str, desktop_id: str | None = None, label: str | None = None,
+                 icon: str | None = None):
+        super().__init__(path=path, label=label or desktop_id or os.path.basename(path))
+        self.desktop_id = desktop_id
+        self.icon = icon
+
+
+class TranslationRow(GObject.Object):
+    """Translation grid row for one locale."""
+
+    locale = GObject.Property(type=str, default="")
 
 
 class DesktopEditorWindow(Adw.ApplicationWindow):
@@ -30,7 +64,60 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
             **kwargs,
         )
         self.desktop_file: DesktopFile | None = None
+        self.app_index = DesktopFileIndex()
+        self.app_index.connect("changed", self._on_index_changed)
+        self._sidebar_items: dict[str, DesktopEntryItem] = {}
+        # Sidebar labels and search tokens are scanned off the main loop
+        self.search_index = SearchIndex()
+        self._search_matches: set[str] | None = None
+        self._search_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="desktop-search")
+        # Icons are resolved once per name and size; rows showing one are
+        # updated when the icon theme changes
+        self.icon_cache = IconCache()
+        self.icon_cache.connect("changed", self._on_icons_changed)
+        self._icon_rows: dict[Gtk.Image, DesktopEntryItem] = {}
+        # Translation coverage of every installed entry. Parsing them all is
+        # put off until the coverage page is first shown; from then on it
+        # is updated per file from the parse cache as the index reports changes
+        self.coverage = CoverageMatrix()
+        self._coverage_started = False
+        self._coverage_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="desktop-coverage")
+        self._coverage_rows: dict[str, tuple[Adw.ExpanderRow, Gtk.LevelBar, dict]] = {}
+        # Live validation: runs on a snapshot of the form, off the main loop
+        self._validation_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="desktop-validate")
+        self._validation_source = 0
+        self._validation_generation = 0
+        self._validation_rows: dict[tuple, Adw.ActionRow] = {}
+        self._validation_messages = None
+        self._flagged_fields: set[str] = set()
+        # Locales added in the grid but not yet translated
+        self._added_locales: list[str] = []
+        # Translatable keys the form has a value for; only these can be translated
+        self._translatable_keys: set[str] = set()
+        # Bulk edits of the files selected in the sidebar
+        self._bulk_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="desktop-bulk")
+        # File I/O runs off the main loop. Opens run side by side and a new
+        # one cancels the last; saves run one at a time, in order.
+        self._open_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="desktop-open")
+        self._save_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="desktop-save")
+        self._open_cancellable: Gio.Cancellable | None = None
+        self._io_pending = 0
+        # Undo history: diffs against the last recorded state of the form
+        self.history = EditHistory()
+        self._history_base: DesktopFile | None = None
+        self._suppress_history = False
+        self._filling_ui = False
+        # Edits made to the open document, and how many of them are on disk
+        self._edit_generation = 0
+        self._saved_generation = 0
         self._build_ui()
+        self.connect("close-request", self._on_close_request)
 
     # ── UI construction ─────────────────────────────────────────────
 
@@ -66,6 +153,10 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         save_btn.connect("clicked", lambda b: self.save_file())
         header.pack_start(save_btn)
 
+        # Busy while a file is being read or written
+        self.io_spinner = Gtk.Spinner(visible=False)
+        header.pack_start(self.io_spinner)
+
         # Main layout: split view with sidebar
         self.split_view = Adw.OverlaySplitView(
             show_sidebar=True,
@@ -79,16 +170,57 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         sidebar_header = Adw.HeaderBar()
         sidebar_header.set_title_widget(Gtk.Label(label=_("Applications")))
         sidebar_header.set_show_end_title_buttons(False)
+        self.select_btn = Gtk.ToggleButton(icon_name="selection-mode-symbolic",
+                                           tooltip_text=_("Select multiple files"))
+        self.select_btn.connect("toggled", self._on_selection_mode_toggled)
+        sidebar_header.pack_end(self.select_btn)
         sidebar_box.append(sidebar_header)
 
-        # File list
+        # Search over every installed entry
+        self.search_entry = Gtk.SearchEntry(
+            placeholder_text=_("Search applications"),
+            margin_start=8, margin_end=8, margin_bottom=4,
+        )
+        self.search_entry.set_key_capture_widget(self)
+        self.search_entry.connect("search-changed", self._on_search_changed)
+        sidebar_box.append(self.search_entry)
+
+        # File list: recycled rows over a list store kept in sync with the
+        # live application index
         scrolled = Gtk.ScrolledWindow(vexpand=True)
-        self.file_list = Gtk.ListBox(selection_mode=Gtk.SelectionMode.SINGLE)
+        self.file_store = Gio.ListStore.new(DesktopEntryItem)
+        # The entries matching a search, shown instead of file_store; filled
+        # from the search index's result set, so no row is tested one by one
+        self.search_results = Gio.ListStore.new(DesktopEntryItem)
+        sorter = Gtk.StringSorter.new(
+            Gtk.PropertyExpression.new(DesktopEntryItem, None, "label"))
+        self.sorted_files = Gtk.SortListModel(
+            model=self.file_store, sorter=sorter, incremental=True)
+        self.file_selection = Gtk.SingleSelection(
+            model=self.sorted_files, autoselect=False, can_unselect=True)
+        self.file_multi_selection = Gtk.MultiSelection(model=self.sorted_files)
+        self.file_multi_selection.connect("selection-changed", self._on_multi_selection_changed)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_file_row_setup)
+        factory.connect("bind", self._on_file_row_bind)
+        factory.connect("unbind", self._on_file_row_unbind)
+        self.file_list = Gtk.ListView(
+            model=self.file_selection, factory=factory, single_click_activate=True)
         self.file_list.add_css_class("navigation-sidebar")
-        self.file_list.connect("row-activated", self._on_file_selected)
+        self.file_list.connect("activate", self._on_file_activated)
         scrolled.set_child(self.file_list)
         sidebar_box.append(scrolled)
 
+        # Selection mode: act on several files at once
+        self.bulk_bar = Gtk.ActionBar(revealed=False)
+        self.bulk_count_label = Gtk.Label()
+        self.bulk_bar.pack_start(self.bulk_count_label)
+        self.bulk_edit_btn = Gtk.Button(label=_("Edit…"), css_classes=["suggested-action"],
+                                        sensitive=False)
+        self.bulk_edit_btn.connect("clicked", self._on_bulk_edit_clicked)
+        self.bulk_bar.pack_end(self.bulk_edit_btn)
+        sidebar_box.append(self.bulk_bar)
+
         self.split_view.set_sidebar(sidebar_box)
 
         # ── Content: editor ──
@@ -104,23 +236,29 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         editor_scroll.set_child(self.editor_page)
         self.stack.add_titled(editor_scroll, "editor", _("Editor"))
 
-        # Translations page
-        trans_scroll = Gtk.ScrolledWindow(vexpand=True)
-        self.translations_page = self._build_translations_page()
-        trans_scroll.set_child(self.translations_page)
-        self.stack.add_titled(trans_scroll, "translations", _("Translations"))
-
-        # Validation page
-        valid_scroll = Gtk.ScrolledWindow(vexpand=True)
-        self.validation_page = self._build_validation_page()
-        valid_scroll.set_child(self.validation_page)
-        self.stack.add_titled(valid_scroll, "validation", _("Validation"))
-
-        # Preview page
-        preview_scroll = Gtk.ScrolledWindow(vexpand=True)
-        self.preview_page = self._build_preview_page()
-        preview_scroll.set_child(self.preview_page)
-        self.stack.add_titled(preview_scroll, "preview", _("Preview"))
+        # The other pages are built the first time they are shown, and only
+        # refreshed while visible; changes to hidden pages mark them dirty
+        self._page_builders = {
+            "translations": self._build_translations_page,
+            "validation": self._build_validation_page,
+            "preview": self._build_preview_page,
+            "coverage": self._build_coverage_page,
+        }
+        self._page_refreshers = {
+            "translations": self._update_translations_page,
+            "validation": self._update_validation_list,
+            "preview": self._update_preview,
+            "coverage": self._update_coverage_page,
+        }
+        self._dirty_pages: set[str] = set()
+        for name, title in [("translations", _("Translations")),
+                            ("validation", _("Validation")),
+                            ("preview", _("Preview")),
+                            ("coverage", _("Coverage"))]:
+            # The translation grid scrolls itself, so it can recycle rows
+            page = Adw.Bin() if name == "translations" else Gtk.ScrolledWindow(vexpand=True)
+            self.stack.add_titled(page, name, title)
+        self.stack.connect("notify::visible-child", self._on_visible_page_changed)
 
         # View switcher bar
         switcher = Adw.ViewSwitcherBar(stack=self.stack, reveal=True)
@@ -144,6 +282,27 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         # Populate sidebar
         self._populate_file_list()
 
+    # ── Pages ───────────────────────────────────────────────────────
+
+    def _on_visible_page_changed(self, stack, _pspec):
+        name = stack.get_visible_child_name()
+        builder = self._page_builders.pop(name, None)
+        if builder is not None:
+            stack.get_child_by_name(name).set_child(builder())
+            self._dirty_pages.add(name)
+        if name in self._dirty_pages:
+            self._dirty_pages.discard(name)
+            self._page_refreshers[name]()
+
+    def _refresh_page(self, name: str):
+        """Refresh page *name* now if it is showing, else when it is next shown."""
+        if name in self._page_builders:
+            return
+        if self.stack.get_visible_child_name() == name:
+            self._page_refreshers[name]()
+        else:
+            self._dirty_pages.add(name)
+
     def _build_editor_page(self) -> Gtk.Widget:
         """Build the main editor form."""
         clamp = Adw.Clamp(maximum_size=700, margin_top=24, margin_bottom=24,
@@ -177,7 +336,7 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         options_group = Adw.PreferencesGroup(title=_("Options"))
 
         self.combo_type = Adw.ComboRow(title=_("Type"))
-        type_model = Gtk.StringList.new(["Application", "Link", "Directory"])
+        type_model = Gtk.StringList.new(list(DESKTOP_TYPES))
         self.combo_type.set_model(type_model)
         options_group.add(self.combo_type)
 
@@ -226,32 +385,95 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         extra_group.add(self.entry_url)
         box.append(extra_group)
 
+        # Form fields by key, for inline validation state
+        self._field_rows = {
+            "Name": self.entry_name,
+            "GenericName": self.entry_generic_name,
+            "Comment": self.entry_comment,
+            "Exec": self.entry_exec,
+            "Icon": self.entry_icon,
+            "Path": self.entry_path,
+            "Categories": self.entry_categories,
+            "MimeType": self.entry_mimetype,
+            "Keywords": self.entry_keywords,
+            "StartupWMClass": self.entry_wm_class,
+            "URL": self.entry_url,
+            "Type": self.combo_type,
+            "Terminal": self.switch_terminal,
+            "NoDisplay": self.switch_no_display,
+            "StartupNotify": self.switch_startup_notify,
+        }
+        for key, row in self._field_rows.items():
+            if isinstance(row, Adw.EntryRow):
+                # Undo is handled per document, not per entry
+                row.set_enable_undo(False)
+                row.connect("changed", self._schedule_validation)
+                row.connect("changed", self._on_field_edited, key)
+                if key in TRANSLATABLE_KEYS:
+                    row.connect("changed", self._on_translatable_field_changed, key)
+            elif isinstance(row, Adw.ComboRow):
+                row.connect("notify::selected", self._schedule_validation)
+                row.connect("notify::selected", self._on_field_edited, key)
+            else:
+                row.connect("notify::active", self._schedule_validation)
+                row.connect("notify::active", self._on_field_edited, key)
+
         clamp.set_child(box)
         return clamp
 
     def _build_translations_page(self) -> Gtk.Widget:
-        clamp = Adw.Clamp(maximum_size=700, margin_top=24, margin_bottom=24,
-                          margin_start=12, margin_end=12)
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12,
+                      margin_top=24, margin_bottom=12, margin_start=12, margin_end=12)
 
         # Add locale row
         add_group = Adw.PreferencesGroup(title=_("Add Translation"))
         add_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
         self.new_locale_entry = Gtk.Entry(placeholder_text=_("Locale code (e.g. sv, de, fr)"))
         self.new_locale_entry.set_hexpand(True)
+        self.new_locale_entry.connect("activate", self._on_add_locale)
         add_box.append(self.new_locale_entry)
         add_btn = Gtk.Button(label=_("Add"), css_classes=["suggested-action"])
         add_btn.connect("clicked", self._on_add_locale)
         add_box.append(add_btn)
         add_group.add(add_box)
+        self.incomplete_check = Gtk.CheckButton(
+            label=_("Only show locales with missing or untranslated values"))
+        self.incomplete_check.connect(
+            "toggled", lambda b: self.translation_filter.changed(Gtk.FilterChange.DIFFERENT))
+        add_group.add(self.incomplete_check)
         box.append(add_group)
 
-        # Translation entries container
-        self.translations_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
-        box.append(self.translations_box)
-
-        clamp.set_child(box)
-        return clamp
+        # Locales as rows, translatable keys as columns; only visible rows
+        # have widgets, and they are recycled while scrolling
+        self.translation_store = Gio.ListStore.new(TranslationRow)
+        self.translation_filter = Gtk.CustomFilter.new(self._filter_translation_row)
+        grid = Gtk.ColumnView(
+            model=Gtk.NoSelection(model=Gtk.FilterListModel(
+                model=self.translation_store, filter=self.translation_filter)),
+            show_column_separators=True, show_row_separators=True,
+            css_classes=["data-table"],
+        )
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", lambda f, item: item.set_child(Gtk.Label(xalign=0)))
+        factory.connect("bind", lambda f, item: item.get_child().set_label(
+            item.get_item().locale))
+        grid.append_column(Gtk.ColumnViewColumn(title=_("Locale"), factory=factory))
+        for key in TRANSLATABLE_KEYS:
+            factory = Gtk.SignalListItemFactory()
+            factory.connect("setup", self._on_translation_cell_setup, key)
+            factory.connect("bind", self._on_translation_cell_bind, key)
+            factory.connect("unbind", self._on_translation_cell_unbind)
+            grid.append_column(Gtk.ColumnViewColumn(
+                title=key, factory=factory, expand=True, resizable=True))
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_remove_locale_cell_setup)
+        factory.connect("bind", lambda f, item: setattr(
+            item.get_child(), "_locale", item.get_item().locale))
+        grid.append_column(Gtk.ColumnViewColumn(factory=factory))
+
+        scrolled = Gtk.ScrolledWindow(vexpand=True, child=grid, css_classes=["card"])
+        box.append(scrolled)
+        return box
 
     def _build_validation_page(self) -> Gtk.Widget:
         clamp = Adw.Clamp(maximum_size=700, margin_top=24, margin_bottom=24,
@@ -321,69 +543,378 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         clamp.set_child(box)
         return clamp
 
+    def _build_coverage_page(self) -> Gtk.Widget:
+        clamp = Adw.Clamp(maximum_size=700, margin_top=24, margin_bottom=24,
+                          margin_start=12, margin_end=12)
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12)
+
+        self.coverage_summary = Gtk.Label(xalign=0, css_classes=["dim-label"])
+        box.append(self.coverage_summary)
+
+        self.coverage_list = Gtk.ListBox(
+            selection_mode=Gtk.SelectionMode.NONE,
+            css_classes=["boxed-list"],
+        )
+        self.coverage_list.set_sort_func(
+            lambda a, b: (a.get_title() > b.get_title()) - (a.get_title() < b.get_title()))
+        box.append(self.coverage_list)
+
+        self._coverage_started = True
+        self._coverage_pool.submit(self._coverage_worker, list(self.app_index))
+        clamp.set_child(box)
+        return clamp
+
     # ── Sidebar ─────────────────────────────────────────────────────
 
     def _populate_file_list(self):
-        while True:
-            row = self.file_list.get_row_at_index(0)
-            if row is None:
-                break
-            self.file_list.remove(row)
-
-        for path in list_desktop_files():
-            basename = os.path.basename(path)
-            row = Gtk.ListBoxRow()
-            label = Gtk.Label(
-                label=basename,
-                xalign=0,
-                ellipsize=Pango.EllipsizeMode.END,
-                margin_start=8, margin_end=8, margin_top=4, margin_bottom=4,
-            )
-            label.set_tooltip_text(path)
-            row.set_child(label)
-            row._desktop_path = path
-            self.file_list.append(row)
-
-    def _on_file_selected(self, listbox, row):
-        if hasattr(row, "_desktop_path"):
-            self.open_file(row._desktop_path)
+        """(Re)build the sidebar from the application index.
+
+        The index scans on a worker thread and reports files in chunks, so
+        rows appear while the scan is still running; afterwards only the
+        files its monitors report as changed are touched.
+        """
+        self._sidebar_items.clear()
+        self.file_store.remove_all()
+        self.search_results.remove_all()
+        self.search_index.clear()
+        self.app_index.stop()
+        self.app_index.start()
+
+    def _on_index_changed(self, index, updated, removed):
+        for desktop_id in removed:
+            self.search_index.remove(desktop_id)
+            self.coverage.remove(desktop_id)
+            item = self._sidebar_items.pop(desktop_id, None)
+            if item is not None:
+                found, position = self.file_store.find(item)
+                if found:
+                    self.file_store.remove(position)
+
+        if updated:
+            self._search_pool.submit(self._scan_worker, updated)
+            if self._coverage_started:
+                self._coverage_pool.submit(self._coverage_worker, updated)
+        if removed:
+            self._refresh_page("coverage")
+        if removed and self._search_matches is not None:
+            self._refresh_search()
+
+    def _scan_worker(self, found_files):
+        """Read labels and search tokens for new or changed entries."""
+        results = []
+        for found in found_files:
+            try:
+                values = scan_file(found.path, ("Icon",))
+            except (OSError, ValueError):
+                continue
+            icon = values.pop("Icon", None)
+            results.append((found, values.get("Name"), icon,
+                            scanned_tokens(values, found.desktop_id)))
+        GLib.idle_add(self._add_scanned_entries, results)
+
+    def _add_scanned_entries(self, results):
+        added = []
+        for found, name, icon, tokens in results:
+            # Skip entries removed or replaced while they were being scanned
+            current = self.app_index.get(found.desktop_id)
+            if current is None or current.path != found.path:
+                continue
+            item = DesktopEntryItem(found.path, found.desktop_id, name, icon)
+            old = self._sidebar_items.get(found.desktop_id)
+            self._sidebar_items[found.desktop_id] = item
+            self.search_index.add(found.desktop_id, tokens)
+            if old is None:
+                added.append(item)
+                continue
+            position_found, position = self.file_store.find(old)
+            if position_found:
+                self.file_store.splice(position, 1, [item])
+        if added:
+            self.file_store.splice(self.file_store.get_n_items(), 0, added)
+        if self._search_matches is not None:
+            self._refresh_search()
+        return GLib.SOURCE_REMOVE
+
+    def _coverage_worker(self, found_files):
+        """Summarize the translations of new or changed entries."""
+        cache = get_default_cache()
+        rows = []
+        for found in found_files:
+            try:
+                rows.append((found, entry_row(cache.load(found.path, found.stat))))
+            except OSError:
+                continue
+        GLib.idle_add(self._add_coverage_rows, rows)
+
+    def _add_coverage_rows(self, rows):
+        for found, row in rows:
+            current = self.app_index.get(found.desktop_id)
+            if current is not None and current.path == found.path:
+                self.coverage.update(found.desktop_id, row)
+        self._refresh_page("coverage")
+        return GLib.SOURCE_REMOVE
+
+    def _on_close_request(self, window):
+        self.app_index.stop()
+        self._search_pool.shutdown(wait=False, cancel_futures=True)
+        self._coverage_pool.shutdown(wait=False, cancel_futures=True)
+        self._validation_pool.shutdown(wait=False, cancel_futures=True)
+        if self._open_cancellable is not None:
+            self._open_cancellable.cancel()
+        self._open_pool.shutdown(wait=False, cancel_futures=True)
+        # Let running saves and bulk edits finish writing
+        self._save_pool.shutdown(wait=True)
+        self._bulk_pool.shutdown(wait=True)
+        return False
+
+    def _on_file_row_setup(self, factory, list_item):
+        box = Gtk.Box(spacing=8, margin_start=8, margin_end=8, margin_top=4, margin_bottom=4)
+        box.append(Gtk.Image(pixel_size=SIDEBAR_ICON_SIZE))
+        box.append(Gtk.Label(xalign=0, ellipsize=Pango.EllipsizeMode.END))
+        list_item.set_child(box)
+
+    def _on_file_row_bind(self, factory, list_item):
+        item = list_item.get_item()
+        box = list_item.get_child()
+        image = box.get_first_child()
+        label = box.get_last_child()
+        image.set_from_paintable(self.icon_cache.lookup(
+            item.icon, SIDEBAR_ICON_SIZE, self.get_scale_factor()))
+        self._icon_rows[image] = item
+        label.set_label(item.label)
+        box.set_tooltip_text(item.path)
+
+    def _on_file_row_unbind(self, factory, list_item):
+        self._icon_rows.pop(list_item.get_child().get_first_child(), None)
+
+    def _on_icons_changed(self, cache):
+        scale = self.get_scale_factor()
+        for image, item in self._icon_rows.items():
+            image.set_from_paintable(cache.lookup(item.icon, SIDEBAR_ICON_SIZE, scale))
+        self._refresh_page("preview")
+
+    def _on_file_activated(self, list_view, position):
+        item = self.file_selection.get_item(position)
+        if item is not None:
+            self.open_file(item.path)
+
+    # ── Bulk edit ───────────────────────────────────────────────────
+
+    def _on_selection_mode_toggled(self, btn):
+        active = btn.get_active()
+        if not active:
+            self.file_multi_selection.unselect_all()
+        self.file_list.set_model(self.file_multi_selection if active else self.file_selection)
+        self.file_list.set_single_click_activate(not active)
+        self.bulk_bar.set_revealed(active)
+        self._on_multi_selection_changed(self.file_multi_selection)
+
+    def _selected_paths(self) -> list[str]:
+        selection = self.file_multi_selection.get_selection()
+        return [self.file_multi_selection.get_item(selection.get_nth(i)).path
+                for i in range(selection.get_size())]
+
+    def _on_multi_selection_changed(self, model, *_args):
+        count = model.get_selection().get_size()
+        self.bulk_count_label.set_label(_("%d selected") % count)
+        self.bulk_edit_btn.set_sensitive(count > 0)
+
+    def _on_bulk_edit_clicked(self, btn):
+        paths = self._selected_paths()
+        group = Adw.PreferencesGroup()
+        add_cat = Adw.EntryRow(title=_("Add category"))
+        remove_cat = Adw.EntryRow(title=_("Remove category"))
+        exec_old = Adw.EntryRow(title=_("Exec prefix to replace"))
+        exec_new = Adw.EntryRow(title=_("New Exec prefix"))
+        no_display = Adw.ComboRow(
+            title="NoDisplay", model=Gtk.StringList.new([_("Unchanged"), "true", "false"]))
+        for row in (add_cat, remove_cat, exec_old, exec_new, no_display):
+            group.add(row)
+
+        dialog = Adw.MessageDialog(
+            transient_for=self,
+            heading=_("Edit %d Files") % len(paths),
+            body=_("Empty fields are left unchanged. All files are saved, or none."),
+            extra_child=group,
+        )
+        dialog.add_response("cancel", _("Cancel"))
+        dialog.add_response("apply", _("Apply"))
+        dialog.set_response_appearance("apply", Adw.ResponseAppearance.SUGGESTED)
+
+        def on_response(dialog, response):
+            if response != "apply":
+                return
+            operations = []
+            if add_cat.get_text().strip():
+                operations.append(bulk_edit.AddToList("Categories", add_cat.get_text().strip()))
+            if remove_cat.get_text().strip():
+                operations.append(
+                    bulk_edit.RemoveFromList("Categories", remove_cat.get_text().strip()))
+            if exec_old.get_text():
+                operations.append(
+                    bulk_edit.ReplacePrefix("Exec", exec_old.get_text(), exec_new.get_text()))
+            if no_display.get_selected() > 0:
+                operations.append(bulk_edit.SetValue(
+                    "NoDisplay", no_display.get_selected_item().get_string()))
+            if operations:
+                self.bulk_edit_btn.set_sensitive(False)
+                self._bulk_pool.submit(self._bulk_edit_worker, paths, operations)
+
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def _bulk_edit_worker(self, paths: list[str], operations: list):
+        plan = bulk_edit.plan(paths, operations)
+        try:
+            plan.commit()
+            error = None
+        except bulk_edit.BulkEditError as e:
+            error = str(e)
+        GLib.idle_add(self._on_bulk_edit_done, plan, error)
+
+    def _on_bulk_edit_done(self, plan, error):
+        self._on_multi_selection_changed(self.file_multi_selection)
+        if error:
+            self._show_error(_("Bulk Edit Failed"), error)
+            return GLib.SOURCE_REMOVE
+        self._show_toast(plan.summary().rsplit("\n", 1)[-1])
+        df = self.desktop_file
+        if df is None or not any(change.path == df.path for change in plan.changes):
+            return GLib.SOURCE_REMOVE
+        # Reload the open file unless that would discard unsaved edits
+        if self._is_dirty():
+            self._show_error(
+                _("Open File Changed on Disk"),
+                _("The bulk edit changed %s, which has unsaved changes. Saving it "
+                  "will overwrite the bulk edit; reopen it to keep the bulk edit "
+                  "instead.") % os.path.basename(df.path))
+        else:
+            self.open_file(df.path)
+        return GLib.SOURCE_REMOVE
+
+    # ── Search ──────────────────────────────────────────────────────
+
+    def _on_search_changed(self, entry):
+        self._refresh_search()
+
+    def _refresh_search(self):
+        matches = self.search_index.search(self.search_entry.get_text())
+        self._search_matches = matches
+        if matches is None:
+            self.search_results.remove_all()
+            model = self.file_store
+        else:
+            items = self._sidebar_items
+            self.search_results.splice(
+                0, self.search_results.get_n_items(),
+                [items[desktop_id] for desktop_id in matches if desktop_id in items])
+            model = self.search_results
+        if self.sorted_files.get_model() is not model:
+            self.sorted_files.set_model(model)
 
     # ── File operations ─────────────────────────────────────────────
 
     def new_file(self):
+        self._cancel_open()
         self.desktop_file = DesktopFile.new_application()
+        self._added_locales.clear()
+        self.history.clear()
         self._load_into_ui()
+        self._saved_generation = self._edit_generation
         self.set_title(_("Desktop File Editor") + " — " + _("New File"))
 
     def open_file(self, path: str):
-        try:
-            self.desktop_file = DesktopFile.load(path)
-            self._load_into_ui()
-            self.set_title(_("Desktop File Editor") + " — " + os.path.basename(path))
-        except Exception as e:
-            dialog = Adw.MessageDialog(
-                transient_for=self,
-                heading=_("Error Opening File"),
-                body=str(e),
-            )
-            dialog.add_response("ok", _("OK"))
-            dialog.present()
+        """Load *path* in the background; a later open or new file wins."""
+        self._cancel_open()
+        cancellable = self._open_cancellable = Gio.Cancellable()
+        self._io_started(_("Opening %s…") % os.path.basename(path))
+        self._open_pool.submit(self._open_worker, path, cancellable)
+
+    def _cancel_open(self):
+        if self._open_cancellable is not None:
+            self._open_cancellable.cancel()
+            self._open_cancellable = None
+
+    def _open_worker(self, path: str, cancellable: Gio.Cancellable):
+        df = error = None
+        if not cancellable.is_cancelled():
+            try:
+                df = load_cached(path)
+            except Exception as e:
+                error = str(e)
+        GLib.idle_add(self._on_file_opened, path, df, error, cancellable)
+
+    def _on_file_opened(self, path, df, error, cancellable):
+        self._io_finished()
+        # Superseded by another open or a new file while it was loading
+        if cancellable.is_cancelled() or cancellable is not self._open_cancellable:
+            return GLib.SOURCE_REMOVE
+        self._open_cancellable = None
+        if error is not None:
+            self._show_error(_("Error Opening File"), error)
+            return GLib.SOURCE_REMOVE
+        self.desktop_file = df
+        self._added_locales.clear()
+        self.history.clear()
+        self._load_into_ui()
+        self._saved_generation = self._edit_generation
+        self.set_title(_("Desktop File Editor") + " — " + os.path.basename(path))
+        return GLib.SOURCE_REMOVE
 
     def save_file(self):
         if not self.desktop_file:
             return
         self._save_from_ui()
         if self.desktop_file.path:
-            try:
-                self.desktop_file.save()
-                toast = Adw.Toast(title=_("File saved"))
-                # Find or create toast overlay — just use simple approach
-                self._show_toast(_("File saved"))
-            except Exception as e:
-                self._show_error(_("Error Saving File"), str(e))
+            self._save_to(self.desktop_file.path)
         else:
             self.show_save_dialog()
 
+    def _save_to(self, path: str):
+        """Write a snapshot of the current file to *path* in the background."""
+        df = self.desktop_file
+        self._io_started(_("Saving %s…") % os.path.basename(path))
+        self._save_pool.submit(self._save_worker, df, df.copy(), path, self._edit_generation)
+
+    def _save_worker(self, df: DesktopFile, snapshot: DesktopFile, path: str,
+                     generation: int):
+        try:
+            snapshot.save(path)
+            error = None
+        except Exception as e:
+            error = str(e)
+        GLib.idle_add(self._on_file_saved, df, snapshot, error, generation)
+
+    def _on_file_saved(self, df, snapshot, error, generation):
+        self._io_finished()
+        if error is not None:
+            self._show_error(_("Error Saving File"), error)
+            return GLib.SOURCE_REMOVE
+        # Later saves patch the text now on disk; *df* may have been edited
+        # or closed meanwhile, so only its path and source are updated
+        df.path = snapshot.path
+        df.source = snapshot.source
+        if df is self.desktop_file:
+            # Edits made while saving are still unsaved
+            self._saved_generation = generation
+            self.set_title(_("Desktop File Editor") + " — " + os.path.basename(df.path))
+            self._refresh_page("preview")
+        self._show_toast(_("File saved"))
+        return GLib.SOURCE_REMOVE
+
+    def _io_started(self, message: str):
+        self._io_pending += 1
+        self.io_spinner.set_visible(True)
+        self.io_spinner.start()
+        self._status_bar.set_text(message)
+
+    def _io_finished(self):
+        self._io_pending -= 1
+        if not self._io_pending:
+            self.io_spinner.stop()
+            self.io_spinner.set_visible(False)
+            self._update_status_bar()
+
     def _show_toast(self, message: str):
         """Show a simple toast notification."""
         dialog = Adw.MessageDialog(
@@ -429,9 +960,7 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
             file = dialog.save_finish(result)
             if file:
                 self._save_from_ui()
-                self.desktop_file.save(file.get_path())
-                self.set_title(_("Desktop File Editor") + " — " + os.path.basename(file.get_path()))
-                self._show_toast(_("File saved"))
+                self._save_to(file.get_path())
         except Exception:
             pass
 
@@ -443,6 +972,15 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         df = self.desktop_file
         if not df:
             return
+        self._suppress_history = self._filling_ui = True
+        try:
+            self._fill_ui(df)
+        finally:
+            self._suppress_history = self._filling_ui = False
+        self._history_base = df.copy()
+        self._apply_ui_to(self._history_base)
+
+    def _fill_ui(self, df: DesktopFile):
 
         self.entry_name.set_text(df.entries.get("Name", ""))
         self.entry_generic_name.set_text(df.entries.get("GenericName", ""))
@@ -458,8 +996,7 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
 
         # Type combo
         dtype = df.entries.get("Type", "Application")
-        type_map = {"Application": 0, "Link": 1, "Directory": 2}
-        self.combo_type.set_selected(type_map.get(dtype, 0))
+        self.combo_type.set_selected(DESKTOP_TYPES.index(dtype) if dtype in DESKTOP_TYPES else 0)
 
         # Switches
         self.switch_terminal.set_active(df.entries.get("Terminal", "false").lower() == "true")
@@ -471,47 +1008,53 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         for cat, check in self.cat_checks.items():
             check.set_active(cat in cats)
 
-        self._update_translations_page()
-        self._update_preview()
+        self._refresh_page("translations")
+        self._refresh_page("preview")
 
     def _save_from_ui(self):
         """Save UI field values back to desktop file model."""
-        df = self.desktop_file
-        if not df:
-            return
-
-        type_map = {0: "Application", 1: "Link", 2: "Directory"}
-        df.entries["Type"] = type_map.get(self.combo_type.get_selected(), "Application")
-        df.entries["Name"] = self.entry_name.get_text()
-
-        # Only set non-empty optional fields
-        for key, entry in [
-            ("GenericName", self.entry_generic_name),
-            ("Comment", self.entry_comment),
-            ("Exec", self.entry_exec),
-            ("Icon", self.entry_icon),
-            ("Path", self.entry_path),
-            ("Categories", self.entry_categories),
-            ("MimeType", self.entry_mimetype),
-            ("Keywords", self.entry_keywords),
-            ("StartupWMClass", self.entry_wm_class),
-            ("URL", self.entry_url),
-        ]:
-            val = entry.get_text()
-            if val:
-                df.entries[key] = val
-            elif key in df.entries:
-                del df.entries[key]
-
-        df.entries["Terminal"] = "true" if self.switch_terminal.get_active() else "false"
-        df.entries["NoDisplay"] = "true" if self.switch_no_display.get_active() else "false"
-        df.entries["StartupNotify"] = "true" if self.switch_startup_notify.get_active() else "false"
-
-        # Save translations from UI
-        self._save_translations_from_ui()
+        if self.desktop_file:
+            self._apply_ui_to(self.desktop_file)
+
+    def _apply_ui_to(self, df: DesktopFile):
+        """Write the form values that differ from *df* into *df*.
+
+        Keys the form shows as they already are are left alone, so an
+        untouched file saves byte for byte, defaults and all.
+        """
+        for key in self._field_rows:
+            value = self._form_value(key, df)
+            if value is None:
+                df.entries.pop(key, None)
+            else:
+                df.entries[key] = value
+
+    def _form_value(self, key: str, df: DesktopFile) -> str | None:
+        """Return the value the form gives *key* of *df*; None removes it."""
+        current = df.entries.get(key)
+        row = self._field_rows[key]
+        if key == "Type":
+            shown = DESKTOP_TYPES.index(current) if current in DESKTOP_TYPES else 0
+            selected = row.get_selected()
+            if selected == shown or selected >= len(DESKTOP_TYPES):
+                return current
+            return DESKTOP_TYPES[selected]
+        if isinstance(row, Adw.SwitchRow):
+            active = row.get_active()
+            if active == ((current or "false").lower() == "true"):
+                return current
+            return "true" if active else "false"
+        text = row.get_text()
+        if text == (current or ""):
+            return current
+        # Name is required: an emptied one is kept, empty, for validation to flag
+        return text or ("" if key == "Name" else None)
 
     def _on_category_toggled(self, check):
         """Update categories entry from checkboxes."""
+        # _fill_ui sets the entry and the checks from the same value
+        if self._filling_ui:
+            return
         cats = [cat for cat, cb in self.cat_checks.items() if cb.get_active()]
         # Preserve any non-standard categories already in the entry
         current = [c.strip() for c in self.entry_categories.get_text().split(";") if c.strip()]
@@ -522,103 +1065,281 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
     # ── Translations ────────────────────────────────────────────────
 
     def _update_translations_page(self):
-        """Rebuild translations page from model."""
-        # Clear
-        while True:
-            child = self.translations_box.get_first_child()
-            if child is None:
-                break
-            self.translations_box.remove(child)
+        """Reload the grid's locale rows from the model.
 
+        Cells read the model when they are bound, so only the rows in view
+        create or update widgets.
+        """
         df = self.desktop_file
-        if not df:
-            return
-
-        self._trans_entries = {}  # (key, locale) -> EntryRow
-
-        translatable_keys = ["Name", "GenericName", "Comment", "Keywords"]
-        locales = df.get_locales()
-
-        for locale in locales:
-            group = Adw.PreferencesGroup(title=locale)
-
-            # Delete locale button
-            del_btn = Gtk.Button(
-                icon_name="user-trash-symbolic",
-                tooltip_text=_("Remove locale %s") % locale,
-                css_classes=["destructive-action", "flat"],
-                valign=Gtk.Align.CENTER,
-            )
-            del_btn._locale = locale
-            del_btn.connect("clicked", self._on_remove_locale)
-            group.set_header_suffix(del_btn)
-
-            for key in translatable_keys:
-                trans = df.get_translations(key)
-                if locale in trans:
-                    row = Adw.EntryRow(title=f"{key}[{locale}]")
-                    row.set_text(trans[locale])
-                    row._trans_key = key
-                    row._trans_locale = locale
-                    self._trans_entries[(key, locale)] = row
-                    group.add(row)
-
-            self.translations_box.append(group)
-
-    def _save_translations_from_ui(self):
-        """Write translation entries back to model."""
-        if not hasattr(self, "_trans_entries"):
+        locales = set(self._added_locales)
+        if df:
+            locales.update(df.get_locales())
+        self.translation_store.splice(
+            0, self.translation_store.get_n_items(),
+            [TranslationRow(locale=locale) for locale in sorted(locales)])
+
+    def _filter_translation_row(self, row):
+        df = self.desktop_file
+        if not self.incomplete_check.get_active() or df is None:
+            return True
+        # Missing, or still identical to the untranslated value
+        for key in TRANSLATABLE_KEYS:
+            source = df.entries.get(key)
+            if source and df.localized.get((key, row.locale), source) == source:
+                return True
+        return False
+
+    def _on_translation_cell_setup(self, factory, list_item, key: str):
+        entry = Gtk.Entry(has_frame=False, hexpand=True)
+        entry._locale = None
+        entry.connect("changed", self._on_translation_cell_changed, key)
+        list_item.set_child(entry)
+
+    def _on_translation_cell_bind(self, factory, list_item, key: str):
+        entry = list_item.get_child()
+        locale = list_item.get_item().locale
+        df = self.desktop_file
+        entry._locale = None
+        text = df.localized.get((key, locale), "") if df else ""
+        entry.set_text(text)
+        # The untranslated value shows through empty cells. Without one
+        # there is nothing to translate, but a stray translation can still
+        # be cleared.
+        source = self._field_rows[key].get_text()
+        entry.set_placeholder_text(source)
+        entry.set_sensitive(bool(source or text))
+        entry.set_tooltip_text(None if source else _("Set %s on the Editor page first") % key)
+        entry._locale = locale
+
+    def _on_translation_cell_unbind(self, factory, list_item):
+        list_item.get_child()._locale = None
+
+    def _on_translation_cell_changed(self, entry, key: str):
+        """Write an edited cell straight to the model."""
+        locale = entry._locale
+        df = self.desktop_file
+        if locale is None or df is None:
             return
-        for (key, locale), row in self._trans_entries.items():
-            text = row.get_text()
-            if text:
-                self.desktop_file.set_translation(key, locale, text)
-            else:
-                self.desktop_file.remove_translation(key, locale)
+        text = entry.get_text()
+        if text:
+            df.set_translation(key, locale, text)
+        else:
+            df.remove_translation(key, locale)
+        self._on_field_edited(f"{key}[{locale}]")
+
+    def _on_translatable_field_changed(self, row, key: str):
+        if bool(row.get_text()) != (key in self._translatable_keys):
+            self._translatable_keys ^= {key}
+            self._refresh_page("translations")
+
+    def _on_remove_locale_cell_setup(self, factory, list_item):
+        button = Gtk.Button(
+            icon_name="user-trash-symbolic",
+            tooltip_text=_("Remove locale"),
+            css_classes=["flat"],
+        )
+        button._locale = None
+        button.connect("clicked", self._on_remove_locale)
+        list_item.set_child(button)
 
-    def _on_add_locale(self, btn):
+    def _on_add_locale(self, _widget):
         locale = self.new_locale_entry.get_text().strip()
         if not locale or not self.desktop_file:
             return
-        # Add empty translations for translatable keys
-        for key in ["Name", "GenericName", "Comment", "Keywords"]:
-            if self.desktop_file.entries.get(key):
-                self.desktop_file.set_translation(key, locale, "")
+        # The locale gets a row now and a translation once a cell is filled
+        if locale not in self._added_locales:
+            self._added_locales.append(locale)
         self.new_locale_entry.set_text("")
         self._update_translations_page()
 
     def _on_remove_locale(self, btn):
         locale = btn._locale
-        if self.desktop_file:
+        if self.desktop_file and locale:
+            if locale in self._added_locales:
+                self._added_locales.remove(locale)
             self.desktop_file.remove_locale(locale)
             self._update_translations_page()
+            self._record_edit()
+
+    # ── Undo/Redo ───────────────────────────────────────────────────
+
+    def _on_field_edited(self, *args):
+        if not self._suppress_history:
+            self._record_edit(args[-1])
+
+    def _record_edit(self, field: str | None = None):
+        """Record the difference between the form and the last recorded state.
+
+        *field* is the form key or ``Key[locale]`` cell that was edited, and
+        only its value is compared. Without one, e.g. after removing a
+        locale, the whole file is.
+        """
+        base, df = self._history_base, self.desktop_file
+        if base is None or df is None:
+            return
+        if field is None:
+            snapshot = df.copy()
+            self._apply_ui_to(snapshot)
+            diff = FileDiff.between(base, snapshot, field)
+        else:
+            split = split_locale_key(field)
+            if split is not None:
+                diff = FileDiff.of_translation(base, *split, df.localized.get(split), field)
+            else:
+                diff = FileDiff.of_entry(base, field, self._form_value(field, df), field)
+        if diff:
+            self.history.record(diff)
+            if field is None:
+                self._history_base = snapshot
+            else:
+                diff.redo(base)
+            self._edit_generation += 1
+
+    def _is_dirty(self) -> bool:
+        """Whether the open document has edits that are not on disk."""
+        return self._edit_generation != self._saved_generation
+
+    def undo(self):
+        self._step_history(self.history.undo)
+
+    def redo(self):
+        self._step_history(self.history.redo)
+
+    def _step_history(self, step):
+        if self.desktop_file is None:
+            return
+        self._save_from_ui()
+        if step(self.desktop_file):
+            self._edit_generation += 1
+            self._load_into_ui()
+            self._schedule_validation()
 
     # ── Validation ──────────────────────────────────────────────────
 
     def _on_validate(self, btn):
+        self._run_validation()
+
+    def _schedule_validation(self, *_args):
+        """Validate once the user has paused typing."""
+        if self._validation_source:
+            GLib.source_remove(self._validation_source)
+        self._validation_source = GLib.timeout_add(
+            VALIDATION_DEBOUNCE_MS, self._run_validation)
+
+    def _run_validation(self):
+        self._validation_source = 0
         if not self.desktop_file:
+            return GLib.SOURCE_REMOVE
+        # Validate a snapshot so the worker never sees the model mid-edit
+        snapshot = self.desktop_file.copy()
+        self._apply_ui_to(snapshot)
+        self._validation_generation += 1
+        self._validation_pool.submit(
+            self._validation_worker, snapshot, self._validation_generation)
+        return GLib.SOURCE_REMOVE
+
+    def _validation_worker(self, snapshot: DesktopFile, generation: int):
+        msgs = snapshot.validate()
+        GLib.idle_add(self._apply_validation, msgs, generation)
+
+    def _apply_validation(self, msgs, generation: int):
+        # A newer snapshot is already on its way
+        if generation != self._validation_generation:
+            return GLib.SOURCE_REMOVE
+        self._validation_messages = msgs
+        self._refresh_page("validation")
+
+        # Inline state on the form fields the messages refer to
+        by_field: dict[str, list] = {}
+        for msg in msgs:
+            if msg.key in self._field_rows:
+                by_field.setdefault(msg.key, []).append(msg)
+        for key in self._flagged_fields - by_field.keys():
+            row = self._field_rows[key]
+            row.remove_css_class("error")
+            row.remove_css_class("warning")
+            row.set_tooltip_text(None)
+        for key, field_msgs in by_field.items():
+            row = self._field_rows[key]
+            is_error = any(m.level == "error" for m in field_msgs)
+            row.remove_css_class("warning" if is_error else "error")
+            row.add_css_class("error" if is_error else "warning")
+            row.set_tooltip_text("\n".join(m.message for m in field_msgs))
+        self._flagged_fields = set(by_field)
+        return GLib.SOURCE_REMOVE
+
+    def _update_validation_list(self):
+        msgs = self._validation_messages
+        if msgs is None:
             return
-        self._save_from_ui()
-
-        # Clear
-        while True:
-            row = self.validation_list.get_row_at_index(0)
-            if row is None:
-                break
-            self.validation_list.remove(row)
-
-        msgs = self.desktop_file.validate()
-        if not msgs:
-            row = Adw.ActionRow(title=_("✓ No issues found"), icon_name="emblem-ok-symbolic")
-            self.validation_list.append(row)
-        else:
-            for msg in msgs:
+        wanted = {}
+        for msg in msgs:
+            wanted.setdefault((msg.level, msg.rule, msg.message), msg)
+        if not wanted:
+            wanted[("ok", None, None)] = None
+
+        # Update the list in place: drop stale rows, insert new ones
+        for key in [k for k in self._validation_rows if k not in wanted]:
+            self.validation_list.remove(self._validation_rows.pop(key))
+        for position, (key, msg) in enumerate(wanted.items()):
+            if key in self._validation_rows:
+                continue
+            if msg is None:
+                row = Adw.ActionRow(title=_("✓ No issues found"), icon_name="emblem-ok-symbolic")
+            else:
                 icon = "dialog-error-symbolic" if msg.level == "error" else "dialog-warning-symbolic"
                 row = Adw.ActionRow(
                     title=msg.message,
                     icon_name=icon,
                 )
-                self.validation_list.append(row)
+            self._validation_rows[key] = row
+            self.validation_list.insert(row, position)
+
+    # ── Coverage ────────────────────────────────────────────────────
+
+    def _update_coverage_page(self):
+        """Update the per-locale rows in place from the coverage matrix."""
+        coverage = self.coverage
+        locales = coverage.locales()
+        self.coverage_summary.set_label(_("%(entries)d installed entries, %(locales)d locales") % {
+            "entries": len(coverage), "locales": len(locales),
+        })
+        wanted = set(locales)
+        for locale in [loc for loc in self._coverage_rows if loc not in wanted]:
+            self.coverage_list.remove(self._coverage_rows.pop(locale)[0])
+
+        added = False
+        for locale in locales:
+            widgets = self._coverage_rows.get(locale)
+            if widgets is None:
+                expander = Adw.ExpanderRow(title=locale)
+                level = Gtk.LevelBar(valign=Gtk.Align.CENTER, width_request=120)
+                expander.add_suffix(level)
+                key_rows = {}
+                for key in TRANSLATABLE_KEYS:
+                    key_rows[key] = Adw.ActionRow(title=f"{key}[{locale}]")
+                    expander.add_row(key_rows[key])
+                widgets = self._coverage_rows[locale] = (expander, level, key_rows)
+                self.coverage_list.append(expander)
+                added = True
+            expander, level, key_rows = widgets
+            cells = coverage.cells(locale)
+            translated = sum(cell.translated for cell in cells)
+            total = sum(cell.total for cell in cells)
+            fraction = translated / total if total else 0.0
+            level.set_value(fraction)
+            expander.set_subtitle(_("%d%% translated") % int(100 * fraction))
+            for cell in cells:
+                row = key_rows[cell.key]
+                row.set_visible(cell.total > 0)
+                if cell.missing:
+                    row.set_subtitle(_("missing in %(missing)d of %(total)d apps") % {
+                        "missing": cell.missing, "total": cell.total,
+                    })
+                else:
+                    row.set_subtitle(_("translated in all apps"))
+        if added:
+            self.coverage_list.invalidate_sort()
 
     # ── Preview ─────────────────────────────────────────────────────
 
@@ -628,16 +1349,13 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
         df = self.desktop_file
         name = df.entries.get("Name", _("Unnamed"))
         comment = df.entries.get("Comment", "")
-        icon = df.entries.get("Icon", "application-x-executable")
+        icon = df.entries.get("Icon")
 
         self.preview_name.set_label(name or _("Unnamed"))
         self.preview_comment.set_label(comment or "")
 
-        # Try to set icon — could be a name or path
-        if icon and os.path.isfile(icon):
-            self.preview_icon.set_from_file(icon)
-        else:
-            self.preview_icon.set_from_icon_name(icon or "application-x-executable")
+        self.preview_icon.set_from_paintable(self.icon_cache.lookup(
+            icon, PREVIEW_ICON_SIZE, self.get_scale_factor()))
 
         self.preview_path.set_label(df.path or _("(unsaved)"))
     def _on_theme_toggle(self, _btn):
@@ -650,44 +1368,73 @@ class DesktopEditorWindow(Adw.ApplicationWindow):
             self._theme_btn.set_icon_name("weather-clear-symbolic")
 
     def _on_export_clicked(self, *_args):
+        group = Adw.PreferencesGroup()
+        scope = Adw.ComboRow(title=_("Export"), model=Gtk.StringList.new(
+            [_("Current file"), _("All installed entries")]))
+        group.add(scope)
         dialog = Adw.MessageDialog(transient_for=self,
                                    heading=_("Export Data"),
-                                   body=_("Choose export format:"))
+                                   body=_("Choose export format:"),
+                                   extra_child=group)
         dialog.add_response("cancel", _("Cancel"))
-        dialog.add_response("csv", "CSV")
+        # Key/value pairs of the current file, as exported before
+        dialog.add_response("key-value-csv", "CSV")
         dialog.add_response("json", "JSON")
-        dialog.set_response_appearance("csv", Adw.ResponseAppearance.SUGGESTED)
-        dialog.connect("response", self._on_export_format_chosen)
+        # One row per value with its path, for any number of files
+        dialog.add_response("csv", _("CSV Rows"))
+        dialog.add_response("jsonl", "JSON Lines")
+        dialog.add_response("columnar", _("Columnar"))
+        dialog.set_response_appearance("key-value-csv", Adw.ResponseAppearance.SUGGESTED)
+        scope.connect("notify::selected", self._on_export_scope_changed, dialog)
+        dialog.connect("response", self._on_export_format_chosen, scope)
         dialog.present()
 
-    def _on_export_format_chosen(self, dialog, response):
-        if response not in ("csv", "json"):
+    def _on_export_scope_changed(self, scope, _pspec, dialog):
+        whole_catalog = scope.get_selected() == 1
+        for fmt in export.SINGLE_FILE_FORMATS:
+            dialog.set_response_enabled(fmt, not whole_catalog)
+
+    def _on_export_format_chosen(self, dialog, response, scope):
+        if response not in export.EXPORTERS:
+            return
+        whole_catalog = scope.get_selected() == 1
+        if not whole_catalog and not self.desktop_file:
+            return
+        if whole_catalog and response in export.SINGLE_FILE_FORMATS:
             return
-        self._export_fmt = response
         fd = Gtk.FileDialog()
-        fd.set_initial_name(f"desktop-export.{response}")
-        fd.save(self, None, self._on_export_save)
+        fd.set_initial_name(f"desktop-export.{export.EXTENSIONS[response]}")
+        fd.save(self, None, self._on_export_save, response, whole_catalog)
 
-    def _on_export_save(self, dialog, result):
+    def _on_export_save(self, dialog, result, fmt: str, whole_catalog: bool):
         try:
             path = dialog.save_finish(result).get_path()
         except Exception:
             return
-        if not self.desktop_file:
-            return
-        data = [{"key": k, "value": v} for k, v in self.desktop_file.entries.items()]
-        for (k, loc), v in self.desktop_file.localized.items():
-            data.append({"key": f"{k}[{loc}]", "value": v})
-        if not data:
-            return
-        if self._export_fmt == "csv":
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                w = csv.DictWriter(f, fieldnames=["key", "value"])
-                w.writeheader()
-                w.writerows(data)
+        if whole_catalog:
+            # Files are read one at a time while the export is written
+            files = export.iter_files([item.path for item in self._sidebar_items.values()])
+        else:
+            snapshot = self.desktop_file.copy()
+            self._apply_ui_to(snapshot)
+            files = [snapshot]
+        self._io_started(_("Exporting…"))
+        self._save_pool.submit(self._export_worker, files, path, fmt)
+
+    def _export_worker(self, files, path: str, fmt: str):
+        try:
+            count, error = export.export_to_path(export.iter_rows(files), path, fmt), None
+        except OSError as e:
+            count, error = 0, e.strerror or str(e)
+        GLib.idle_add(self._on_export_done, count, error)
+
+    def _on_export_done(self, count: int, error):
+        self._io_finished()
+        if error is not None:
+            self._show_error(_("Export Failed"), error)
         else:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._show_toast(_("%d values exported") % count)
+        return GLib.SOURCE_REMOVE
 
     def _update_status_bar(self):
         self._status_bar.set_text("Last updated: " + _dt_now.now().strftime("%Y-%m-%d %H:%M"))
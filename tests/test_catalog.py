@@ -0,0 +1,33 @@
+"""Catalog entries must read like the DesktopFile they were built from."""
+import glob
+import os
+
+import pytest
+
+from desktop_editor.catalog import Catalog
+from desktop_editor.desktop_file import DesktopFile
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(CORPUS, "*.desktop"))),
+                         ids=os.path.basename)
+def test_entry_matches_desktop_file(path):
+    df = DesktopFile.load(path)
+    entry = Catalog().add(df)
+    assert list(entry.entries.items()) == list(df.entries.items())
+    assert dict(entry.localized.items()) == dict(df.localized.items())
+    assert entry.get_locales() == df.get_locales()
+    assert {name: dict(group) for name, group in entry.extra_groups.items()} == \
+        {name: dict(group) for name, group in df.extra_groups.items()}
+
+
+def test_views_follow_the_mapping_protocol():
+    df = DesktopFile.load(os.path.join(CORPUS, "localized.desktop"))
+    entry = Catalog().add(df)
+    for view, source in [(entry.entries, df.entries), (entry.localized, df.localized)]:
+        assert len(view.items()) == len(view) == len(source)
+        assert len(view.values()) == len(view)
+        first = next(iter(view.items()))
+        assert first in view.items()
+        assert sorted(view.values()) == sorted(source.values())
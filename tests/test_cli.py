@@ -0,0 +1,18 @@
+"""Command-line dispatch."""
+import argparse
+
+from desktop_editor import cli
+
+
+def test_commands_match_the_parser():
+    parser = cli.build_parser()
+    subparsers = next(action for action in parser._actions
+                      if isinstance(action, argparse._SubParsersAction))
+    assert set(subparsers.choices) == cli.COMMANDS
+
+
+def test_handles():
+    assert cli.handles(["validate", "x.desktop"])
+    assert cli.handles(["--set", "Name=x"])
+    assert not cli.handles([])
+    assert not cli.handles(["x.desktop"])
@@ -0,0 +1,48 @@
+"""Exports: the single-file key/value formats the editor has always written."""
+import csv
+import io
+import json
+import os
+
+import pytest
+
+from desktop_editor import export
+from desktop_editor.desktop_file import DesktopFile
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+def key_values(df):
+    """The rows the current-file export wrote before catalog-wide exports."""
+    data = [{"key": k, "value": v} for k, v in df.entries.items()]
+    for (k, loc), v in df.localized.items():
+        data.append({"key": f"{k}[{loc}]", "value": v})
+    return data
+
+
+@pytest.mark.parametrize("name", ["localized.desktop", "actions.desktop"])
+def test_json_matches_the_previous_export(name):
+    df = DesktopFile.load(os.path.join(CORPUS, name))
+    out = io.StringIO()
+    export.export(export.iter_rows([df]), out, "json")
+    expected = io.StringIO()
+    json.dump(key_values(df), expected, ensure_ascii=False, indent=2)
+    assert out.getvalue() == expected.getvalue()
+
+
+@pytest.mark.parametrize("name", ["localized.desktop", "actions.desktop"])
+def test_key_value_csv_matches_the_previous_export(name):
+    df = DesktopFile.load(os.path.join(CORPUS, name))
+    out = io.StringIO(newline="")
+    export.export(export.iter_rows([df]), out, "key-value-csv")
+    expected = io.StringIO(newline="")
+    writer = csv.DictWriter(expected, fieldnames=["key", "value"])
+    writer.writeheader()
+    writer.writerows(key_values(df))
+    assert out.getvalue() == expected.getvalue()
+
+
+def test_json_of_an_empty_file_is_an_empty_array():
+    out = io.StringIO()
+    export.export(export.iter_rows([DesktopFile()]), out, "json")
+    assert json.loads(out.getvalue()) == []
@@ -0,0 +1,57 @@
+"""Parse cache: freshness, recency and eviction of per-file entries."""
+import os
+
+from desktop_editor.parse_cache import ParseCache
+
+
+def write(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def entry_files(cache):
+    return sorted(os.listdir(cache.entries_dir))
+
+
+def test_hit_touches_only_its_entry(tmp_path):
+    paths = [write(tmp_path, f"app{i}.desktop", f"[Desktop Entry]\nName=App {i}\n")
+             for i in range(3)]
+    cache = ParseCache(str(tmp_path / "cache"))
+    for path in paths:
+        cache.load(path)
+    entries = [cache._entry_path(path) for path in paths]
+    for i, entry in enumerate(entries):
+        os.utime(entry, ns=(i * 10**9, i * 10**9))
+    contents = [open(entry, "rb").read() for entry in entries]
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert cache.get(paths[0]).entries["Name"] == "App 0"
+    assert [open(entry, "rb").read() for entry in entries] == contents
+    mtimes = [os.stat(entry).st_mtime_ns for entry in entries]
+    assert mtimes[0] > mtimes[2] > mtimes[1]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    paths = [write(tmp_path, f"app{i}.desktop", f"[Desktop Entry]\nName=App {i}\n")
+             for i in range(4)]
+    cache = ParseCache(str(tmp_path / "cache"))
+    for i, path in enumerate(paths):
+        cache.load(path)
+        os.utime(cache._entry_path(path), ns=(i * 10**9, i * 10**9))
+    cache.get(paths[0])
+    size = os.path.getsize(cache._entry_path(paths[1]))
+    cache.max_bytes = 2 * size
+    cache.flush()
+    assert entry_files(cache) == sorted(
+        os.path.basename(cache._entry_path(path)) for path in (paths[0], paths[3]))
+
+
+def test_stale_entry_is_not_served(tmp_path):
+    path = write(tmp_path, "app.desktop", "[Desktop Entry]\nName=Old\n")
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.load(path)
+    write(tmp_path, "app.desktop", "[Desktop Entry]\nName=Newer\n")
+    assert cache.get(path) is None
+    assert cache.load(path).entries["Name"] == "Newer"
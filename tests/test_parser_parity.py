@@ -0,0 +1,69 @@
+"""The single-pass parser must build the same model as the original one."""
+import glob
+import os
+from collections import OrderedDict
+
+import pytest
+
+from desktop_editor.desktop_file import LOCALE_KEY_RE, DesktopFile, scan_keys
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus")
+
+
+def reference_load(path):
+    """The line-by-line parser DesktopFile.load used before the single-pass one."""
+    entries, localized, extra_groups = OrderedDict(), {}, OrderedDict()
+    current_group = None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n\r")
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                current_group = line[1:-1]
+                if current_group != "Desktop Entry":
+                    extra_groups.setdefault(current_group, OrderedDict())
+                continue
+            if "=" not in line:
+                continue
+            key, _, value = line.partition("=")
+            key = key.strip()
+            value = value.strip()
+
+            m = LOCALE_KEY_RE.match(key)
+            if current_group == "Desktop Entry" or current_group is None:
+                if m:
+                    localized[(m.group(1), m.group(2))] = value
+                else:
+                    entries[key] = value
+            elif current_group in extra_groups:
+                extra_groups[current_group][key] = value
+    return entries, localized, extra_groups
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(CORPUS, "*.desktop"))),
+                         ids=os.path.basename)
+def test_matches_reference_parser(path):
+    entries, localized, extra_groups = reference_load(path)
+    df = DesktopFile.load(path)
+    assert list(df.entries.items()) == list(entries.items())
+    assert dict(df.localized.items()) == localized
+    assert [(name, list(group.items())) for name, group in df.extra_groups.items()] == \
+        [(name, list(group.items())) for name, group in extra_groups.items()]
+
+
+def test_corpus_is_not_trivial():
+    df = DesktopFile.load(os.path.join(CORPUS, "localized.desktop"))
+    assert df.get_translations("Name")["sr@latin"] == "Datoteke"
+    assert "X-Foo[de]" in df.entries
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(CORPUS, "*.desktop"))),
+                         ids=os.path.basename)
+def test_scanner_matches_parser(path):
+    df = DesktopFile.load(path)
+    keys = list(df.entries) + ["X-Absent"]
+    localized = sorted({key for key, _locale in df.localized})
+    expected = {key: df.entries[key] for key in keys if key in df.entries}
+    expected.update((f"{key}[{locale}]", value) for (key, locale), value in df.localized.items())
+    assert scan_keys(path, keys, localized) == expected
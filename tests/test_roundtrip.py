@@ -0,0 +1,32 @@
+"""An unchanged file must render and save exactly as it was read."""
+import glob
+import os
+import shutil
+
+import pytest
+
+from desktop_editor.desktop_file import DesktopFile
+from desktop_editor.document import render
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus")
+PATHS = sorted(glob.glob(os.path.join(CORPUS, "*.desktop")))
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_render_of_unchanged_file_is_its_source(path):
+    df = DesktopFile.load(path)
+    assert "".join(render(df, df.source)) == df.source
+
+
+@pytest.mark.parametrize("path", PATHS, ids=os.path.basename)
+def test_save_of_unchanged_copy_is_byte_identical(path, tmp_path):
+    with open(path, "rb") as f:
+        original = f.read()
+    try:
+        original.decode("utf-8")
+    except UnicodeDecodeError:
+        pytest.skip("undecodable bytes are replaced when the file is read")
+    target = tmp_path / os.path.basename(path)
+    shutil.copyfile(path, target)
+    DesktopFile.load(str(target)).copy().save()
+    assert target.read_bytes() == original
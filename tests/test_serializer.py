@@ -0,0 +1,79 @@
+"""Serializing a DesktopFile must write every value of the model."""
+import pytest
+
+from desktop_editor.desktop_file import DesktopFile
+
+SOURCE = "[Desktop Entry]\nType=Application\nName=Tool\nExec=tool\n\n[Desktop Action new]\nExec=tool --new\n"
+
+
+@pytest.mark.parametrize("lossless", [True, False], ids=["render", "iter_lines"])
+def test_translation_without_base_key_is_written(tmp_path, lossless):
+    df = DesktopFile.from_string(SOURCE)
+    if not lossless:
+        df.source = None
+    df.set_translation("GenericName", "de", "Werkzeug")
+    df.set_translation("GenericName", "sv", "Verktyg")
+    path = tmp_path / "tool.desktop"
+    df.save(str(path))
+    saved = DesktopFile.load(str(path))
+    assert saved.get_translations("GenericName") == {"de": "Werkzeug", "sv": "Verktyg"}
+    assert "GenericName" not in saved.entries
+    assert dict(saved.extra_groups["Desktop Action new"]) == {"Exec": "tool --new"}
+
+
+def test_new_translation_in_file_without_base_key_keeps_layout():
+    df = DesktopFile.from_string(SOURCE)
+    df.set_translation("Comment", "de", "Ein Werkzeug")
+    assert "".join(df.iter_lines()) == (
+        "[Desktop Entry]\nType=Application\nName=Tool\nExec=tool\nComment[de]=Ein Werkzeug\n"
+        "\n[Desktop Action new]\nExec=tool --new\n")
+
+
+def test_bulk_edit_refuses_a_value_that_would_not_survive(tmp_path):
+    from desktop_editor import bulk_edit
+
+    path = tmp_path / "tool.desktop"
+    path.write_text(SOURCE, encoding="utf-8")
+    plan = bulk_edit.plan([str(path)], [bulk_edit.SetValue("Comment", "two\nlines")])
+    assert not plan.changes and len(plan.failed) == 1
+    with pytest.raises(bulk_edit.BulkEditError):
+        plan.commit(journal_directory=str(tmp_path / "journal"))
+    assert path.read_text(encoding="utf-8") == SOURCE
+
+
+def test_bulk_set_translation_without_base_key(tmp_path):
+    from desktop_editor import bulk_edit
+
+    path = tmp_path / "tool.desktop"
+    path.write_text(SOURCE, encoding="utf-8")
+    plan = bulk_edit.plan([str(path)], [bulk_edit.SetValue("GenericName[de]", "Werkzeug")])
+    plan.commit(journal_directory=str(tmp_path / "journal"))
+    assert DesktopFile.load(str(path)).get_translations("GenericName") == {"de": "Werkzeug"}
+
+
+def test_save_through_a_symlink_replaces_the_target(tmp_path):
+    (tmp_path / "vendor").mkdir()
+    target = tmp_path / "vendor" / "tool.desktop"
+    target.write_text(SOURCE)
+    target.chmod(0o600)
+    link = tmp_path / "tool.desktop"
+    link.symlink_to("vendor/tool.desktop")
+    df = DesktopFile.load(str(link))
+    df.entries["Name"] = "Renamed"
+    df.save()
+    assert link.is_symlink()
+    assert DesktopFile.load(str(target)).entries["Name"] == "Renamed"
+    assert target.stat().st_mode & 0o777 == 0o600
+    assert [p.name for p in (tmp_path / "vendor").iterdir()] == ["tool.desktop"]
+
+
+def test_bulk_commit_reports_an_unwritable_journal(tmp_path):
+    from desktop_editor import bulk_edit
+
+    path = tmp_path / "tool.desktop"
+    path.write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "state").write_text("not a directory")
+    plan = bulk_edit.plan([str(path)], [bulk_edit.SetValue("Comment", "A tool")])
+    with pytest.raises(bulk_edit.BulkEditError, match="journal"):
+        plan.commit(journal_directory=str(tmp_path / "state" / "journal"))
+    assert path.read_text(encoding="utf-8") == SOURCE
@@ -0,0 +1,87 @@
+"""Importing translations from .po files into .desktop files."""
+import pytest
+
+from desktop_editor.desktop_file import DesktopFile
+from desktop_editor.translation_import import (
+    TranslationIndex,
+    import_translations,
+    normalize_locale,
+)
+
+ENTRY = "[Desktop Entry]\nType=Application\nName=Files\nComment=Browse files\nExec=files\n"
+
+
+def write_po(path, header, entries):
+    lines = ['msgid ""', 'msgstr ""'] + [f'"{line}\\n"' for line in header] + [""]
+    for msgid, msgstr in entries:
+        lines += [f'msgid "{msgid}"', f'msgstr "{msgstr}"', ""]
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return str(path)
+
+
+def import_into(tmp_path, index, text=ENTRY):
+    target = tmp_path / "app.desktop"
+    target.write_text(text, encoding="utf-8")
+    result, coverage = import_translations([str(target)], index)
+    result.commit(journal_directory=str(tmp_path / "journal"))
+    return target
+
+
+def test_empty_language_header_falls_back_to_file_name(tmp_path):
+    po = write_po(tmp_path / "de.po",
+                  ["Language: ", "Plural-Forms: nplurals=2; plural=(n != 1);"],
+                  [("Files", "Dateien")])
+    index = TranslationIndex()
+    index.load_po(po)
+    assert index.locales() == ["de"]
+
+
+def test_language_header_drops_encoding(tmp_path):
+    po = write_po(tmp_path / "translations.po", ["Language: pt_BR.UTF-8"],
+                  [("Files", "Arquivos")])
+    index = TranslationIndex()
+    index.load_po(po)
+    assert index.locales() == ["pt_BR"]
+
+
+def test_no_locale_anywhere_is_an_error(tmp_path):
+    po = write_po(tmp_path / "translations.po", ["Language: "], [("Files", "Dateien")])
+    with pytest.raises(ValueError):
+        TranslationIndex().load_po(po)
+
+
+def test_import_writes_translations(tmp_path):
+    index = TranslationIndex()
+    index.load_po(write_po(tmp_path / "sv.po", ["Language: sv"],
+                           [("Files", "Filer"), ("Browse files", "Bläddra bland filer")]))
+    df = DesktopFile.load(str(import_into(tmp_path, index)))
+    assert df.get_translations("Name") == {"sv": "Filer"}
+    assert df.get_translations("Comment") == {"sv": "Bläddra bland filer"}
+
+
+def test_multiline_msgstr_is_escaped(tmp_path):
+    index = TranslationIndex()
+    index.load_po(write_po(tmp_path / "de.po", ["Language: de"],
+                           [("Browse files", "Dateien\\ndurchsuchen\\tund \\\\ mehr")]))
+    target = import_into(tmp_path, index)
+    lines = target.read_text(encoding="utf-8").splitlines()
+    assert "Comment[de]=Dateien\\ndurchsuchen\\tund \\\\ mehr" in lines
+    assert "durchsuchen" not in "".join(line for line in lines if "Comment[de]" not in line)
+    df = DesktopFile.load(str(target))
+    assert list(df.entries) == ["Type", "Name", "Comment", "Exec"]
+    assert df.get_translations("Comment") == {"de": "Dateien\\ndurchsuchen\\tund \\\\ mehr"}
+
+
+def test_escaped_source_value_matches_msgid(tmp_path):
+    index = TranslationIndex()
+    index.add("Line one\nLine two", "sv", "Rad ett\nRad två")
+    target = import_into(tmp_path, index,
+                         "[Desktop Entry]\nType=Application\nName=A\n"
+                         "Comment=Line one\\nLine two\n")
+    df = DesktopFile.load(str(target))
+    assert df.get_translations("Comment") == {"sv": "Rad ett\\nRad två"}
+
+
+def test_numeric_region_is_a_locale():
+    assert normalize_locale("es_419.UTF-8") == "es_419"
+    assert normalize_locale("es_41") is None
@@ -0,0 +1,51 @@
+"""Document undo history: coalescing and the byte budget."""
+from desktop_editor.desktop_file import DesktopFile
+from desktop_editor.undo_redo import EditHistory, FileDiff
+
+
+def edit(df, key, value, field=None):
+    before = df.copy()
+    df.entries[key] = value
+    return FileDiff.between(before, df, field)
+
+
+def test_typing_is_coalesced_into_one_step():
+    df = DesktopFile.new_application()
+    history = EditHistory()
+    for i in range(1, 50):
+        history.record(edit(df, "Comment", "x" * i, "Comment"))
+    assert len(history) == 1
+    assert history.undo(df)
+    assert df.entries["Comment"] == ""
+
+
+def test_byte_budget_holds_while_typing():
+    df = DesktopFile.new_application()
+    history = EditHistory(max_bytes=4096)
+    for i in range(20):
+        history.record(edit(df, f"X-Key{i}", "v" * 100))
+    for i in range(1, 3000, 7):
+        history.record(edit(df, "Comment", "x" * i, "Comment"))
+        assert history.size_bytes <= 4096
+
+
+def test_single_key_diffs_undo_in_place():
+    df = DesktopFile.from_string("[Desktop Entry]\nType=Application\nName=Tool\nExec=tool\n")
+    history = EditHistory()
+    for diff in (FileDiff.of_entry(df, "Name", None),
+                 FileDiff.of_entry(df, "Comment", "A tool"),
+                 FileDiff.of_translation(df, "Comment", "de", "Ein Werkzeug")):
+        diff.redo(df)
+        history.record(diff)
+    assert "Name" not in df.entries
+    assert df.get_translations("Comment") == {"de": "Ein Werkzeug"}
+    while history.undo(df):
+        pass
+    assert list(df.entries.items()) == [("Type", "Application"), ("Name", "Tool"), ("Exec", "tool")]
+    assert not df.localized
+
+
+def test_unchanged_single_key_is_no_diff():
+    df = DesktopFile.new_application()
+    assert not FileDiff.of_entry(df, "Name", df.entries["Name"])
+    assert not FileDiff.of_translation(df, "Name", "de", None)
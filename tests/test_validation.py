@@ -0,0 +1,23 @@
+"""Validation of localized keys."""
+import pytest
+
+from desktop_editor.desktop_file import DesktopFile
+
+SOURCE = "[Desktop Entry]\nType=Application\nName=Tool\nExec=tool\n"
+
+
+def locale_messages(df):
+    return [msg.message for msg in df.validate() if msg.rule == "locale-key"]
+
+
+@pytest.mark.parametrize("locale", ["es_419", "sr@latin", "pt_BR", "de_DE.UTF-8@euro"])
+def test_valid_locales_are_not_flagged(locale):
+    df = DesktopFile.from_string(SOURCE + f"Name[{locale}]=Herramienta\n")
+    assert df.get_translations("Name") == {locale: "Herramienta"}
+    assert locale_messages(df) == []
+
+
+@pytest.mark.parametrize("locale", ["es_41", "ES", "es_es"])
+def test_invalid_locales_are_flagged(locale):
+    df = DesktopFile.from_string(SOURCE + f"Name[{locale}]=Herramienta\n")
+    assert locale_messages(df) == [f"Invalid locale in key: Name[{locale}]"]
@@ -0,0 +1,28 @@
+"""Shared setup of the benchmark scripts in tools/.
+
+Importing this module puts the source tree first on ``sys.path``, so the
+scripts measure the checkout they live in rather than an installed copy.
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+# Synthetic two-letter locales: "aa", "ab", ... (676 of them)
+LOCALE_NAMES = [a + b for a in "abcdefghijklmnopqrstuvwxyz" for b in "abcdefghijklmnopqrstuvwxyz"]
+
+
+def measure(build) -> tuple[int, object]:
+    """Return the bytes still allocated by *build()* and its result."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Compare the memory held by parsed DesktopFiles and by a Catalog.
+
+Generates synthetic entries (or uses the installed ones with --installed),
+keeps them all in memory both ways and reports the tracemalloc delta.
+
+    python tools/bench_catalog_memory.py [--files 2000] [--locales 120] [--installed]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from _bench_common import LOCALE_NAMES, measure  # puts src/ on sys.path first
+from desktop_editor.catalog import Catalog
+from desktop_editor.desktop_file import DesktopFile, list_desktop_files
+
+
+def write_corpus(directory: str, files: int, locales: int) -> list[str]:
+    """Write *files* entries with *locales* translations of Name and Comment."""
+    paths = []
+    for i in range(files):
+        lines = ["[Desktop Entry]", "Type=Application", f"Name=App {i}",
+                 f"Comment=Does thing number {i}", f"Exec=app{i} %U", f"Icon=app{i % 50}",
+                 "Terminal=false", "Categories=GNOME;GTK;Utility;"]
+        for locale in LOCALE_NAMES[:locales]:
+            lines.append(f"Name[{locale}]=App {i % 40} ({locale})")
+            lines.append(f"Comment[{locale}]=Translated comment {i} in {locale}")
+        lines += ["", "[Desktop Action new]", "Name=New Window", f"Exec=app{i} --new"]
+        path = os.path.join(directory, f"app{i}.desktop")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        paths.append(path)
+    return paths
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--locales", type=int, default=120)
+    parser.add_argument("--installed", action="store_true",
+                        help="use the installed entries instead of synthetic ones")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.installed:
+            paths = list_desktop_files()
+        else:
+            paths = write_corpus(directory, args.files, min(args.locales, len(LOCALE_NAMES)))
+        texts = []
+        for path in paths:
+            with open(path, encoding="utf-8", errors="replace", newline="") as f:
+                texts.append((path, f.read()))
+
+    def parse_all():
+        files = []
+        for path, text in texts:
+            df = DesktopFile.from_string(text, path)
+            # The catalog keeps no source text; compare like with like
+            df.source = None
+            files.append(df)
+        return files
+
+    def catalog_all():
+        catalog = Catalog()
+        for path, text in texts:
+            catalog.add(DesktopFile.from_string(text, path))
+        return catalog
+
+    count = len(texts) or 1
+    plain, files = measure(parse_all)
+    compact, catalog = measure(catalog_all)
+    assert len(catalog) == len(files)
+    print(f"{len(texts)} files")
+    print(f"  DesktopFile {plain / count / 1024:7.1f} kB/file ({plain / 2**20:.1f} MB)")
+    print(f"  Catalog     {compact / count / 1024:7.1f} kB/file ({compact / 2**20:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
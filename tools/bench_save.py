@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare the old DesktopFile.save serializer with the current one.
+
+Builds a file with many keys and many locales of each, then times turning
+it into text and writing it out: the old serializer, which re-sorted every
+translation once per key and overwrote the target in place, against
+iter_lines() and write_atomic(), which fsyncs and renames. The last row
+saves a parsed file, which is rendered by patching its source text.
+
+    python tools/bench_save.py [--keys 40] [--locales 150] [--repeat 10]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+from _bench_common import LOCALE_NAMES  # puts src/ on sys.path first
+from desktop_editor.desktop_file import DesktopFile, write_atomic
+
+
+def old_lines(df: DesktopFile) -> list[str]:
+    """The lines as save() used to build them."""
+    lines = ["[Desktop Entry]\n"]
+    for key, value in df.entries.items():
+        lines.append(f"{key}={value}\n")
+        for (lkey, locale), lvalue in sorted(df.localized.items()):
+            if lkey == key:
+                lines.append(f"{lkey}[{locale}]={lvalue}\n")
+    for group_name, group_entries in df.extra_groups.items():
+        lines.append(f"\n[{group_name}]\n")
+        for key, value in group_entries.items():
+            lines.append(f"{key}={value}\n")
+    return lines
+
+
+def old_save(df: DesktopFile, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(old_lines(df))
+
+
+def make_file(keys: int, locales: int) -> DesktopFile:
+    df = DesktopFile.new_application()
+    for i in range(keys):
+        key = f"X-Key{i:02d}"
+        df.entries[key] = f"Value {i}"
+        for locale in LOCALE_NAMES[:locales]:
+            df.set_translation(key, locale, f"Value {i} in {locale}")
+    df.extra_groups["Desktop Action new"] = {"Name": "New Window", "Exec": "app --new"}
+    return df
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--keys", type=int, default=40)
+    parser.add_argument("--locales", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    df = make_file(args.keys, args.locales)
+    assert "".join(old_lines(df)) == "".join(df.iter_lines())
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.desktop")
+        old_save(df, path)
+        parsed = DesktopFile.load(path)
+        parsed.entries["Comment"] = "Edited"
+
+        def best(stmt):
+            return min(timeit.repeat(stmt, number=1, repeat=args.repeat)) * 1e3
+
+        print(f"{args.keys} keys x {args.locales} locales = {len(df.localized)} translations")
+        print(f"  serialize, old         {best(lambda: old_lines(df)):9.3f} ms")
+        print(f"  serialize, iter_lines  {best(lambda: ''.join(df.iter_lines())):9.3f} ms")
+        print(f"  save, old in place     {best(lambda: old_save(df, path)):9.3f} ms")
+        print(f"  save, write_atomic     {best(lambda: write_atomic(path, df.iter_lines())):9.3f} ms")
+        print(f"  save(), parsed file    {best(lambda: parsed.save(path)):9.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Compare translation lookups on a flat dict and on the indexed store.
+
+Builds a file with many locales of every translatable key, then times the
+lookups the translations page makes when it is rebuilt, and remove_locale(),
+both through a flat ``(key, locale) -> value`` dict scanned as DesktopFile
+used to, and through the current TranslationStore.
+
+    python tools/bench_translations.py [--locales 200] [--keys 24] [--repeat 20]
+"""
+import argparse
+import sys
+import timeit
+
+from _bench_common import LOCALE_NAMES  # puts src/ on sys.path first
+from desktop_editor.desktop_file import DesktopFile, TRANSLATABLE_KEYS
+
+
+# ── The flat dict, as DesktopFile used to scan it ───────────────────
+
+
+def flat_get_locales(localized: dict) -> list[str]:
+    return sorted({locale for _key, locale in localized})
+
+
+def flat_get_translations(localized: dict, key: str) -> dict[str, str]:
+    return {locale: value for (k, locale), value in localized.items() if k == key}
+
+
+def flat_remove_locale(localized: dict, locale: str):
+    for item in [(k, l) for k, l in localized if l == locale]:
+        del localized[item]
+
+
+def flat_page(localized: dict, keys: list[str]) -> list:
+    """One get_translations() per locale per key, as the page used to call it."""
+    return [(locale, key, flat_get_translations(localized, key).get(locale))
+            for locale in flat_get_locales(localized) for key in keys]
+
+
+# ── The indexed store ───────────────────────────────────────────────
+
+
+def store_page(df: DesktopFile, keys: list[str]) -> list:
+    return [(locale, key, df.localized.get((key, locale)))
+            for locale in df.get_locales() for key in keys]
+
+
+def make_file(locales: int, keys: list[str]) -> DesktopFile:
+    df = DesktopFile.new_application()
+    for key in keys:
+        df.entries[key] = f"Untranslated {key}"
+        for locale in LOCALE_NAMES[:locales]:
+            df.set_translation(key, locale, f"{key} in {locale}")
+    return df
+
+
+def best(stmt, repeat: int, setup=None) -> float:
+    """Best of *repeat* single runs of *stmt*, calling *setup* before each."""
+    times = []
+    for _i in range(repeat):
+        if setup is not None:
+            setup()
+        times.append(timeit.timeit(stmt, number=1))
+    return min(times)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--locales", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    keys = list(TRANSLATABLE_KEYS)
+    keys += [f"X-Key{i}" for i in range(args.keys - len(keys))]
+    keys = keys[:args.keys]
+    df = make_file(args.locales, keys)
+    flat = dict(df.localized.items())
+    assert flat_page(flat, keys) == store_page(df, keys)
+    victim = LOCALE_NAMES[args.locales // 2]
+
+    # remove_locale() works on a fresh copy each run, made outside the timing
+    copies = {}
+
+    def copy_both():
+        copies["flat"], copies["store"] = dict(flat), df.localized.copy()
+
+    print(f"{args.locales} locales x {len(keys)} keys = {len(flat)} translations")
+    print(f"  {'':<22} {'flat dict':>12} {'store':>12}")
+    for label, old, new in (
+            ("translations page", lambda: flat_page(flat, keys), lambda: store_page(df, keys)),
+            ("get_translations", lambda: flat_get_translations(flat, keys[0]),
+             lambda: df.get_translations(keys[0])),
+            ("remove_locale", lambda: flat_remove_locale(copies["flat"], victim),
+             lambda: copies["store"].remove_locale(victim))):
+        print(f"  {label:<22} {best(old, args.repeat, copy_both) * 1e3:9.3f} ms"
+              f" {best(new, args.repeat, copy_both) * 1e3:9.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Measure the memory held by the document undo history.
+
+Replays many edits of Comment in a file with many translations and reports
+the tracemalloc delta and the steps kept: diff steps one per edit, diff
+steps coalesced as typing, and full-file snapshots as the history used to
+keep them.
+
+    python tools/bench_undo_memory.py [--edits 100000] [--translations 300]
+"""
+import argparse
+import sys
+import time
+
+from _bench_common import LOCALE_NAMES, measure  # puts src/ on sys.path first
+from desktop_editor.desktop_file import DesktopFile
+from desktop_editor.undo_redo import EditHistory, FileDiff, UndoRedoManager
+
+
+def make_file(translations: int) -> DesktopFile:
+    df = DesktopFile.new_application()
+    df.entries["Name"] = "Benchmark"
+    for locale in LOCALE_NAMES[:translations]:
+        df.set_translation("Comment", locale, f"Translated comment in {locale}")
+    return df
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edits", type=int, default=100_000)
+    parser.add_argument("--translations", type=int, default=300)
+    args = parser.parse_args()
+
+    def diffs(field, coalesce_seconds):
+        df = make_file(args.translations)
+        history = EditHistory(coalesce_seconds=coalesce_seconds)
+        for i in range(args.edits):
+            # As the editor records a keystroke: one key, no copy of the file
+            diff = FileDiff.of_entry(df, "Comment", "x" * (i % 200), field)
+            diff.redo(df)
+            history.record(diff)
+        return history
+
+    def snapshots():
+        df = make_file(args.translations)
+        history = UndoRedoManager(max_size=1000)
+        for i in range(args.edits):
+            before, df = df, df.copy()
+            df.entries["Comment"] = "x" * (i % 200)
+            history.push(lambda b=before: b, lambda a=df: a)
+        return history
+
+    print(f"{args.edits} edits of Comment, {args.translations} translations")
+    for label, build in (("diffs, one step per edit", lambda: diffs(None, 0)),
+                         ("diffs, coalesced typing", lambda: diffs("Comment", 1.0)),
+                         ("snapshots, 1000 steps", snapshots)):
+        start = time.perf_counter()
+        used, history = measure(build)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<26} {used / 1024:9.1f} kB  {len(history):5d} steps  {elapsed:6.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Check that the command-line entry point starts fast and without GTK.
+
+Runs ``python -X importtime`` on the CLI modules several times and compares
+the best cumulative import time of desktop_editor.cli with a budget. Fails
+if ``gi`` gets imported (or, where PyGObject is not installed, tried).
+
+    python tools/check_importtime.py [--budget-ms 40] [--runs 7]
+"""
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+MODULE = "desktop_editor.cli"
+DEFAULT_BUDGET_MS = 40
+# Also the modules scripts import directly
+PROBE = (
+    "import sys, desktop_editor.cli, desktop_editor.desktop_file\n"
+    "sys.exit(3 if 'gi' in sys.modules else 0)\n"
+)
+
+
+def measure() -> tuple[int, list[tuple[int, str]]]:
+    """Return desktop_editor.cli's cumulative µs and every import's (µs, name)."""
+    env = dict(os.environ, PYTHONPATH=SRC)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE],
+                          env=env, capture_output=True, text=True)
+    if proc.returncode == 3:
+        sys.exit(f"{MODULE} imported gi")
+    if proc.returncode:
+        sys.exit(proc.stderr)
+    total, imports = None, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.rstrip()))
+        if name.strip() == MODULE:
+            total = int(cumulative)
+    if total is None:
+        sys.exit(f"{MODULE} missing from -X importtime output")
+    return total, imports
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    # Time warm imports, as an installed package with bytecode would see
+    compileall.compile_dir(os.path.join(SRC, "desktop_editor"), quiet=1)
+    best, imports = min((measure() for _ in range(args.runs)), key=lambda r: r[0])
+    print(f"{MODULE}: {best / 1000:.1f} ms (budget {args.budget_ms:g} ms)")
+    if best <= args.budget_ms * 1000:
+        return 0
+    print("Slowest imports:")
+    for cumulative, name in sorted(imports, reverse=True)[:15]:
+        print(f"  {cumulative / 1000:7.1f} ms {name}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())